@@ -1,15 +1,53 @@
+import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from auth.jwt_handler import verify_token
 from models.user import TokenData
 from config.database import get_db, COLLECTIONS
-from google.cloud.firestore import Client
+from google.cloud.firestore import AsyncClient
+from services.cache import TTLCache
 
 security = HTTPBearer()
 
+# Per-process cache of user documents keyed by user_id. Writes made through
+# this process invalidate explicitly; other workers see them after the TTL.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_MAX_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+)
+
+def invalidate_cached_user(user_id: str):
+    """Drop a user document from the cache after it has been modified"""
+    user_cache.pop(user_id)
+
+async def load_active_user(user_id: str, db: AsyncClient) -> dict:
+    """User document from the cache or Firestore; 404 if missing, 401 if deactivated"""
+    user_data = user_cache.get(user_id)
+    
+    if user_data is None:
+        # Get user from database
+        user_doc = await db.collection(COLLECTIONS["USERS"]).document(user_id).get()
+        
+        if not user_doc.exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        user_data = user_doc.to_dict()
+        user_cache.set(user_id, user_data)
+    
+    if not user_data.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is deactivated"
+        )
+    
+    return user_data
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -19,23 +57,7 @@ async def get_current_user(
     )
     
     token_data = verify_token(credentials.credentials, credentials_exception)
-    
-    # Get user from database
-    user_doc = db.collection(COLLECTIONS["USERS"]).document(token_data.user_id).get()
-    
-    if not user_doc.exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    user_data = user_doc.to_dict()
-    
-    if not user_data.get("is_active", True):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Account is deactivated"
-        )
+    user_data = await load_active_user(token_data.user_id, db)
     
     return {
         "id": token_data.user_id,
@@ -52,3 +74,60 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
         )
     return current_user
 
+def require_role(*roles: str):
+    """
+    Dependency that only admits active users whose `role` is one of roles.
+
+    The role lives on the user document (students have none and default to
+    "student"); it is set administratively and cannot be changed through
+    update_profile.
+    """
+    async def check_role(current_user: dict = Depends(get_current_active_user)):
+        if current_user.get("role", "student") not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: insufficient role"
+            )
+        return current_user
+    return check_role
+
+async def get_current_user_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncClient = Depends(get_db)
+):
+    """
+    Get the current user's profile from token claims, for read-only routes.
+
+    Only carries id, email, profile_version, current_education_level,
+    technical_skills, soft_skills and career_interests, as of when the
+    token was issued. The verified claims are trusted without a user
+    lookup: deactivating or deleting an account revokes every token issued
+    to it (scripts/deactivate_user.py), so verify_token rejects them.
+    Tokens without claims fall back to the shared user lookup.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    token_data = verify_token(credentials.credentials, credentials_exception)
+    profile = token_data.profile
+    
+    if profile is None:
+        user_data = await load_active_user(token_data.user_id, db)
+        return {
+            "id": token_data.user_id,
+            "email": token_data.email,
+            **user_data
+        }
+    
+    return {
+        "id": token_data.user_id,
+        "email": token_data.email,
+        "profile_version": profile["pv"],
+        "current_education_level": profile["lvl"],
+        "technical_skills": profile["ts"],
+        "soft_skills": profile["ss"],
+        "career_interests": profile["ci"]
+    }
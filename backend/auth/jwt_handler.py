@@ -1,16 +1,34 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import os
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from models.user import TokenData
+from services.cache import TTLCache
+from auth.revocation import revocation_store
 
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "your_jwt_secret_here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Opt-in compact profile claims so read-only routes can skip the user lookup.
+# Bump PROFILE_CLAIMS_SCHEMA whenever the claim layout changes; tokens with
+# another schema are treated as carrying no claims.
+PROFILE_CLAIMS_ENABLED = os.getenv("JWT_PROFILE_CLAIMS", "false").lower() == "true"
+PROFILE_CLAIMS_SCHEMA = 1
+
+# Verified token claims, keyed by SHA-256 digest of the token so raw bearer
+# tokens are never held in memory longer than the request.
+token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -25,17 +43,53 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
+    issued_at = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = issued_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for server-side revocation on logout; iat
+    # lets revoke_user() reject every token a user was issued before it
+    to_encode.update({"exp": expire, "iat": issued_at, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def build_profile_claims(user_data: dict) -> dict:
+    """Build the compact profile claim set embedded in access tokens"""
+    return {
+        "v": PROFILE_CLAIMS_SCHEMA,
+        "pv": user_data.get("profile_version", 0),
+        "lvl": user_data.get("current_education_level"),
+        "ts": user_data.get("technical_skills", []),
+        "ss": user_data.get("soft_skills", []),
+        "ci": user_data.get("career_interests", [])
+    }
+
+def create_user_access_token(user_id: str, email: str, user_data: dict) -> str:
+    """Create an access token for a user, with profile claims when enabled"""
+    data = {"user_id": user_id, "email": email}
+    if PROFILE_CLAIMS_ENABLED:
+        data["prf"] = build_profile_claims(user_data)
+    return create_access_token(data)
+
+def _revoked(token_data: TokenData) -> bool:
+    """Whether the token itself, or every token of its user, has been revoked"""
+    if token_data.jti and revocation_store.is_revoked(token_data.jti):
+        return True
+    return revocation_store.is_user_revoked(token_data.user_id, token_data.iat)
+
 def verify_token(token: str, credentials_exception):
     """Verify and decode a JWT token"""
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(digest)
+    if token_data is not None:
+        if token_data.exp > time.time():
+            if _revoked(token_data):
+                raise credentials_exception
+            return token_data
+        token_cache.pop(digest)
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("user_id")
@@ -44,8 +98,26 @@ def verify_token(token: str, credentials_exception):
         if user_id is None or email is None:
             raise credentials_exception
             
-        token_data = TokenData(user_id=user_id, email=email)
-        return token_data
+        profile = payload.get("prf")
+        if not isinstance(profile, dict) or profile.get("v") != PROFILE_CLAIMS_SCHEMA:
+            profile = None
+            
+        token_data = TokenData(
+            user_id=user_id,
+            email=email,
+            jti=payload.get("jti"),
+            exp=payload.get("exp"),
+            iat=payload.get("iat"),
+            profile=profile
+        )
     except JWTError:
         raise credentials_exception
+    
+    if _revoked(token_data):
+        raise credentials_exception
+    
+    # Never keep a token cached past its own expiry
+    if token_data.exp is not None:
+        token_cache.set(digest, token_data, ttl=min(token_cache.ttl, token_data.exp - time.time()))
+    return token_data
 
@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, status
+from auth.jwt_handler import verify_password, get_password_hash
+
+class PasswordHashPool:
+    """
+    Runs bcrypt hashing and verification in a dedicated process pool.
+
+    At most ``max_concurrency`` operations run at once; callers beyond that
+    wait in line, and once ``max_queue`` callers are already waiting new
+    requests are shed with a 429 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def start(self, warm: bool = True):
+        """Create the process pool, spawning every worker up front when warm"""
+        if self._executor is not None:
+            return
+        # Spawn rather than fork: by the time the pool starts the parent may
+        # already hold gRPC threads from the Firestore client.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        if warm:
+            for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+            print(f"✅ Password hashing pool started with {self.workers} workers")
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, please try again shortly",
+                headers={"Retry-After": "1"}
+            )
+        
+        if self._executor is None:
+            self.start(warm=False)
+        
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash off the event loop"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+_workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+password_pool = PasswordHashPool(
+    workers=_workers,
+    max_concurrency=int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(_workers))),
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "100"))
+)
@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from google.cloud.firestore import AsyncClient, SERVER_TIMESTAMP
+from config.database import COLLECTIONS
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit integer keys, using double hashing"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: np.ndarray, capacity: int, error_rate: float) -> "BloomFilter":
+        """Build a filter holding every key of a uint64 array in a few vectorized passes"""
+        bloom = cls(capacity, error_rate)
+        bits = np.zeros(bloom.size, dtype=bool)
+        size = np.uint64(bloom.size)
+        # In slices, so a build in a worker thread never holds the GIL for long
+        for start in range(0, len(keys), 1 << 16):
+            chunk = keys[start:start + (1 << 16)]
+            # Positions stay below 2**37, so the uint64 arithmetic matches add()
+            position = chunk & np.uint64(0xFFFFFFFF)
+            step = (chunk >> np.uint64(32)) | np.uint64(1)
+            for _ in range(bloom.hash_count):
+                bits[position % size] = True
+                position += step
+        bloom._bits = bytearray(np.packbits(bits, bitorder="little").tobytes())
+        bloom.count = len(keys)
+        return bloom
+
+    def add(self, key: int):
+        bits, size = self._bits, self.size
+        position, step = key & 0xFFFFFFFF, (key >> 32) | 1
+        for _ in range(self.hash_count):
+            index = position % size
+            bits[index >> 3] |= 1 << (index & 7)
+            position += step
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        bits, size = self._bits, self.size
+        position, step = key & 0xFFFFFFFF, (key >> 32) | 1
+        for _ in range(self.hash_count):
+            index = position % size
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+class RevocationStore:
+    """
+    In-memory set of revoked token ids (jti), synced from Firestore.
+
+    Lookups hit a Bloom filter first, so the common case of a token that was
+    never revoked is answered without touching the exact set. The exact set
+    rules out Bloom false positives. It is a sorted numpy uint64 array of
+    64-bit jti digests, searched by bisection, plus a small Python set of
+    recent additions that is merged into the array in batches. That is
+    8 bytes per revoked token. Full reloads build the new filter and array in
+    a worker thread and swap them in at once.
+
+    Every token of a user can be revoked at once (on deactivation or
+    deletion) with a per-user cutoff: tokens issued to the user at or before
+    it are rejected. Cutoffs are few and live in a plain dict.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._exact = np.empty(0, dtype=np.uint64)
+        self._recent: Set[int] = set()
+        # Keys added while a full reload is being built, replayed after the swap
+        self._added_during_reload: Optional[List[int]] = None
+        # user_id -> (epoch seconds tokens must be issued after, epoch seconds the cutoff can be dropped)
+        self._users_revoked_before: Dict[str, Tuple[float, float]] = {}
+        self._last_revoked_at: Optional[datetime] = None
+        self._syncs_since_full = 0
+        self.lookups = 0
+        self.bloom_rejections = 0
+        self.revoked_hits = 0
+        self.last_sync_at: Optional[datetime] = None
+
+    @staticmethod
+    def _key(jti: str) -> int:
+        """64-bit digest of a jti"""
+        # Our jtis are uuid4 hex; the last 16 digits are random apart from
+        # the two variant bits
+        if len(jti) == 32:
+            try:
+                # Masked because int() also accepts a sign
+                return int(jti[16:], 16) & 0xFFFFFFFFFFFFFFFF
+            except ValueError:
+                pass
+        return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "big")
+
+    @classmethod
+    def _keys(cls, jtis: Iterable[str]) -> np.ndarray:
+        """Digests of many jtis as a uint64 array"""
+        jtis = list(jtis)
+        digests = None
+        if all(len(jti) == 32 for jti in jtis):
+            # Decode the whole batch at once; whitespace (skipped by fromhex)
+            # shows up as a short result and non-hex digits as ValueError
+            try:
+                digests = bytes.fromhex("".join([jti[16:] for jti in jtis]))
+            except ValueError:
+                pass
+        if digests is None or len(digests) != 8 * len(jtis):
+            digests = b"".join(cls._key(jti).to_bytes(8, "big") for jti in jtis)
+        return np.frombuffer(digests, dtype=">u8").astype(np.uint64)
+
+    def _in_exact(self, key: int) -> bool:
+        if key in self._recent:
+            return True
+        exact = self._exact
+        index = int(exact.searchsorted(np.uint64(key)))
+        return index < len(exact) and int(exact[index]) == key
+
+    def _merge_recent(self):
+        if self._recent:
+            keys = np.sort(np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent)))
+            self._exact = np.insert(self._exact, self._exact.searchsorted(keys), keys)
+            self._recent = set()
+
+    def add(self, jti: str):
+        """Mark a jti as revoked in this process"""
+        key = self._key(jti)
+        if self._added_during_reload is not None:
+            self._added_during_reload.append(key)
+        if self._in_exact(key):
+            return
+        self._recent.add(key)
+        if len(self._recent) >= REVOCATION_MERGE_BATCH:
+            self._merge_recent()
+        if self._bloom.count >= self._bloom.capacity:
+            # Keep the false-positive rate bounded as revocations pile up
+            self._merge_recent()
+            self._bloom = BloomFilter.from_keys(self._exact, self._bloom.capacity * 2, self.error_rate)
+        else:
+            self._bloom.add(key)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Revocation check used by verify_token"""
+        self.lookups += 1
+        key = self._key(jti)
+        if key not in self._bloom:
+            self.bloom_rejections += 1
+            return False
+        if self._in_exact(key):
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def is_user_revoked(self, user_id: str, issued_at: Optional[int]) -> bool:
+        """Whether a token issued to user_id at issued_at falls under a per-user revocation"""
+        cutoff = self._users_revoked_before.get(user_id)
+        # Tokens without an issue time predate every cutoff
+        return cutoff is not None and (issued_at or 0) <= cutoff[0]
+
+    def _merge_user_cutoffs(self, docs):
+        now = time.time()
+        cutoffs = {
+            user_id: cutoff for user_id, cutoff in self._users_revoked_before.items() if cutoff[1] > now
+        }
+        for doc in docs:
+            data = doc.to_dict()
+            cutoff = (data["revoked_before"].timestamp(), data["expires_at"].replace(tzinfo=timezone.utc).timestamp())
+            if cutoff[1] > now and cutoff[0] > cutoffs.get(doc.id, (0.0, 0.0))[0]:
+                cutoffs[doc.id] = cutoff
+        self._users_revoked_before = cutoffs
+
+    def _build(self, jtis: Iterable[str], capacity: int) -> Tuple[BloomFilter, np.ndarray]:
+        exact = np.sort(self._keys(jtis))
+        if len(exact):
+            exact = exact[np.concatenate(([True], exact[1:] != exact[:-1]))]
+        return BloomFilter.from_keys(exact, max(capacity, 2 * len(exact)), self.error_rate), exact
+
+    def _swap(self, bloom: BloomFilter, exact: np.ndarray):
+        self._bloom, self._exact, self._recent = bloom, exact, set()
+
+    def replace(self, jtis: Iterable[str]):
+        """Swap in a freshly loaded revocation list"""
+        self._swap(*self._build(jtis, self._bloom.capacity))
+
+    async def replace_async(self, jtis: Iterable[str]):
+        """replace() with the build in a worker thread, keeping revocations made meanwhile"""
+        self._added_during_reload = []
+        try:
+            bloom, exact = await asyncio.to_thread(self._build, jtis, self._bloom.capacity)
+        except BaseException:
+            self._added_during_reload = None
+            raise
+        added, self._added_during_reload = self._added_during_reload, None
+        self._swap(bloom, exact)
+        for key in added:
+            if not self._in_exact(key):
+                self._recent.add(key)
+                self._bloom.add(key)
+
+    async def revoke(self, db: AsyncClient, jti: str, user_id: str, expires_at: Optional[int]):
+        """Revoke a token here immediately and persist it for other workers"""
+        self.add(jti)
+        await db.collection(COLLECTIONS["REVOKED_TOKENS"]).document(jti).set({
+            "user_id": user_id,
+            "expires_at": datetime.utcfromtimestamp(expires_at) if expires_at else None,
+            "revoked_at": SERVER_TIMESTAMP
+        })
+
+    async def revoke_user(self, db: AsyncClient, user_id: str, expires_at: int):
+        """
+        Revoke every token issued to a user so far, here immediately and for
+        other workers; expires_at is when the last of those tokens expires.
+        """
+        revoked_before = time.time()
+        self._users_revoked_before[user_id] = (revoked_before, float(expires_at))
+        await db.collection(COLLECTIONS["REVOKED_USERS"]).document(user_id).set({
+            "user_id": user_id,
+            "revoked_before": datetime.fromtimestamp(revoked_before, timezone.utc),
+            "expires_at": datetime.utcfromtimestamp(expires_at),
+            "revoked_at": SERVER_TIMESTAMP
+        })
+
+    @staticmethod
+    def _latest_revoked_at(docs) -> Optional[datetime]:
+        revoked = (doc.to_dict().get("revoked_at") for doc in docs)
+        return max((revoked_at for revoked_at in revoked if revoked_at is not None), default=None)
+
+    async def sync(self, db: AsyncClient, full: bool = False):
+        """Pull revocations from Firestore, incrementally unless full or first run"""
+        revoked_ref = db.collection(COLLECTIONS["REVOKED_TOKENS"])
+        users_ref = db.collection(COLLECTIONS["REVOKED_USERS"])
+        
+        if full or self._last_revoked_at is None or self._syncs_since_full >= REVOCATION_FULL_SYNC_EVERY:
+            # A full reload also drops tokens that have expired on their own
+            docs = await revoked_ref.where("expires_at", ">", datetime.utcnow()).select(["revoked_at"]).get()
+            await self.replace_async(doc.id for doc in docs)
+            latest = await asyncio.to_thread(self._latest_revoked_at, docs)
+            # Cutoffs are kept until their tokens have expired, and merged so
+            # a revoke_user() racing the reload is never dropped
+            user_docs = await users_ref.where("expires_at", ">", datetime.utcnow()).get()
+            self._syncs_since_full = 0
+        else:
+            # Overlap the window a little so writes committed out of order aren't missed
+            since = self._last_revoked_at - timedelta(seconds=REVOCATION_SYNC_OVERLAP_SECONDS)
+            docs = await revoked_ref.where("revoked_at", ">=", since).select(["revoked_at"]).get()
+            for doc in docs:
+                self.add(doc.id)
+            latest = self._latest_revoked_at(docs)
+            user_docs = await users_ref.where("revoked_at", ">=", since).get()
+            self._syncs_since_full += 1
+        
+        self._merge_user_cutoffs(user_docs)
+        user_latest = self._latest_revoked_at(user_docs)
+        if user_latest is not None and (latest is None or user_latest > latest):
+            latest = user_latest
+        
+        if latest is not None and (self._last_revoked_at is None or latest > self._last_revoked_at):
+            self._last_revoked_at = latest
+        if self._last_revoked_at is None:
+            # Firestore hands back timezone-aware timestamps
+            self._last_revoked_at = datetime.now(timezone.utc)
+        self.last_sync_at = datetime.utcnow()
+
+    async def run_sync_loop(self, db: AsyncClient, interval: float):
+        """Background task that keeps this process in step with other workers"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync(db)
+            except Exception as e:
+                print(f"⚠️ Token revocation sync failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "revoked": len(self._exact) + len(self._recent),
+            "revoked_users": len(self._users_revoked_before),
+            "bloom_bytes": self._bloom.nbytes,
+            "exact_bytes": self._exact.nbytes,
+            "bloom_capacity": self._bloom.capacity,
+            "lookups": self.lookups,
+            "bloom_rejections": self.bloom_rejections,
+            "revoked_hits": self.revoked_hits,
+            "last_sync_at": self.last_sync_at.isoformat() if self.last_sync_at else None
+        }
+
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "30"))
+REVOCATION_SYNC_OVERLAP_SECONDS = float(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", "60"))
+REVOCATION_FULL_SYNC_EVERY = int(os.getenv("REVOCATION_FULL_SYNC_EVERY", "120"))
+# Recent revocations are merged into the sorted array once this many pile up
+REVOCATION_MERGE_BATCH = 4096
+
+revocation_store = RevocationStore(capacity=int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000")))
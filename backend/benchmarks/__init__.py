@@ -0,0 +1 @@
+# Benchmarks for CareerBridgeAI backend hot paths
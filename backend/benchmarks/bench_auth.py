@@ -0,0 +1,189 @@
+"""
+Microbenchmarks for the authentication hot path.
+
+Each step of an authenticated request is timed in isolation, with Firestore
+replaced by the in-memory stand-in: HTTPBearer extraction, verify_token,
+get_current_user (user cache hit and miss), get_current_active_user,
+get_current_user_claims, create_access_token and bcrypt. Results are p50/p99
+latency and calls/sec on one core.
+
+Save a baseline and compare later runs against it to catch regressions in
+auth/ (exits non-zero when any p50 slows down by more than --tolerance):
+
+    python -m benchmarks.bench_auth --save baseline.json
+    python -m benchmarks.bench_auth --compare baseline.json
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
+
+from auth.dependencies import (
+    security, user_cache, get_current_user, get_current_active_user, get_current_user_claims
+)
+from auth.jwt_handler import (
+    create_access_token, create_user_access_token, build_profile_claims,
+    get_password_hash, verify_password, verify_token, token_cache
+)
+from benchmarks.fake_firestore import FakeFirestore
+from config.database import COLLECTIONS
+
+CREDENTIALS_EXCEPTION = HTTPException(status_code=401, detail="Could not validate credentials")
+USER_ID = "bench_user"
+EMAIL = "bench@example.com"
+USER = {
+    "email": EMAIL,
+    "first_name": "Bench",
+    "is_active": True,
+    "profile_version": 0,
+    "current_education_level": "bachelor",
+    "technical_skills": ["Python", "SQL"],
+    "soft_skills": ["Communication"],
+    "career_interests": ["Technology"]
+}
+
+results: Dict[str, Dict[str, float]] = {}
+
+
+def record(name: str, samples):
+    samples.sort()
+    result = {
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000,
+        "ops_per_sec": 1e9 / statistics.fmean(samples)
+    }
+    results[name] = result
+    print(f"{name:<36} {result['p50_us']:>10.1f} {result['p99_us']:>10.1f} {result['ops_per_sec']:>12.0f}")
+
+
+def measure(name: str, fn: Callable[[], object], iterations: int):
+    """Time a synchronous call"""
+    for _ in range(min(100, iterations)):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    record(name, samples)
+
+
+async def measure_async(name: str, fn: Callable[[], Awaitable[object]], iterations: int):
+    """Time an awaited call on the running event loop"""
+    for _ in range(min(100, iterations)):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        await fn()
+        samples.append(time.perf_counter_ns() - start)
+    record(name, samples)
+
+
+def bearer_request(token: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/auth/profile",
+        "headers": [(b"authorization", f"Bearer {token}".encode())]
+    })
+
+
+async def run_async_benchmarks(iterations: int, token: str, claims_token: str):
+    db = FakeFirestore()
+    db.data[COLLECTIONS["USERS"]] = {USER_ID: dict(USER)}
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    claims_credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=claims_token)
+    request = bearer_request(token)
+
+    await measure_async("HTTPBearer extraction", lambda: security(request), iterations)
+
+    async def user_cache_miss():
+        user_cache.clear()
+        return await get_current_user(credentials, db)
+
+    await measure_async("get_current_user (cache miss)", user_cache_miss, iterations)
+    await measure_async("get_current_user (cache hit)", lambda: get_current_user(credentials, db), iterations)
+
+    async def active_user():
+        return await get_current_active_user(await get_current_user(credentials, db))
+
+    await measure_async("get_current_active_user", active_user, iterations)
+    await measure_async("get_current_user_claims", lambda: get_current_user_claims(claims_credentials, db), iterations)
+
+    async def claims_cold():
+        # Claims never consult the user cache or Firestore
+        user_cache.clear()
+        return await get_current_user_claims(claims_credentials, db)
+
+    round_trips = db.round_trips
+    await measure_async("get_current_user_claims (cache cold)", claims_cold, iterations)
+    assert db.round_trips == round_trips, "get_current_user_claims read the user document"
+
+    async def full_path():
+        extracted = await security(bearer_request(token))
+        return await get_current_active_user(await get_current_user(extracted, db))
+
+    await measure_async("full path (bearer -> active user)", full_path, iterations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--bcrypt-iterations", type=int, default=20)
+    parser.add_argument("--save", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Compare p50 against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    token = create_access_token({"user_id": USER_ID, "email": EMAIL})
+    claims_token = create_access_token({"user_id": USER_ID, "email": EMAIL, "prf": build_profile_claims(USER)})
+
+    print(f"{'benchmark':<36} {'p50 (µs)':>10} {'p99 (µs)':>10} {'ops/s/core':>12}")
+    measure("create_access_token", lambda: create_access_token({"user_id": USER_ID, "email": EMAIL}), args.iterations)
+    measure("create_user_access_token", lambda: create_user_access_token(USER_ID, EMAIL, USER), args.iterations)
+
+    def uncached():
+        token_cache.clear()
+        verify_token(token, CREDENTIALS_EXCEPTION)
+
+    measure("verify_token (uncached)", uncached, args.iterations)
+    measure("verify_token (cached)", lambda: verify_token(token, CREDENTIALS_EXCEPTION), args.iterations)
+
+    asyncio.run(run_async_benchmarks(args.iterations, token, claims_token))
+
+    hashed = get_password_hash("correct horse battery staple")
+    measure("bcrypt hash", lambda: get_password_hash("correct horse battery staple"), args.bcrypt_iterations)
+    measure("bcrypt verify", lambda: verify_password("correct horse battery staple", hashed), args.bcrypt_iterations)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = [
+            (name, baseline[name]["p50_us"], result["p50_us"])
+            for name, result in results.items()
+            if name in baseline and result["p50_us"] > baseline[name]["p50_us"] * (1 + args.tolerance)
+        ]
+        for name, before, after in regressions:
+            print(f"❌ {name}: p50 {before:.1f}µs -> {after:.1f}µs")
+        if regressions:
+            sys.exit(1)
+        print("✅ No p50 regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
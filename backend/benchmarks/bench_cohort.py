@@ -0,0 +1,89 @@
+"""
+Per-student cost and latency of cohort (batched) versus single-mode generation.
+
+Generates recommendations for a cohort of distinct random profiles through
+GeminiService.generate_cohort_recommendations_async against the fake Gemini
+server, once per batch size. Batch size 1 is single mode: one prompt per
+student. Reports wall time, upstream calls and, per student, latency
+percentiles and the tokens and estimated cost attributed to them.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cohort --students 40 --batch-sizes 1,5,10 --drop-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+
+import httpx
+
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+
+from benchmarks.fake_gemini_server import create_app
+from models.assessment import CAREER_QUESTIONS
+from services.gemini_client import GeminiClient
+from services.gemini_service import GeminiService
+
+
+def random_profile(rng: random.Random):
+    answers = {}
+    for question in CAREER_QUESTIONS:
+        options = question["options"]
+        if question["type"] == "multiple":
+            answers[str(question["id"])] = rng.sample(options, rng.randint(1, 3))
+        else:
+            answers[str(question["id"])] = rng.choice(options)
+    return answers
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def run(args, cohort, batch_size):
+    app = create_app(latency=args.latency, jitter=0.1, drop_rate=args.drop_rate)
+    service = GeminiService(cache=None)
+    await service.client.aclose()
+    service.client = GeminiClient(
+        api_key="fake", base_url="http://fake-gemini", deadline=60,
+        max_concurrency=args.concurrency, transport=httpx.ASGITransport(app=app)
+    )
+
+    start = time.perf_counter()
+    results = await service.generate_cohort_recommendations_async(cohort, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    await service.client.aclose()
+
+    usage = [result["usage"] for result in results]
+    latencies = [entry["latency_ms"] for entry in usage]
+    cost = sum(entry["cost_usd"] for entry in usage) / len(usage)
+    tokens = sum(entry["prompt_tokens"] + entry["output_tokens"] for entry in usage) / len(usage)
+    modes = Counter(entry["mode"] for entry in usage)
+    label = "single" if batch_size == 1 else f"batch {batch_size}"
+    print(f"{label:<10} wall {elapsed:6.2f}s  calls {app.state.calls:4d}  "
+          f"latency p50 {percentile(latencies, 0.5):7.0f}ms p95 {percentile(latencies, 0.95):7.0f}ms  "
+          f"tokens/student {tokens:6.0f}  cost ${cost * 1000:.3f}/1k students  {dict(modes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=40)
+    parser.add_argument("--batch-sizes", default="1,5,10", help="Comma-separated; 1 is single mode")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mean single-student response time in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of students the model leaves out")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent upstream calls")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cohort = [random_profile(rng) for _ in range(args.students)]
+    print(f"{args.students} students, {len({str(sorted(p.items())) for p in cohort})} distinct profiles")
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        asyncio.run(run(args, cohort, batch_size))
+
+
+if __name__ == "__main__":
+    main()
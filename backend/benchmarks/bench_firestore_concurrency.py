@@ -0,0 +1,71 @@
+"""
+Concurrency scaling of authenticated requests on a single worker.
+
+Lists assessments through the real router in-process against the in-memory
+Firestore stand-in with a fixed per-round-trip latency, once with the round
+trip blocking the event loop (the old synchronous client) and once awaiting
+it (AsyncClient).
+
+Usage (from backend/):
+    python -m benchmarks.bench_firestore_concurrency --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from auth.jwt_handler import create_access_token
+from benchmarks.fake_firestore import FakeFirestore
+from config.database import get_db, COLLECTIONS
+from routers import assessments
+
+USER_ID = "bench_user"
+EMAIL = "bench@example.com"
+
+
+def build_app(fake_db: FakeFirestore) -> FastAPI:
+    app = FastAPI()
+    app.include_router(assessments.router, prefix="/api/assessments")
+    app.dependency_overrides[get_db] = lambda: fake_db
+    return app
+
+
+async def run(concurrency: int, requests: int, latency: float, blocking: bool) -> float:
+    fake_db = FakeFirestore(latency=latency, blocking=blocking)
+    fake_db.data[COLLECTIONS["USERS"]] = {
+        USER_ID: {"email": EMAIL, "first_name": "Bench", "is_active": True}
+    }
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': USER_ID, 'email': EMAIL})}"}
+    transport = httpx.ASGITransport(app=build_app(fake_db))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/api/assessments/", headers=headers)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="Firestore round trip in seconds")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    print(f"Firestore latency {args.latency * 1000:.0f}ms, {args.requests} requests per run")
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14} {'speedup':>9}")
+    for concurrency in args.concurrency:
+        blocking = asyncio.run(run(concurrency, args.requests, args.latency, blocking=True))
+        non_blocking = asyncio.run(run(concurrency, args.requests, args.latency, blocking=False))
+        print(f"{concurrency:>12} {blocking:>16.1f} {non_blocking:>14.1f} {non_blocking / blocking:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency, queueing and event-loop responsiveness of the async Gemini client.
+
+Fires a burst of concurrent generations at the fake Gemini server (in
+process by default, or a running one via --base-url) and reports upstream
+latency and queue-wait percentiles, retries and timeouts, plus the worst
+event-loop stall observed while the burst was in flight.
+
+Usage (from backend/):
+    python -m benchmarks.bench_gemini_client --requests 64 --latency 0.5 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.fake_gemini_server import create_app
+from services.gemini_client import GeminiClient
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(args):
+    transport = None
+    if not args.base_url:
+        transport = httpx.ASGITransport(app=create_app(
+            latency=args.latency, error_rate=args.error_rate, hang_rate=args.hang_rate
+        ))
+    client = GeminiClient(
+        api_key="fake",
+        base_url=args.base_url or "http://fake-gemini",
+        deadline=args.deadline,
+        max_concurrency=args.concurrency,
+        max_retries=args.retries,
+        backoff_base=0.05,
+        transport=transport
+    )
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_loop_lag(stop))
+
+    async def one():
+        try:
+            await client.generate_content("prompt")
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_lag = await lag
+    await client.aclose()
+
+    print(f"{sum(outcomes)}/{len(outcomes)} succeeded in {elapsed:.2f}s "
+          f"({len(outcomes) / elapsed:.1f} calls/s, concurrency limit {args.concurrency})")
+    print(f"worst event-loop stall: {worst_lag * 1000:.1f}ms")
+    print(json.dumps(client.stats(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--deadline", type=float, default=10.0)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--base-url", help="Use a running fake server instead of the in-process one")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
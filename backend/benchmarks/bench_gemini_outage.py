@@ -0,0 +1,101 @@
+"""
+Recommendation latency while Gemini is down, with and without the circuit breaker.
+
+Sends waves of concurrent recommendation requests through GeminiService at a
+fake Gemini server that fails (or hangs) every call, then brings it back and
+shows the breaker probing half-open and closing again. Reports p50/p99/max
+request latency per phase and how each request was answered.
+
+Usage (from backend/):
+    python -m benchmarks.bench_gemini_outage --mode hang --deadline 2
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+os.environ.setdefault("GEMINI_API_KEY", "fake")
+
+from benchmarks.fake_gemini_server import create_app
+from services.circuit_breaker import CircuitBreaker
+from services.gemini_client import GeminiClient
+from services.gemini_service import GeminiService
+
+ANSWERS = [
+    {"1": level, "2": ["Technology/Software Development"], "3": "2-3 years (Junior)", "4": "Remote work", "5": [skill]}
+    for level in ("High School", "Bachelor's Degree", "Master's Degree")
+    for skill in ("Programming/Coding", "Communication", "Leadership", "Data Analysis")
+]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def phase(service, name, waves, per_wave):
+    latencies = []
+    outcomes = Counter()
+    for wave in range(waves):
+        async def one(i):
+            start = time.perf_counter()
+            result = await service.generate_course_recommendations_async(ANSWERS[(wave * per_wave + i) % len(ANSWERS)])
+            latencies.append(time.perf_counter() - start)
+            outcomes["gemini" if result["success"] else result.get("fallback", "fallback")] += 1
+        await asyncio.gather(*(one(i) for i in range(per_wave)))
+    print(f"{name:<28} p50 {percentile(latencies, 0.5) * 1000:8.1f}ms  p99 {percentile(latencies, 0.99) * 1000:8.1f}ms  "
+          f"max {max(latencies) * 1000:8.1f}ms  {dict(outcomes)}  circuit={service.breaker.state}")
+
+
+async def run(args, with_breaker):
+    app = create_app(latency=args.latency, jitter=0.1)
+    service = GeminiService(cache=None)
+    await service.client.aclose()
+    service.client = GeminiClient(
+        api_key="fake", base_url="http://fake-gemini", deadline=args.deadline,
+        max_retries=1, backoff_base=0.05, transport=httpx.ASGITransport(app=app)
+    )
+    service.breaker = CircuitBreaker(
+        "gemini", slow_call_seconds=args.deadline * 0.8, window=10, min_calls=5,
+        open_seconds=args.open_seconds, half_open_calls=2
+    )
+    if not with_breaker:
+        service.breaker.min_calls = float("inf")
+
+    print(f"--- {'with' if with_breaker else 'without'} circuit breaker ---")
+    await phase(service, "healthy", 2, args.concurrency)
+
+    outage = create_app(
+        latency=args.latency, jitter=0.1,
+        error_rate=1.0 if args.mode == "errors" else 0.0,
+        hang_rate=1.0 if args.mode == "hang" else 0.0
+    )
+    service.client._http._transport = httpx.ASGITransport(app=outage)
+    await phase(service, f"outage ({args.mode})", args.waves, args.concurrency)
+
+    service.client._http._transport = httpx.ASGITransport(app=app)
+    await asyncio.sleep(args.open_seconds if with_breaker else 0)
+    await phase(service, "recovered", 3, args.concurrency)
+    print(service.breaker.stats())
+    await service.client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["errors", "hang"], default="hang")
+    parser.add_argument("--latency", type=float, default=0.3, help="Healthy Gemini latency in seconds")
+    parser.add_argument("--deadline", type=float, default=2.0)
+    parser.add_argument("--open-seconds", type=float, default=2.0)
+    parser.add_argument("--waves", type=int, default=6)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(run(args, with_breaker=False))
+    asyncio.run(run(args, with_breaker=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Correctness and speed of recommendation JSON extraction from model output.
+
+Runs the corpus in benchmarks/llm_output_corpus.py through the previous
+greedy-regex parser and through JSONStreamExtractor, reporting how many
+outputs each recovers correctly and the time per output, overall and by
+kind of output. The extractor matches the regex on well-formed output; it
+spends more on truncated and abandoned drafts, where it decodes the partial
+candidate before recovering the later document. With --fuzz, every
+case is also fed to the extractor in random chunk sizes, and the run checks
+that the streamed document and courses match the one-shot result (and that
+every streamed course passes the schema).
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_extraction --fuzz 20
+"""
+import argparse
+import json
+import random
+import re
+import time
+from collections import defaultdict
+
+from benchmarks.llm_output_corpus import build_corpus
+from services.json_stream import JSONStreamExtractor, extract_json_object
+from services.recommendation_schema import validate_course, validate_recommendations
+
+
+def greedy_regex(text):
+    """The parser this replaced: first '{' to last '}' in one greedy match"""
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+
+
+def measure(parse, cases, repeat):
+    correct = 0
+    for _, text, expected in cases:
+        correct += parse(text) == expected
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text, _ in cases:
+            parse(text)
+    elapsed = time.perf_counter() - start
+    return correct, elapsed / (repeat * len(cases))
+
+
+def by_kind(parsers, cases, repeat):
+    """Microseconds per output for each parser, grouped by the case name without its index"""
+    kinds = defaultdict(list)
+    for case in cases:
+        kinds[case[0].rsplit("-", 1)[0]].append(case)
+    print(f"{'kind':<18} " + " ".join(f"{name:>18}" for name, _ in parsers))
+    for kind, group in kinds.items():
+        times = [measure(parse, group, repeat)[1] for _, parse in parsers]
+        print(f"{kind:<18} " + " ".join(f"{per_case * 1e6:15.1f} us" for per_case in times))
+
+
+def fuzz(cases, rounds, seed):
+    rng = random.Random(seed)
+    for name, text, _ in cases:
+        whole = JSONStreamExtractor(array_key="courses", item_validator=validate_course)
+        expected_courses = whole.feed(text)
+        for _ in range(rounds):
+            extractor = JSONStreamExtractor(array_key="courses", item_validator=validate_course)
+            courses, i = [], 0
+            while i < len(text):
+                size = rng.choice([1, 2, 3, rng.randint(4, 64)])
+                courses += extractor.feed(text[i:i + size])
+                i += size
+            assert extractor.document == whole.document, f"{name}: document differs when streamed"
+            assert courses == expected_courses, f"{name}: courses differ when streamed"
+            assert all(not validate_course(course) for course in courses), f"{name}: invalid course emitted"
+    print(f"fuzz: {len(cases) * rounds} chunked runs matched the one-shot result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fuzz", type=int, default=0, help="Random chunkings per case")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    cases = build_corpus()
+    print(f"{len(cases)} model outputs, {sum(len(text) for _, text, _ in cases) / len(cases):,.0f} chars on average")
+    parsers = (("greedy regex", greedy_regex), ("stream extractor", extract_json_object))
+    for name, parse in parsers:
+        correct, per_case = measure(parse, cases, args.repeat)
+        print(f"{name:<18} {correct}/{len(cases)} correct  {per_case * 1e6:8.1f} us/output")
+    by_kind(parsers, cases, args.repeat)
+
+    invalid = [name for name, _, expected in cases if expected is not None and validate_recommendations(expected)]
+    print(f"schema: {len(cases) - len(invalid)}/{len(cases)} expected documents valid {invalid[:3] if invalid else ''}")
+
+    if args.fuzz:
+        fuzz(cases, args.fuzz, args.seed)
+
+
+if __name__ == "__main__":
+    main()
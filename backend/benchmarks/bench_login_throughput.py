@@ -0,0 +1,90 @@
+"""
+Login throughput per core with bcrypt running in the password hashing pool.
+
+Drives /api/auth/login in-process against the in-memory Firestore stand-in,
+first with bcrypt inline on the event loop (the old behaviour) and then
+through PasswordHashPool with an increasing number of worker processes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_throughput --logins 64
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from auth.jwt_handler import get_password_hash, verify_password
+from auth.password_pool import PasswordHashPool
+from benchmarks.fake_firestore import FakeFirestore
+from config.database import get_db, COLLECTIONS
+from routers import auth
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+class InlineHasher:
+    """Stand-in for the pool that hashes on the event loop thread"""
+
+    async def hash(self, password):
+        return get_password_hash(password)
+
+    async def verify(self, plain_password, hashed_password):
+        return verify_password(plain_password, hashed_password)
+
+
+def build_app() -> FastAPI:
+    fake_db = FakeFirestore()
+    fake_db.data[COLLECTIONS["USERS"]] = {
+        "bench_user": {"email": EMAIL, "password": get_password_hash(PASSWORD), "is_active": True}
+    }
+    fake_db.data[COLLECTIONS["EMAILS"]] = {auth.email_index_key(EMAIL): {"user_id": "bench_user"}}
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+    app.dependency_overrides[get_db] = lambda: fake_db
+    return app
+
+
+async def run(app: FastAPI, logins: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(logins)))
+        return logins / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, max(1, (os.cpu_count() or 1) // 2), os.cpu_count() or 1}))
+    args = parser.parse_args()
+    app = build_app()
+
+    print(f"{args.logins} concurrent logins, {os.cpu_count()} CPUs")
+    print(f"{'mode':>10} {'logins/s':>10} {'logins/s/core':>14}")
+
+    auth.password_pool = InlineHasher()
+    rate = asyncio.run(run(app, args.logins))
+    print(f"{'inline':>10} {rate:>10.1f} {rate:>14.1f}")
+
+    for workers in args.workers:
+        pool = PasswordHashPool(workers=workers, max_concurrency=workers, max_queue=args.logins)
+        pool.start()
+        auth.password_pool = pool
+        try:
+            rate = asyncio.run(run(app, args.logins))
+        finally:
+            pool.shutdown()
+        print(f"{f'pool x{workers}':>10} {rate:>10.1f} {rate / workers:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
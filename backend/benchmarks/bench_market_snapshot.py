@@ -0,0 +1,133 @@
+"""
+Market endpoint queries over the memory-mapped Arrow snapshot.
+
+Exports a synthetic snapshot (scripts/export_market_snapshot.py), maps it
+and times each endpoint query as a vectorized scan. Each result is checked
+against a row-by-row Python scan of the same rows, which is also timed.
+Reports how long mapping takes and how much heap Arrow allocated for it
+(zero-copy mapping keeps the pages in the shared page cache).
+With --live, the same queries also run against BigQuery (needs credentials).
+
+Usage (from backend/):
+    python -m benchmarks.bench_market_snapshot --rows 200000
+    python -m benchmarks.bench_market_snapshot --rows 200000 --live
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pyarrow as pa
+
+from scripts.export_market_snapshot import synthetic_tables, write_snapshot
+from services.market_snapshot import MarketSnapshot, SORT_KEYS, REQUIRED_COLUMNS
+from services.market_data import EMERGING_MIN_GROWTH_RATE
+
+
+def latest(rows, keys):
+    seen, out = set(), []
+    for row in rows:
+        key = tuple(row[k] for k in keys)
+        if key not in seen:
+            seen.add(key)
+            out.append(row)
+    return out
+
+
+def plain(row, columns):
+    return {column: row[column].isoformat() if isinstance(row[column], date) else row[column] for column in columns}
+
+
+def rowwise_trends(rows, location, days, industry):
+    since = date.today() - timedelta(days=days)
+    hits = latest([r for r in rows if r["location"] == location and r["date"] >= since], SORT_KEYS["job_trends"])
+    if industry:
+        hits = [r for r in hits if industry.lower() in r["industry"].lower()]
+    hits.sort(key=lambda r: r["demand_score"], reverse=True)
+    columns = ["job_title", "industry", "demand_score", "growth_rate", "average_salary", "skill_requirements", "date"]
+    return [plain(r, columns) for r in hits[:500]]
+
+
+def rowwise_skills(rows, location, skills):
+    wanted = {s.lower() for s in skills}
+    hits = latest([r for r in rows if r["location"] == location and r["skill_name"].lower() in wanted], SORT_KEYS["skill_demand"])
+    hits.sort(key=lambda r: r["demand_score"], reverse=True)
+    columns = ["skill_name", "demand_score", "growth_rate", "average_salary_impact", "job_titles", "industries", "date"]
+    return [plain(r, columns) for r in hits]
+
+
+def rowwise_salary(rows, job_title, location, experience):
+    hits = [r for r in rows if r["location"] == location and r["experience_level"] == experience
+            and r["job_title"].lower() == job_title.lower()]
+    return [plain(r, REQUIRED_COLUMNS["salary_data"]) for r in latest(hits, SORT_KEYS["salary_data"])]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per table")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="Also time the same queries on BigQuery")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "market_snapshot")
+        start = time.perf_counter()
+        write_snapshot(synthetic_tables(args.rows), path, source="synthetic")
+        print(f"exported {args.rows} rows per table in {time.perf_counter() - start:.1f}s")
+
+        allocated = pa.total_allocated_bytes()
+        start = time.perf_counter()
+        snapshot = MarketSnapshot(path)
+        print(f"mapped {snapshot.stats()['mapped_bytes'] / 2**20:.1f} MiB in {(time.perf_counter() - start) * 1000:.1f}ms, "
+              f"heap allocated by Arrow: {(pa.total_allocated_bytes() - allocated) / 2**10:.0f} KiB")
+
+        rows = {name: snapshot.tables[name].to_pylist() for name in ("job_trends", "skill_demand", "salary_data")}
+        cases = [
+            ("trends 1Y India", lambda: snapshot.job_trends("India", 365, None),
+             lambda: rowwise_trends(rows["job_trends"], "India", 365, None)),
+            ("trends 1Y Mumbai tech", lambda: snapshot.job_trends("Mumbai", 365, "tech"),
+             lambda: rowwise_trends(rows["job_trends"], "Mumbai", 365, "tech")),
+            ("skills Python,SQL", lambda: snapshot.skill_demand("India", ["Python", "SQL", "Go"]),
+             lambda: rowwise_skills(rows["skill_demand"], "India", ["Python", "SQL", "Go"])),
+            ("salary", lambda: snapshot.salary_insights("data scientist", "Pune", "2-5"),
+             lambda: rowwise_salary(rows["salary_data"], "data scientist", "Pune", "2-5")),
+            ("emerging roles 6M", lambda: snapshot.emerging_roles(180, EMERGING_MIN_GROWTH_RATE), None),
+        ]
+        for name, columnar, rowwise in cases:
+            result, columnar_time = timed(columnar, args.repeat)
+            line = f"{name:<24} arrow {columnar_time * 1000:8.2f}ms  ({len(result)} rows)"
+            if rowwise is not None:
+                expected, rowwise_time = timed(rowwise, max(1, args.repeat // 5))
+                assert result == expected, f"{name}: arrow result differs from the row-wise scan"
+                line += f"  row-wise {rowwise_time * 1000:8.2f}ms  ({rowwise_time / columnar_time:5.1f}x)"
+            print(line)
+
+        if args.live:
+            from config.bigquery import initialize_bigquery
+            from services.market_data import run_bigquery
+
+            initialize_bigquery()
+            for query, params in [("trends", {"location": "India", "days": 365}), ("skills", {"location": "India"}),
+                                  ("salary", {"location": "India"}),
+                                  ("emerging_roles", {"days": 180, "min_growth": EMERGING_MIN_GROWTH_RATE})]:
+                start = time.perf_counter()
+                live_rows = asyncio.run(run_bigquery(query, params))
+                print(f"live {query:<19} bigquery {(time.perf_counter() - start) * 1000:8.0f}ms  ({len(live_rows)} rows)")
+
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
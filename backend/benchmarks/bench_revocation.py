@@ -0,0 +1,84 @@
+"""
+Memory and lookup cost of the token revocation store.
+
+Loads N revoked jtis into a RevocationStore and reports the memory held by
+the Bloom filter and the exact array, lookup latency for revoked and
+never-revoked tokens, and the Bloom false-positive rate. It then reloads
+the list through replace_async while a ticker runs on the event loop, and
+reports the longest stall the ticker saw.
+
+Usage (from backend/):
+    python -m benchmarks.bench_revocation --revoked 1000000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from auth.revocation import RevocationStore
+
+
+def time_lookups(store: RevocationStore, jtis) -> float:
+    start = time.perf_counter_ns()
+    for jti in jtis:
+        store.is_revoked(jti)
+    return (time.perf_counter_ns() - start) / len(jtis) / 1000
+
+
+async def reload_stall(store: RevocationStore, jtis):
+    """Time replace_async and the longest gap between 1ms ticks on the loop meanwhile"""
+    stall = 0.0
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await store.replace_async(jtis)
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    return elapsed, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revoked", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    revoked = [uuid.uuid4().hex for _ in range(args.revoked)]
+    fresh = [uuid.uuid4().hex for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    store = RevocationStore(capacity=args.revoked, error_rate=args.error_rate)
+    store.replace(revoked)
+    load_seconds = time.perf_counter() - start
+
+    stats = store.stats()
+    print(f"revoked tokens:        {stats['revoked']:,}")
+    print(f"load time:             {load_seconds:.2f}s")
+    print(f"bloom filter:          {stats['bloom_bytes'] / 2**20:.2f} MiB")
+    print(f"exact array:           {stats['exact_bytes'] / 2**20:.2f} MiB")
+
+    revoked_us = time_lookups(store, revoked[:args.lookups])
+    store.bloom_rejections = 0
+    fresh_us = time_lookups(store, fresh)
+    false_positives = len(fresh) - store.bloom_rejections
+    print(f"lookup (revoked):      {revoked_us:.2f} µs")
+    print(f"lookup (not revoked):  {fresh_us:.2f} µs")
+    print(f"bloom false positives: {false_positives / len(fresh):.4%}")
+
+    reload_seconds, stall = asyncio.run(reload_stall(store, revoked))
+    print(f"threaded reload:       {reload_seconds:.2f}s, longest event loop stall {stall * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Top-k role matching latency as the role catalog grows.
+
+Builds synthetic role catalogs of each size (skill requirements drawn from a
+vocabulary with a few very common skills and a long tail) and matches random
+user profiles against them with RoleMatcher.top. Each is compared with a
+plain Python pass that intersects skill sets role by role and sorts the
+whole catalog, and the top roles are checked to be the same.
+
+Usage (from backend/):
+    python -m benchmarks.bench_role_matcher --roles 1000,10000,50000 --limit 10
+"""
+import argparse
+import random
+import statistics
+import time
+
+from scripts.export_market_snapshot import INDUSTRIES
+from services.role_matcher import INTEREST_INDUSTRIES, SKILL_WEIGHT, RoleMatcher
+from services.skill_index import fold
+
+
+def catalog(count: int, vocabulary: list, rng: random.Random):
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [
+        {
+            "job_title": f"Role {i}",
+            "industry": rng.choice(INDUSTRIES),
+            "demand_score": round(1 - i / count, 6),
+            "average_salary": rng.randint(3, 40) * 50000,
+            "skill_requirements": list(dict.fromkeys(rng.choices(vocabulary, weights, k=rng.randint(3, 8))))
+        }
+        for i in range(count)
+    ]
+
+
+def profile(vocabulary: list, rng: random.Random):
+    skills = rng.sample(vocabulary[:200], rng.randint(3, 10)) + rng.sample(vocabulary, rng.randint(0, 5))
+    return skills, rng.sample(list(INTEREST_INDUSTRIES), rng.randint(1, 3))
+
+
+def python_top(roles, skills, interests, limit):
+    user_skills = {fold(skill) for skill in skills}
+    industries = {fold(name) for interest in interests for name in INTEREST_INDUSTRIES[interest]}
+    scored = []
+    for position, role in enumerate(roles):
+        required = {fold(skill) for skill in role["skill_requirements"]}
+        coverage = len(required & user_skills) / max(len(required), 1)
+        score = round(100 * (SKILL_WEIGHT * coverage + (1 - SKILL_WEIGHT) * (fold(role["industry"]) in industries)))
+        scored.append((-score, position))
+    scored.sort()
+    return [(roles[position]["job_title"], -score) for score, position in scored[:limit]]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", default="1000,10000,50000", help="Comma-separated catalog sizes")
+    parser.add_argument("--vocabulary", type=int, default=2000, help="Distinct skills across the catalog")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"Skill {i}" for i in range(args.vocabulary)]
+    users = [profile(vocabulary, rng) for _ in range(args.users)]
+
+    for size in (int(count) for count in args.roles.split(",")):
+        roles = catalog(size, vocabulary, rng)
+        start = time.perf_counter()
+        matcher = RoleMatcher(roles)
+        build = time.perf_counter() - start
+
+        samples = []
+        for skills, interests in users:
+            start = time.perf_counter()
+            top = matcher.top(skills, interests, args.limit)
+            samples.append(time.perf_counter() - start)
+
+        baseline = []
+        for skills, interests in users[:20]:
+            start = time.perf_counter()
+            expected = python_top(roles, skills, interests, args.limit)
+            baseline.append(time.perf_counter() - start)
+            found = [(match["job_title"], match["match_score"]) for match in matcher.top(skills, interests, args.limit)]
+            assert found == expected, f"{size} roles: matcher top {args.limit} differs from the Python pass"
+
+        print(f"{size:6d} roles  build {build * 1000:7.1f}ms  {matcher.stats()['bitset_bytes'] / 2**10:7.0f} KiB  "
+              f"match p50 {percentile(samples, 0.5) * 1000:6.2f}ms p99 {percentile(samples, 0.99) * 1000:6.2f}ms  "
+              f"python pass p50 {statistics.median(baseline) * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
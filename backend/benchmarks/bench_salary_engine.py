@@ -0,0 +1,97 @@
+"""
+Salary statistics from raw observations: SalaryEngine versus a per-request scan.
+
+Generates synthetic salary observations (scripts/export_market_snapshot.py)
+and indexes them twice, once with every group's summary precomputed and once
+with none. Then it times single lookups through each engine, a multi-title
+comparison in one call versus one call per title, and the per-request
+baseline: mask the raw arrays for the key and run numpy.percentile. Engine
+results are checked against that baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_salary_engine --observations 5000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+import pyarrow.compute as pc
+
+from scripts.export_market_snapshot import LEVELED_TITLES, LOCATIONS, synthetic_salary_observations
+from services.salary_engine import EXPERIENCE_BANDS, PERCENTILES, SalaryEngine, _BAND_EDGES
+
+
+def timed(fn, calls):
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--observations", type=int, default=5000000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=50, help="Lookups timed for the per-request scan")
+    parser.add_argument("--compare", type=int, default=10, help="Titles per comparison")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = synthetic_salary_observations(args.observations, args.seed)
+    print(f"generated {args.observations} observations in {time.perf_counter() - start:.1f}s")
+
+    computed = SalaryEngine(table, precompute=0)
+    precomputed = SalaryEngine(table, precompute=computed.stats()["groups"])
+    print(f"indexed {computed.stats()['groups']} groups in {computed.build_ms:.0f}ms "
+          f"({precomputed.build_ms:.0f}ms with every summary precomputed)")
+
+    titles = pc.dictionary_encode(table["job_title"].combine_chunks())
+    locations = pc.dictionary_encode(table["location"].combine_chunks())
+    title_codes = titles.indices.to_numpy()
+    location_codes = locations.indices.to_numpy()
+    bands = np.searchsorted(_BAND_EDGES, table["years_experience"].to_numpy(), side="right")
+    salaries = table["salary"].to_numpy()
+    title_index = {title: i for i, title in enumerate(titles.dictionary.to_pylist())}
+    location_index = {location: i for i, location in enumerate(locations.dictionary.to_pylist())}
+
+    def scan(title, location, experience):
+        values = salaries[(title_codes == title_index[title]) & (location_codes == location_index[location])
+                          & (bands == EXPERIENCE_BANDS.index(experience))]
+        return {
+            "min_salary": values.min(), "max_salary": values.max(), "average_salary": values.mean(),
+            **dict(zip(PERCENTILES, np.percentile(values, [q * 100 for q in PERCENTILES.values()]))),
+            "sample_size": len(values)
+        }
+
+    rng = random.Random(args.seed)
+    keys = [(rng.choice(LEVELED_TITLES), rng.choice(LOCATIONS), rng.choice(EXPERIENCE_BANDS)) for _ in range(args.lookups)]
+
+    for title, location, experience in keys[:args.scans]:
+        expected = scan(title, location, experience)
+        row = computed.summaries([title], location, experience)[0]
+        assert row == precomputed.summaries([title], location, experience)[0]
+        for name, value in expected.items():
+            assert row[name] == np.rint(value), f"{title}/{location}/{experience} {name}: {row[name]} != {value}"
+
+    scan_time = timed(scan, keys[:args.scans])
+    print(f"{'per-request scan':<28} {scan_time * 1e6:10.1f}µs")
+    for name, engine in [("engine, computed", computed), ("engine, precomputed", precomputed)]:
+        lookup = timed(lambda title, location, experience: engine.summaries([title], location, experience), keys)
+        print(f"{name:<28} {lookup * 1e6:10.1f}µs  ({scan_time / lookup:7.0f}x)")
+
+    comparisons = [(rng.sample(LEVELED_TITLES, args.compare), rng.choice(LOCATIONS), rng.choice(EXPERIENCE_BANDS))
+                   for _ in range(args.lookups // args.compare)]
+    batched = timed(computed.summaries, comparisons)
+    one_by_one = timed(lambda titles, location, experience: [computed.summaries([title], location, experience)
+                                                           for title in titles], comparisons)
+    print(f"compare {args.compare} titles, one call   {batched * 1e6:10.1f}µs")
+    print(f"compare {args.compare} titles, per title  {one_by_one * 1e6:10.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
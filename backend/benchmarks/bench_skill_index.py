@@ -0,0 +1,92 @@
+"""
+Skill filtering for /api/career/skills: SkillIndex versus scanning the rows.
+
+Builds a location's worth of synthetic skill rows and times, per request:
+
+- the original filter, which rebuilt the lower-cased request list for every row;
+- a scan against a set of the requested names;
+- SkillIndex.lookup, plus what building the index costs once per result.
+
+The job title and industry reverse lookups are timed against a scan too.
+Every lookup is checked against the scan's rows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skill_index --skills 5000 --requested 1,10,50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from scripts.export_market_snapshot import INDUSTRIES, TITLES
+from services.skill_index import SkillIndex, fold
+
+
+def skill_rows(count: int, rng: random.Random):
+    return [
+        {
+            "skill_name": f"Skill {i}",
+            "demand_score": round(rng.random(), 3),
+            "job_titles": rng.sample(TITLES, 3),
+            "industries": rng.sample(INDUSTRIES, 2)
+        }
+        for i in range(count)
+    ]
+
+
+def original_filter(rows, skills):
+    return [s for s in rows if s["skill_name"].lower() in [sk.lower() for sk in skills]]
+
+
+def set_scan(rows, skills):
+    wanted = {fold(skill) for skill in skills}
+    return [row for row in rows if fold(row["skill_name"]) in wanted]
+
+
+def reverse_scan(rows, job_title, industry):
+    return [
+        row for row in rows
+        if fold(job_title) in map(fold, row["job_titles"]) and fold(industry) in map(fold, row["industries"])
+    ]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=5000, help="Skill rows for the location")
+    parser.add_argument("--requested", default="1,10,50", help="Comma-separated skills-per-request counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = skill_rows(args.skills, rng)
+    index, build = timed(lambda: SkillIndex(rows), args.repeat)
+    print(f"{args.skills} skill rows, index built in {build * 1000:.2f}ms")
+
+    for requested in (int(count) for count in args.requested.split(",")):
+        skills = [f"  skill {rng.randrange(args.skills)} ".upper() for _ in range(requested)]
+        expected, original = timed(lambda: original_filter(rows, [s.strip() for s in skills]), max(1, args.repeat // 5))
+        scanned, scan = timed(lambda: set_scan(rows, skills), args.repeat)
+        found, lookup = timed(lambda: index.lookup(skills), args.repeat)
+        assert found == scanned == expected, f"{requested} skills: index rows differ from the scans"
+        print(f"{requested:3d} skills  original {original * 1000:8.2f}ms  set scan {scan * 1000:7.2f}ms  "
+              f"index {lookup * 1e6:7.1f}µs  ({scan / lookup:5.0f}x vs set scan)")
+
+    job_title, industry = rng.choice(TITLES), rng.choice(INDUSTRIES)
+    scanned, scan = timed(lambda: reverse_scan(rows, job_title, industry), args.repeat)
+    found, lookup = timed(lambda: index.lookup(job_title=job_title, industry=industry), args.repeat)
+    assert found == scanned, "reverse lookup rows differ from the scan"
+    print(f"{job_title} in {industry}: scan {scan * 1000:.2f}ms  index {lookup * 1000:.2f}ms  ({len(found)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+In-memory stand-in for the Firestore AsyncClient used by the benchmarks.
+
+Only the subset of the API that the routers touch is implemented. Every
+round trip sleeps for ``latency`` seconds; with ``blocking=True`` the sleep
+is a ``time.sleep`` so the fake behaves like the synchronous client did
+when it was called from an async handler.
+"""
+import asyncio
+import copy
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.api_core.exceptions import NotFound
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestore", collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def _store(self) -> Dict[str, Dict[str, Any]]:
+        return self._client.data.setdefault(self._collection, {})
+
+    async def get(self, transaction=None) -> FakeSnapshot:
+        await self._client.round_trip()
+        return FakeSnapshot(self, self._store.get(self.id))
+
+    async def set(self, data: Dict[str, Any], merge: bool = False):
+        await self._client.round_trip()
+        if merge and self.id in self._store:
+            self._store[self.id].update(copy.deepcopy(data))
+        else:
+            self._store[self.id] = copy.deepcopy(data)
+
+    async def create(self, data: Dict[str, Any]):
+        await self._client.round_trip()
+        if self.id in self._store:
+            raise ValueError(f"Document {self._collection}/{self.id} already exists")
+        self._store[self.id] = copy.deepcopy(data)
+
+    async def update(self, data: Dict[str, Any]):
+        await self._client.round_trip()
+        if self.id not in self._store:
+            raise NotFound(f"No document to update: {self._collection}/{self.id}")
+        self._store[self.id].update(copy.deepcopy(data))
+
+    async def delete(self):
+        await self._client.round_trip()
+        self._store.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestore", collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List[tuple] = []
+        self._order: Optional[tuple] = None
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    def _copy(self) -> "FakeQuery":
+        query = FakeQuery(self._client, self._collection)
+        query._filters = list(self._filters)
+        query._order = self._order
+        query._limit = self._limit
+        query._offset = self._offset
+        return query
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        if op != "==":
+            raise NotImplementedError(f"Unsupported operator: {op}")
+        query = self._copy()
+        query._filters.append((field, value))
+        return query
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        query = self._copy()
+        query._order = (field, direction == "DESCENDING")
+        return query
+
+    def limit(self, count: int) -> "FakeQuery":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def offset(self, count: int) -> "FakeQuery":
+        query = self._copy()
+        query._offset = count
+        return query
+
+    async def get(self) -> List[FakeSnapshot]:
+        await self._client.round_trip()
+        store = self._client.data.get(self._collection, {})
+        matches = [
+            (doc_id, data) for doc_id, data in store.items()
+            if all(data.get(field) == value for field, value in self._filters)
+        ]
+        if self._order:
+            field, descending = self._order
+            matches.sort(key=lambda item: item[1].get(field), reverse=descending)
+        matches = matches[self._offset:]
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        return [
+            FakeSnapshot(FakeDocumentReference(self._client, self._collection, doc_id), data)
+            for doc_id, data in matches
+        ]
+
+
+class FakeCollectionReference(FakeQuery):
+    def document(self, doc_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._collection, doc_id or uuid.uuid4().hex[:20])
+
+    async def add(self, data: Dict[str, Any]):
+        doc_ref = self.document()
+        await doc_ref.set(data)
+        return time.time(), doc_ref
+
+
+class FakeWriteBatch:
+    def __init__(self, client: "FakeFirestore"):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge: bool = False):
+        self._writes.append(("merge" if merge else "set", reference, data))
+
+    def update(self, reference: FakeDocumentReference, data: Dict[str, Any]):
+        self._writes.append(("update", reference, data))
+
+    async def commit(self):
+        await self._client.round_trip()
+        # Like Firestore, an update of a missing document fails the whole batch
+        for op, reference, _ in self._writes:
+            if op == "update" and reference.id not in reference._store:
+                raise NotFound(f"No document to update: {reference._collection}/{reference.id}")
+        for op, reference, data in self._writes:
+            store = reference._store
+            if op != "set" and reference.id in store:
+                store[reference.id].update(copy.deepcopy(data))
+            else:
+                store[reference.id] = copy.deepcopy(data)
+        self._writes = []
+
+
+class FakeFirestore:
+    def __init__(self, latency: float = 0.0, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.round_trips = 0
+
+    async def round_trip(self):
+        self.round_trips += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def close(self):
+        pass
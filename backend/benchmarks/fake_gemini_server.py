@@ -0,0 +1,144 @@
+"""
+Local fake of the Gemini generateContent and streamGenerateContent REST
+endpoints.
+
+Answers with a realistic recommendation payload (wrapped in a code fence
+with some chatter around it, as the real model tends to do) after a
+configurable latency, and can inject transient 503s and hung requests.
+Streamed responses send the first chunk after a fraction of the latency
+and spread the rest of the text over the remainder.
+
+Cohort prompts (students listed as "STUDENT s1:", "STUDENT s2:", ...) get
+one keyed recommendation object per student; latency grows with the number
+of students, since output length dominates generation time, and
+--drop-rate leaves students out of the answer to exercise the fallback.
+Responses report token usage at roughly four characters per token.
+
+Usage (from backend/):
+    python -m benchmarks.fake_gemini_server --port 8081 --latency 2.0 --error-rate 0.1
+    GEMINI_API_BASE_URL=http://localhost:8081 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SAMPLE_RECOMMENDATIONS = {
+    "career_path": "Full-Stack Software Engineer",
+    "skill_gaps": ["System Design", "Cloud Computing", "Testing"],
+    "courses": [
+        {
+            "title": f"Course {i + 1}",
+            "description": "Hands-on course with projects",
+            "category": "Technical",
+            "difficulty": "Intermediate",
+            "duration": "6 weeks",
+            "platform": "Coursera",
+            "priority": "High",
+            "reason": "Closes a gap between current skills and target role"
+        }
+        for i in range(6)
+    ],
+    "learning_path": "Fundamentals, then frameworks, then a capstone project",
+    "next_steps": ["Pick the first course", "Set a weekly study schedule"]
+}
+
+
+def model_text(recommendations=None) -> str:
+    payload = json.dumps(recommendations or SAMPLE_RECOMMENDATIONS, indent=2)
+    return f"Here are your personalized recommendations:\n```json\n{payload}\n```\nGood luck {{with}} your journey!"
+
+
+def batch_text(students, drop_rate: float = 0.0) -> str:
+    answer = {
+        student: {**SAMPLE_RECOMMENDATIONS, "career_path": f"Career path for {student}"}
+        for student in students
+        if random.random() >= drop_rate
+    }
+    return f"```json\n{json.dumps(answer, indent=2)}\n```"
+
+
+def usage(prompt: str, text: str):
+    return {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+
+
+STREAM_CHUNK_CHARS = 48
+FIRST_CHUNK_FRACTION = 0.15
+# Share of a response's latency that does not grow with output length
+FIXED_LATENCY_FRACTION = 0.3
+BATCH_STUDENT = re.compile(r"^STUDENT (s\d+):", re.MULTILINE)
+
+
+def create_app(latency: float = 1.0, jitter: float = 0.2, error_rate: float = 0.0, hang_rate: float = 0.0,
+               drop_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    async def simulate(duration: float):
+        app.state.calls += 1
+        if random.random() < hang_rate:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(duration)
+        if random.random() < error_rate:
+            return JSONResponse({"error": {"code": 503, "message": "The model is overloaded"}}, status_code=503)
+        return None
+
+    async def stream(prompt: str, text: str, duration: float):
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        for index, chunk in enumerate(chunks):
+            payload = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+            if index == len(chunks) - 1:
+                payload["usageMetadata"] = usage(prompt, text)
+            yield f"data: {json.dumps(payload)}\r\n\r\n"
+            await asyncio.sleep(duration / len(chunks))
+
+    @app.get("/v1beta/models/{model}")
+    async def get_model(model: str):
+        return {"name": f"models/{model}", "supportedGenerationMethods": ["generateContent"]}
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate(model_action: str, request: Request):
+        body = await request.json()
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        students = BATCH_STUDENT.findall(prompt)
+        total = max(0.0, random.gauss(latency, latency * jitter))
+        if students:
+            total *= FIXED_LATENCY_FRACTION + (1 - FIXED_LATENCY_FRACTION) * len(students)
+        text = batch_text(students, drop_rate) if students else model_text()
+        if model_action.endswith(":streamGenerateContent"):
+            error = await simulate(total * FIRST_CHUNK_FRACTION)
+            if error is not None:
+                return error
+            return StreamingResponse(stream(prompt, text, total * (1 - FIRST_CHUNK_FRACTION)), media_type="text/event-stream")
+
+        error = await simulate(total)
+        if error is not None:
+            return error
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+            "usageMetadata": usage(prompt, text)
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=1.0, help="Mean response time in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that never answer")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of students left out of cohort answers")
+    args = parser.parse_args()
+
+    app = create_app(latency=args.latency, error_rate=args.error_rate, hang_rate=args.hang_rate, drop_rate=args.drop_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Corpus of realistic model outputs for the recommendation JSON extractor.
+
+Each case is (name, text, expected) where expected is the document the
+extractor should return, or None when the output holds no usable JSON.
+Cases are built deterministically from a seed so runs are comparable.
+"""
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+Case = Tuple[str, str, Optional[Dict[str, Any]]]
+
+PLATFORMS = ["Coursera", "edX", "Udemy", "NPTEL", "LinkedIn Learning", "Google Career Certificates"]
+TOPICS = [
+    "Python for Data Analysis", "Cloud Fundamentals (AWS & GCP)", "SQL: From Zero to Joins",
+    "Public Speaking", "Product Management 101", "UI/UX Design \"Bootcamp\"", "Machine Learning Foundations",
+    "Financial Modelling in Excel", "C++ {templates} and the STL", "Agile & Scrum", "Cybersecurity Essentials",
+    "Hindi ↔ English Technical Writing", "Stakeholder Communication"
+]
+
+
+def make_document(rng: random.Random, courses: int) -> Dict[str, Any]:
+    return {
+        "career_path": rng.choice(["Data Analyst", "Full-Stack Developer", "Product Manager", "UX Designer"]),
+        "skill_gaps": rng.sample(["SQL", "Statistics", "System Design", "Communication", "Cloud", "Testing"], 3),
+        "courses": [
+            {
+                "title": rng.choice(TOPICS),
+                "description": rng.choice([
+                    "Hands-on projects with real datasets",
+                    "Covers {placeholders}, [brackets] and \"quotes\" in examples",
+                    "Line one\nLine two with a backslash \\ and a tab\t",
+                    "Learn by building: ```code``` samples included"
+                ]),
+                "category": rng.choice(["Technical", "Soft Skills", "Business"]),
+                "difficulty": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+                "duration": rng.choice(["4 weeks", "6 weeks", "3 months", 8]),
+                "platform": rng.choice(PLATFORMS),
+                "priority": rng.choice(["High", "Medium", "Low"]),
+                "reason": "Closes a gap between current skills and the target role"
+            }
+            for _ in range(courses)
+        ],
+        "learning_path": rng.choice([
+            "Fundamentals first, then a capstone project",
+            ["Complete the fundamentals", "Build two portfolio projects", "Apply for internships"]
+        ]),
+        "next_steps": ["Enroll in the first course", "Block 5 hours a week for study"]
+    }
+
+
+def build_corpus(seed: int = 7, per_kind: int = 20) -> List[Case]:
+    rng = random.Random(seed)
+    cases: List[Case] = []
+
+    for i in range(per_kind):
+        doc = make_document(rng, rng.randint(5, 8))
+        indent = rng.choice([None, 2, 4])
+        body = json.dumps(doc, indent=indent, ensure_ascii=rng.random() < 0.5)
+
+        cases.append((f"bare-{i}", body, doc))
+        cases.append((f"fenced-{i}", f"```json\n{body}\n```", doc))
+        cases.append((f"chatter-{i}", f"Here are your personalized recommendations:\n\n```json\n{body}\n```\n\nGood luck!", doc))
+        cases.append((
+            f"trailing-braces-{i}",
+            f"```json\n{body}\n```\nGood luck {{with}} your journey! Use the {{placeholders}} as needed.",
+            doc
+        ))
+        cases.append((
+            f"leading-braces-{i}",
+            f"I will answer in the {{requested}} format {{as JSON}}:\n```\n{body}\n```",
+            doc
+        ))
+        cases.append((
+            f"abandoned-draft-{i}",
+            f"```json\n{body[:len(body) // 2]}\n```\nSorry, let me try again:\n```json\n{body}\n```",
+            doc
+        ))
+        cases.append((f"truncated-{i}", f"```json\n{body[:rng.randint(10, len(body) - 2)]}", None))
+        long_doc = make_document(rng, 40)
+        cases.append((f"long-{i}", "Analysis. " * 400 + f"\n```json\n{json.dumps(long_doc)}\n```", long_doc))
+
+    cases.append(("no-json", "I'm sorry, I can't help with that request.", None))
+    cases.append(("python-dict", "{'career_path': 'Data Analyst', 'courses': []}", None))
+    cases.append(("empty", "", None))
+    return cases
@@ -43,7 +43,8 @@ BIGQUERY_CONFIG = {
         "SALARY_DATA": "salary_data",
         "INDUSTRY_ANALYSIS": "industry_analysis",
         "LOCATION_INSIGHTS": "location_insights",
-        "EDUCATION_REQUIREMENTS": "education_requirements"
+        "EDUCATION_REQUIREMENTS": "education_requirements",
+        "SALARY_OBSERVATIONS": "salary_observations"
     }
 }
 
@@ -5,7 +5,7 @@ import os
 from typing import Optional
 
 # Global variables
-db: Optional[firestore_client.Client] = None
+db: Optional[firestore_client.AsyncClient] = None
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK"""
@@ -27,14 +27,30 @@ def initialize_firebase():
                 'databaseURL': 'https://careerbridge-ai-c8f42-default-rtdb.firebaseio.com'
             })
         
-        # Initialize Firestore client
-        db = firestore_client.Client(project='careerbridge-ai-c8f42')
+        # Initialize Firestore client. The async client keeps Firestore round
+        # trips off the event loop so one slow read doesn't stall the worker.
+        db = firestore_client.AsyncClient(project='careerbridge-ai-c8f42')
         print("✅ Firebase Admin SDK initialized successfully")
         
     except Exception as e:
         print(f"❌ Error initializing Firebase: {e}")
         raise e
 
+async def warm_up_firestore():
+    """Open the Firestore channel before the first request arrives"""
+    try:
+        await get_db().collection(COLLECTIONS["USERS"]).document("_warmup").get()
+    except Exception as e:
+        print(f"⚠️ Firestore warm-up failed: {e}")
+
+def close_firebase():
+    """Close the Firestore client"""
+    global db
+    
+    if db is not None:
+        db.close()
+        db = None
+
 def get_db():
     """Get Firestore database instance"""
     if db is None:
@@ -44,6 +60,7 @@ def get_db():
 # Collection names
 COLLECTIONS = {
     "USERS": "users",
+    "EMAILS": "emails",
     "ASSESSMENTS": "assessments",
     "ASSESSMENT_RESPONSES": "assessment_responses", 
     "CAREER_PATHS": "career_paths",
@@ -53,6 +70,8 @@ COLLECTIONS = {
     "PSYCHOMETRIC_TESTS": "psychometric_tests",
     "MARKET_TRENDS": "market_trends",
     "RECOMMENDATIONS": "recommendations",
-    "SESSIONS": "sessions"
+    "COHORT_RECOMMENDATIONS": "cohort_recommendations",
+    "SESSIONS": "sessions",
+    "REVOKED_TOKENS": "revoked_tokens",
+    "REVOKED_USERS": "revoked_users"
 }
-
@@ -3,6 +3,8 @@ from flask_cors import CORS
 from datetime import datetime
 import os
 
+from services.recommendation_rules import generate_personalized_recommendations
+
 app = Flask(__name__)
 CORS(app)
 
@@ -305,292 +307,6 @@ def submit_career_answers():
             "message": f"Failed to submit answers: {str(e)}"
         }), 500
 
-def generate_personalized_recommendations(answers):
-    """Generate personalized recommendations based on student answers"""
-    
-    # Analyze education level
-    education_level = answers.get('1', '')
-    experience_level = answers.get('3', '')
-    career_interests = answers.get('2', [])
-    work_environment = answers.get('4', '')
-    skills = answers.get('5', [])
-    
-    # Determine career stage and appropriate recommendations
-    career_stage = determine_career_stage(education_level, experience_level)
-    primary_interests = analyze_career_interests(career_interests)
-    skill_analysis = analyze_skills(skills)
-    
-    # Generate dynamic recommendations
-    recommendations = {
-        "career_path": f"Personalized {primary_interests['primary']} Career Path",
-        "career_stage": career_stage,
-        "match_score": calculate_match_score(answers),
-        "skill_gaps": identify_skill_gaps(skill_analysis, primary_interests),
-        "courses": generate_course_recommendations(primary_interests, skill_analysis, career_stage),
-        "learning_path": generate_learning_path(career_stage, primary_interests),
-        "next_steps": generate_next_steps(career_stage, primary_interests),
-        "personality_insights": generate_personality_insights(answers),
-        "market_opportunities": get_market_opportunities(primary_interests),
-        "timeline": generate_career_timeline(career_stage, primary_interests)
-    }
-    
-    return recommendations
-
-def determine_career_stage(education, experience):
-    """Determine career stage based on education and experience"""
-    if experience in ['0-1 years (Entry level)']:
-        return "Entry Level"
-    elif experience in ['2-3 years (Junior)']:
-        return "Junior Professional"
-    elif experience in ['4-6 years (Mid-level)']:
-        return "Mid-Level Professional"
-    elif experience in ['7-10 years (Senior)']:
-        return "Senior Professional"
-    else:
-        return "Expert Level"
-
-def analyze_career_interests(interests):
-    """Analyze career interests to determine primary focus"""
-    tech_skills = ['Technology/Software Development', 'Engineering']
-    business_skills = ['Business/Management', 'Finance/Banking', 'Marketing/Advertising']
-    creative_skills = ['Arts/Design']
-    service_skills = ['Healthcare', 'Education']
-    
-    tech_count = sum(1 for interest in interests if interest in tech_skills)
-    business_count = sum(1 for interest in interests if interest in business_skills)
-    creative_count = sum(1 for interest in interests if interest in creative_skills)
-    service_count = sum(1 for interest in interests if interest in service_skills)
-    
-    if tech_count >= business_count and tech_count >= creative_count and tech_count >= service_count:
-        return {"primary": "Technology", "secondary": "Innovation", "focus": "Technical Excellence"}
-    elif business_count >= tech_count and business_count >= creative_count and business_count >= service_count:
-        return {"primary": "Business", "secondary": "Leadership", "focus": "Strategic Thinking"}
-    elif creative_count >= tech_count and creative_count >= business_count and creative_count >= service_count:
-        return {"primary": "Creative", "secondary": "Design", "focus": "Innovation"}
-    else:
-        return {"primary": "Service", "secondary": "Impact", "focus": "Social Good"}
-
-def analyze_skills(skills):
-    """Analyze current skills to identify strengths and gaps"""
-    technical_skills = ['Programming/Coding', 'Data Analysis']
-    soft_skills = ['Communication', 'Leadership', 'Problem Solving', 'Creative Thinking']
-    management_skills = ['Project Management', 'Technical Writing']
-    
-    return {
-        "technical": [s for s in skills if s in technical_skills],
-        "soft": [s for s in skills if s in soft_skills],
-        "management": [s for s in skills if s in management_skills],
-        "total_count": len(skills)
-    }
-
-def calculate_match_score(answers):
-    """Calculate how well the assessment matches the student's profile"""
-    base_score = 70
-    education_bonus = 10 if answers.get('1') in ['Bachelor\'s Degree', 'Master\'s Degree', 'PhD/Doctorate'] else 5
-    experience_bonus = 15 if answers.get('3') not in ['0-1 years (Entry level)'] else 5
-    skills_bonus = min(15, len(answers.get('5', [])) * 3)
-    
-    return min(95, base_score + education_bonus + experience_bonus + skills_bonus)
-
-def identify_skill_gaps(skill_analysis, interests):
-    """Identify skill gaps based on current skills and career interests"""
-    gaps = []
-    
-    if interests['primary'] == 'Technology' and not skill_analysis['technical']:
-        gaps.extend(['Programming Fundamentals', 'Data Analysis', 'System Design'])
-    
-    if interests['primary'] == 'Business' and not skill_analysis['management']:
-        gaps.extend(['Project Management', 'Strategic Planning', 'Financial Analysis'])
-    
-    if not skill_analysis['soft']:
-        gaps.extend(['Communication', 'Leadership', 'Problem Solving'])
-    
-    return gaps[:5]  # Return top 5 gaps
-
-def generate_course_recommendations(interests, skills, career_stage):
-    """Generate personalized course recommendations"""
-    courses = []
-    
-    # Technology-focused courses
-    if interests['primary'] == 'Technology':
-        courses.extend([
-            {
-                "title": "Full-Stack Development Bootcamp",
-                "description": "Master modern web development with React, Node.js, and cloud technologies",
-                "category": "Technical",
-                "difficulty": "Intermediate" if career_stage != "Entry Level" else "Beginner",
-                "duration": "12 weeks",
-                "platform": "CareerBridgeAI Academy",
-                    "priority": "High",
-                "reason": "Essential for technology career path",
-                "rating": 4.8,
-                "students_enrolled": 15420,
-                "price": "₹45,000",
-                "skills_covered": ["JavaScript", "React", "Node.js", "Database Design", "Cloud Computing"]
-            },
-            {
-                "title": "AI & Machine Learning Fundamentals",
-                "description": "Learn the basics of artificial intelligence and machine learning applications",
-                "category": "Emerging Tech",
-                    "difficulty": "Intermediate",
-                    "duration": "8 weeks",
-                "platform": "TechFuture Learning",
-                    "priority": "High",
-                "reason": "High-demand skill in current market",
-                "rating": 4.9,
-                "students_enrolled": 8930,
-                "price": "₹35,000",
-                "skills_covered": ["Python", "TensorFlow", "Data Science", "Neural Networks"]
-            }
-        ])
-    
-    # Business-focused courses
-    if interests['primary'] == 'Business':
-        courses.extend([
-            {
-                "title": "Digital Marketing & Analytics",
-                "description": "Master digital marketing strategies and data-driven decision making",
-                "category": "Business",
-                "difficulty": "Beginner",
-                "duration": "6 weeks",
-                "platform": "Business Academy",
-                "priority": "High",
-                "reason": "Critical for modern business success",
-                "rating": 4.7,
-                "students_enrolled": 12300,
-                "price": "₹25,000",
-                "skills_covered": ["SEO", "Social Media Marketing", "Google Analytics", "Content Strategy"]
-            }
-        ])
-    
-    # Soft skills courses (always recommended)
-    courses.extend([
-        {
-            "title": "Leadership & Team Management",
-            "description": "Develop essential leadership skills for career advancement",
-                    "category": "Soft Skills",
-                    "difficulty": "Intermediate",
-                    "duration": "4 weeks",
-            "platform": "Leadership Institute",
-                    "priority": "Medium",
-            "reason": "Essential for career progression",
-            "rating": 4.6,
-            "students_enrolled": 8750,
-            "price": "₹15,000",
-            "skills_covered": ["Team Building", "Conflict Resolution", "Strategic Thinking", "Communication"]
-        }
-    ])
-    
-    return courses[:4]  # Return top 4 courses
-
-def generate_learning_path(career_stage, interests):
-    """Generate a personalized learning path"""
-    if career_stage == "Entry Level":
-        return f"Start with foundational skills in {interests['primary'].lower()}, then progress to specialized certifications and practical projects"
-    elif career_stage == "Junior Professional":
-        return f"Focus on advanced {interests['primary'].lower()} skills and leadership development to prepare for senior roles"
-    else:
-        return f"Concentrate on strategic thinking and industry expertise in {interests['primary'].lower()} to become a thought leader"
-
-def generate_next_steps(career_stage, interests):
-    """Generate actionable next steps"""
-    steps = [
-        "Complete your first recommended course within 30 days",
-        "Build a portfolio project showcasing your new skills",
-        "Join professional communities and networking groups"
-    ]
-    
-    if career_stage == "Entry Level":
-        steps.extend([
-            "Apply for internships or entry-level positions",
-            "Create a strong LinkedIn profile"
-        ])
-    elif career_stage in ["Junior Professional", "Mid-Level Professional"]:
-        steps.extend([
-            "Seek mentorship opportunities",
-            "Take on leadership roles in current projects"
-        ])
-    
-    return steps
-
-def generate_personality_insights(answers):
-    """Generate personality-based insights"""
-    work_style = answers.get('4', '')
-    
-    insights = {
-        "work_style": work_style,
-        "strengths": [],
-        "recommendations": []
-    }
-    
-    if work_style == "Remote work":
-        insights["strengths"].append("Self-motivated and independent")
-        insights["recommendations"].append("Consider remote-first companies and digital nomad opportunities")
-    elif work_style == "Office-based":
-        insights["strengths"].append("Collaborative and team-oriented")
-        insights["recommendations"].append("Look for companies with strong office culture and team collaboration")
-    elif work_style == "Hybrid (mix of remote and office)":
-        insights["strengths"].append("Flexible and adaptable")
-        insights["recommendations"].append("Target companies offering hybrid work arrangements")
-    
-    return insights
-
-def get_market_opportunities(interests):
-    """Get market opportunities based on interests"""
-    opportunities = {
-        "Technology": {
-            "growth_rate": "+23%",
-            "avg_salary": "₹8,50,000",
-            "job_openings": "45,000+",
-            "top_skills": ["AI/ML", "Cloud Computing", "Cybersecurity", "Full-Stack Development"]
-        },
-        "Business": {
-            "growth_rate": "+18%",
-            "avg_salary": "₹7,20,000",
-            "job_openings": "32,000+",
-            "top_skills": ["Digital Marketing", "Data Analysis", "Project Management", "Strategic Planning"]
-        },
-        "Creative": {
-            "growth_rate": "+15%",
-            "avg_salary": "₹6,50,000",
-            "job_openings": "28,000+",
-            "top_skills": ["UI/UX Design", "Graphic Design", "Content Creation", "Brand Strategy"]
-        },
-        "Service": {
-            "growth_rate": "+12%",
-            "avg_salary": "₹5,80,000",
-            "job_openings": "38,000+",
-            "top_skills": ["Patient Care", "Education Technology", "Healthcare Analytics", "Digital Health"]
-        }
-    }
-    
-    return opportunities.get(interests['primary'], opportunities["Technology"])
-
-def generate_career_timeline(career_stage, interests):
-    """Generate a career timeline based on current stage"""
-    timelines = {
-        "Entry Level": {
-            "6_months": "Complete foundational courses and build first project",
-            "1_year": "Land first job or internship in your field",
-            "2_years": "Gain 1-2 years of professional experience",
-            "3_years": "Consider specialization or advanced certifications"
-        },
-        "Junior Professional": {
-            "6_months": "Take on more responsibility in current role",
-            "1_year": "Seek promotion or new opportunities",
-            "2_years": "Become a subject matter expert in your area",
-            "3_years": "Consider leadership roles or advanced degrees"
-        },
-        "Mid-Level Professional": {
-            "6_months": "Lead a significant project or initiative",
-            "1_year": "Mentor junior professionals",
-            "2_years": "Consider management or senior individual contributor roles",
-            "3_years": "Become a thought leader in your industry"
-        }
-    }
-    
-    return timelines.get(career_stage, timelines["Entry Level"])
-
 @app.route('/api/assessments/recommendations', methods=['GET'])
 def get_user_recommendations():
     """Get user's course recommendations"""
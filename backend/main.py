@@ -2,16 +2,30 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 
+# Load environment variables before the modules that read them at import time
+load_dotenv()
+
 from routers import auth, assessments, career
-from config.database import initialize_firebase
+from config.database import initialize_firebase, warm_up_firestore, close_firebase, get_db
 from config.bigquery import initialize_bigquery
-
-# Load environment variables
-load_dotenv()
+from auth.dependencies import user_cache
+from auth.jwt_handler import token_cache
+from auth.password_pool import password_pool
+from auth.revocation import revocation_store, REVOCATION_SYNC_INTERVAL_SECONDS
+from services.write_behind import write_behind
+from middleware.rate_limit import RateLimitMiddleware, create_rate_limiter
+from services.gemini_service import initialize_gemini, close_gemini, get_gemini_service
+from services.recommendation_cache import recommendation_cache
+from services.recommendation_table import load_recommendation_table, close_recommendation_table, get_recommendation_table
+from services.job_queue import job_queue, start_job_workers
+from services.market_data import market_cache, PREWARM_KEYS, get_role_matcher
+from services.market_snapshot import load_market_snapshot, close_market_snapshot, get_market_snapshot
+from services.salary_engine import load_salary_engine, close_salary_engine, get_salary_engine
 
 # Security scheme
 security = HTTPBearer()
@@ -21,11 +35,44 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting CareerBridgeAI FastAPI Backend...")
     initialize_firebase()
+    await warm_up_firestore()
     initialize_bigquery()
+    load_market_snapshot()
+    load_salary_engine(get_market_snapshot())
+    if get_market_snapshot() is None:
+        await market_cache.prewarm(PREWARM_KEYS)
+    market_refresh = asyncio.create_task(market_cache.run())
+    recommendation_cache.load()
+    load_recommendation_table()
+    await initialize_gemini()
+    password_pool.start()
+    await revocation_store.sync(get_db(), full=True)
+    revocation_sync = asyncio.create_task(
+        revocation_store.run_sync_loop(get_db(), REVOCATION_SYNC_INTERVAL_SECONDS)
+    )
+    write_behind_flush = asyncio.create_task(write_behind.run(get_db()))
+    job_workers = start_job_workers()
+    await job_queue.purge()
     print("✅ Backend initialized successfully!")
     yield
     # Shutdown
     print("🛑 Shutting down CareerBridgeAI Backend...")
+    revocation_sync.cancel()
+    write_behind_flush.cancel()
+    market_refresh.cancel()
+    # Jobs interrupted here are picked up again once their lease expires
+    for worker in job_workers:
+        worker.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_queue.close()
+    await write_behind.flush(get_db())
+    await close_gemini()
+    recommendation_cache.save()
+    close_recommendation_table()
+    close_salary_engine()
+    close_market_snapshot()
+    password_pool.shutdown()
+    close_firebase()
 
 # Create FastAPI app
 app = FastAPI(
@@ -35,6 +82,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added before CORS so that 429s still carry CORS headers)
+rate_limiter = create_rate_limiter()
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -47,6 +98,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],
 )
 
 # Include routers
@@ -71,6 +123,30 @@ async def health_check():
         "status": "healthy"
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "success": True,
+        "data": {
+            "user_cache": user_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "password_pool": password_pool.stats(),
+            "token_revocation": revocation_store.stats(),
+            "write_behind": write_behind.stats(),
+            "rate_limit": rate_limiter.stats(),
+            "gemini": get_gemini_service().client.stats(),
+            "gemini_single_flight": get_gemini_service().single_flight.stats(),
+            "gemini_circuit": get_gemini_service().breaker.stats(),
+            "recommendation_cache": recommendation_cache.stats(),
+            "recommendation_table": get_recommendation_table().stats() if get_recommendation_table() else None,
+            "job_queue": job_queue.stats(),
+            "market_data": market_cache.stats(),
+            "market_snapshot": get_market_snapshot().stats() if get_market_snapshot() else None,
+            "salary_engine": get_salary_engine().stats() if get_salary_engine() else None,
+            "role_matcher": get_role_matcher().stats() if get_role_matcher() else None
+        }
+    }
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
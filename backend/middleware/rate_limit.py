@@ -0,0 +1,219 @@
+import json
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from auth.jwt_handler import verify_token
+from services.cache import TTLCache
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Token bucket allowing `limit` requests per `period` seconds for paths under `prefix`"""
+    name: str
+    prefix: str
+    limit: int
+    period: float = 60.0
+
+    @property
+    def refill_rate(self) -> float:
+        return self.limit / self.period
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. Subclass to share buckets between workers."""
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, refill_rate: float) -> Tuple[bool, float]:
+        """Try to take one token; return (allowed, tokens left afterwards)"""
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process buckets; each uvicorn worker enforces its own limits"""
+
+    def __init__(self, max_buckets: int = 100000):
+        # An idle bucket that expires would have refilled anyway, so the TTL
+        # is the time to refill completely and expiry never loosens a limit.
+        self._buckets = TTLCache(maxsize=max_buckets, ttl=3600)
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens, updated_at = bucket
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+        
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / refill_rate + 1)
+        return allowed, tokens
+
+class RedisBackend(RateLimitBackend):
+    """Buckets shared by every worker through Redis (requires the redis package)"""
+
+    # Refill and take in one atomic step, using the Redis clock so workers
+    # with skewed clocks agree on the bucket state
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, key_prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+        
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+        self._key_prefix = key_prefix
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[self._key_prefix + key], args=[capacity, refill_rate])
+        return bool(allowed), float(tokens)
+
+class RateLimiter:
+    """Chooses the policy and caller identity for a request and applies its bucket"""
+
+    def __init__(self, policies: List[RateLimitPolicy], default: RateLimitPolicy,
+                 backend: RateLimitBackend, trust_forwarded_for: bool = False):
+        # Longest prefix wins
+        self.policies = sorted(policies, key=lambda policy: len(policy.prefix), reverse=True)
+        self.default = default
+        self.backend = backend
+        self.trust_forwarded_for = trust_forwarded_for
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+
+    def policy_for(self, path: str) -> RateLimitPolicy:
+        for policy in self.policies:
+            if path.startswith(policy.prefix):
+                return policy
+        return self.default
+
+    def identity(self, scope: Dict[str, Any]) -> str:
+        """Verified user id when the request carries a valid token, else client IP"""
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization[:7].lower() == "bearer ":
+            try:
+                return "user:" + verify_token(authorization[7:], HTTPException(status_code=401)).user_id
+            except HTTPException:
+                pass
+        
+        if self.trust_forwarded_for and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def check(self, scope: Dict[str, Any]) -> Tuple[bool, RateLimitPolicy, float]:
+        policy = self.policy_for(scope["path"])
+        key = f"{policy.name}:{self.identity(scope)}"
+        allowed, tokens = await self.backend.take(key, policy.limit, policy.refill_rate)
+        counters = self.allowed if allowed else self.limited
+        counters[policy.name] = counters.get(policy.name, 0) + 1
+        return allowed, policy, tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "backend": type(self.backend).__name__,
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited)
+        }
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying token-bucket rate limits to /api routes.
+
+    Every response carries X-RateLimit-Limit, X-RateLimit-Remaining and
+    X-RateLimit-Reset (seconds until the bucket is full again); rejected
+    requests get a 429 with Retry-After.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, path_prefix: str = "/api/"):
+        self.app = app
+        self.limiter = limiter
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        
+        allowed, policy, tokens = await self.limiter.check(scope)
+        rate_headers = [
+            (b"x-ratelimit-limit", str(policy.limit).encode()),
+            (b"x-ratelimit-remaining", str(int(tokens)).encode()),
+            (b"x-ratelimit-reset", str(math.ceil((policy.limit - tokens) / policy.refill_rate)).encode())
+        ]
+        
+        if not allowed:
+            retry_after = math.ceil((1 - tokens) / policy.refill_rate)
+            body = json.dumps({
+                "success": False,
+                "message": f"Rate limit exceeded, retry in {retry_after} seconds",
+                "error": "RATE_LIMITED"
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": rate_headers + [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + rate_headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter from environment settings, matching docs/API.md"""
+    auth_limit = int(os.getenv("RATE_LIMIT_AUTH_PER_MINUTE", "5"))
+    assessment_limit = int(os.getenv("RATE_LIMIT_ASSESSMENTS_PER_MINUTE", "10"))
+    submit_limit = int(os.getenv("RATE_LIMIT_SUBMIT_ANSWERS_PER_MINUTE", "3"))
+    results_limit = int(os.getenv("RATE_LIMIT_RESULTS_PER_MINUTE", "60"))
+    general_limit = int(os.getenv("RATE_LIMIT_GENERAL_PER_MINUTE", "100"))
+    
+    policies = [
+        RateLimitPolicy("auth", "/api/auth/login", auth_limit),
+        RateLimitPolicy("auth", "/api/auth/register", auth_limit),
+        RateLimitPolicy("auth", "/api/auth/change-password", auth_limit),
+        RateLimitPolicy("assessments", "/api/assessments/", assessment_limit),
+        # Each submission can trigger a Gemini call and several Firestore writes
+        RateLimitPolicy("submit_answers", "/api/assessments/submit-answers", submit_limit),
+        # Read-only routes the frontend polls while a recommendation job runs
+        RateLimitPolicy("results", "/api/assessments/recommendations", results_limit),
+        RateLimitPolicy("results", "/api/assessments/jobs/", results_limit)
+    ]
+    
+    redis_url: Optional[str] = os.getenv("RATE_LIMIT_REDIS_URL")
+    backend = RedisBackend(redis_url) if redis_url else InMemoryBackend()
+    
+    return RateLimiter(
+        policies=policies,
+        default=RateLimitPolicy("general", "/", general_limit),
+        backend=backend,
+        trust_forwarded_for=os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+    )
@@ -0,0 +1,76 @@
+"""
+Career assessment questionnaire served by /api/assessments/questions.
+
+Option order is significant: the precomputed recommendation table indexes
+answers by option position, so appending options or questions requires
+regenerating it (the table refuses to load when the options change).
+"""
+
+CAREER_QUESTIONS = [
+    {
+        "id": 1,
+        "question": "What is your current education level?",
+        "type": "single",
+        "options": [
+            "High School",
+            "Associate Degree", 
+            "Bachelor's Degree",
+            "Master's Degree",
+            "PhD/Doctorate"
+        ]
+    },
+    {
+        "id": 2,
+        "question": "Which of the following career fields interest you most?",
+        "type": "multiple",
+        "options": [
+            "Technology/Software Development",
+            "Healthcare",
+            "Finance/Banking",
+            "Education",
+            "Marketing/Advertising",
+            "Engineering",
+            "Business/Management",
+            "Arts/Design"
+        ]
+    },
+    {
+        "id": 3,
+        "question": "How many years of work experience do you have?",
+        "type": "single",
+        "options": [
+            "0-1 years (Entry level)",
+            "2-3 years (Junior)",
+            "4-6 years (Mid-level)",
+            "7-10 years (Senior)",
+            "10+ years (Expert)"
+        ]
+    },
+    {
+        "id": 4,
+        "question": "What type of work environment do you prefer?",
+        "type": "single",
+        "options": [
+            "Remote work",
+            "Office-based",
+            "Hybrid (mix of remote and office)",
+            "Field work",
+            "No preference"
+        ]
+    },
+    {
+        "id": 5,
+        "question": "Which skills do you currently possess? (Select all that apply)",
+        "type": "multiple",
+        "options": [
+            "Programming/Coding",
+            "Data Analysis",
+            "Project Management",
+            "Communication",
+            "Leadership",
+            "Problem Solving",
+            "Creative Thinking",
+            "Technical Writing"
+        ]
+    }
+]
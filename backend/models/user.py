@@ -109,4 +109,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+    jti: Optional[str] = None
+    exp: Optional[int] = None
+    iat: Optional[int] = None
+    profile: Optional[Dict[str, Any]] = None
\ No newline at end of file
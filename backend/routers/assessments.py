@@ -1,15 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pydantic import BaseModel
+import asyncio
+import json
+import uuid
 
-from auth.dependencies import get_current_active_user
+from auth.dependencies import get_current_active_user, require_role
 from config.database import get_db, COLLECTIONS
-from google.cloud.firestore import Client
-from services.gemini_service import GeminiService
+from google.cloud.firestore import AsyncClient
+from services.job_queue import job_queue, public_job, QUEUED, RUNNING
+from services.recommendation_jobs import (
+    RECOMMENDATIONS_JOB, COHORT_RECOMMENDATIONS_JOB, COHORT_JOB_STUDENTS, COHORT_MAX_STUDENTS, COHORT_ROLES
+)
+from services.gemini_service import GeminiService, get_gemini_service
+from models.assessment import CAREER_QUESTIONS
 
 router = APIRouter()
 
+# Generation tasks behind streaming responses, kept referenced until they finish
+_stream_tasks = set()
+
 class AssessmentCreate(BaseModel):
     assessment_type: str
     title: str
@@ -23,11 +35,18 @@ class AssessmentResponse(BaseModel):
     answer: Any
     time_spent: Optional[int] = None
 
+class CohortStudent(BaseModel):
+    student_id: str
+    answers: Dict[str, Any]
+
+class CohortSubmission(BaseModel):
+    students: List[CohortStudent]
+
 @router.post("/", response_model=Dict[str, Any])
 async def create_assessment(
     assessment_data: AssessmentCreate,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Create a new assessment"""
     try:
@@ -50,7 +69,7 @@ async def create_assessment(
         }
         
         # Save to Firestore
-        doc_ref = db.collection(COLLECTIONS["ASSESSMENTS"]).add(assessment_doc)[1]
+        _, doc_ref = await db.collection(COLLECTIONS["ASSESSMENTS"]).add(assessment_doc)
         assessment_doc["id"] = doc_ref.id
         
         return {
@@ -72,7 +91,7 @@ async def get_user_assessments(
     limit: int = 20,
     offset: int = 0,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Get user's assessments"""
     try:
@@ -87,7 +106,7 @@ async def get_user_assessments(
         query = query.order_by("created_at", direction="DESCENDING")
         
         # Apply pagination
-        assessments = query.limit(limit).offset(offset).get()
+        assessments = await query.limit(limit).offset(offset).get()
         
         assessment_list = []
         for assessment in assessments:
@@ -111,56 +130,16 @@ async def get_user_assessments(
             detail=f"Failed to get assessments: {str(e)}"
         )
 
-@router.get("/{assessment_id}", response_model=Dict[str, Any])
-async def get_assessment(
-    assessment_id: str,
-    current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
-):
-    """Get assessment details"""
-    try:
-        assessment_doc = db.collection(COLLECTIONS["ASSESSMENTS"]).document(assessment_id).get()
-        
-        if not assessment_doc.exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Assessment not found"
-            )
-        
-        assessment_data = assessment_doc.to_dict()
-        
-        # Check if user owns the assessment
-        if assessment_data["user_id"] != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied: You can only view your own assessments"
-            )
-        
-        assessment_data["id"] = assessment_id
-        
-        return {
-            "success": True,
-            "data": {"assessment": assessment_data}
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get assessment: {str(e)}"
-        )
-
 @router.post("/{assessment_id}/start", response_model=Dict[str, Any])
 async def start_assessment(
     assessment_id: str,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Start an assessment"""
     try:
         assessment_ref = db.collection(COLLECTIONS["ASSESSMENTS"]).document(assessment_id)
-        assessment_doc = assessment_ref.get()
+        assessment_doc = await assessment_ref.get()
         
         if not assessment_doc.exists:
             raise HTTPException(
@@ -185,7 +164,7 @@ async def start_assessment(
             )
         
         # Start assessment
-        assessment_ref.update({
+        await assessment_ref.update({
             "status": "in_progress",
             "started_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
@@ -209,79 +188,9 @@ async def start_assessment(
 async def get_career_questions():
     """Get career assessment questions"""
     try:
-        # Sample career assessment questions
-        questions = [
-            {
-                "id": 1,
-                "question": "What is your current education level?",
-                "type": "single",
-                "options": [
-                    "High School",
-                    "Associate Degree", 
-                    "Bachelor's Degree",
-                    "Master's Degree",
-                    "PhD/Doctorate"
-                ]
-            },
-            {
-                "id": 2,
-                "question": "Which of the following career fields interest you most?",
-                "type": "multiple",
-                "options": [
-                    "Technology/Software Development",
-                    "Healthcare",
-                    "Finance/Banking",
-                    "Education",
-                    "Marketing/Advertising",
-                    "Engineering",
-                    "Business/Management",
-                    "Arts/Design"
-                ]
-            },
-            {
-                "id": 3,
-                "question": "How many years of work experience do you have?",
-                "type": "single",
-                "options": [
-                    "0-1 years (Entry level)",
-                    "2-3 years (Junior)",
-                    "4-6 years (Mid-level)",
-                    "7-10 years (Senior)",
-                    "10+ years (Expert)"
-                ]
-            },
-            {
-                "id": 4,
-                "question": "What type of work environment do you prefer?",
-                "type": "single",
-                "options": [
-                    "Remote work",
-                    "Office-based",
-                    "Hybrid (mix of remote and office)",
-                    "Field work",
-                    "No preference"
-                ]
-            },
-            {
-                "id": 5,
-                "question": "Which skills do you currently possess? (Select all that apply)",
-                "type": "multiple",
-                "options": [
-                    "Programming/Coding",
-                    "Data Analysis",
-                    "Project Management",
-                    "Communication",
-                    "Leadership",
-                    "Problem Solving",
-                    "Creative Thinking",
-                    "Technical Writing"
-                ]
-            }
-        ]
-        
         return {
             "success": True,
-            "data": {"questions": questions}
+            "data": {"questions": CAREER_QUESTIONS}
         }
         
     except Exception as e:
@@ -290,13 +199,13 @@ async def get_career_questions():
             detail=f"Failed to get questions: {str(e)}"
         )
 
-@router.post("/submit-answers", response_model=Dict[str, Any])
+@router.post("/submit-answers", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def submit_career_answers(
     answers: Dict[str, Any],
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
-    """Submit career assessment answers and generate recommendations"""
+    """Submit career assessment answers and queue recommendation generation"""
     try:
         # Save user responses
         response_doc = {
@@ -307,85 +216,218 @@ async def submit_career_answers(
         }
         
         # Save to Firestore
-        doc_ref = db.collection(COLLECTIONS["ASSESSMENT_RESPONSES"]).add(response_doc)[1]
-        response_doc["id"] = doc_ref.id
-        
-        # Generate recommendations using Gemini Pro
-        try:
-            gemini_service = GeminiService()
-            recommendations_result = gemini_service.generate_course_recommendations(answers)
-            
-            # Save recommendations to database
-            recommendations_doc = {
-                "user_id": current_user["id"],
-                "assessment_response_id": doc_ref.id,
-                "recommendations": recommendations_result.get("recommendations", {}),
-                "generated_at": datetime.utcnow(),
-                "ai_model": "gemini-pro",
-                "status": "completed" if recommendations_result.get("success") else "failed"
-            }
-            
-            rec_doc_ref = db.collection(COLLECTIONS["RECOMMENDATIONS"]).add(recommendations_doc)[1]
-            
-            return {
-                "success": True,
-                "message": "Assessment submitted and recommendations generated successfully",
-                "data": {
-                    "response_id": doc_ref.id,
-                    "recommendations_id": rec_doc_ref.id,
-                    "recommendations": recommendations_result.get("recommendations", {})
-                }
+        _, doc_ref = await db.collection(COLLECTIONS["ASSESSMENT_RESPONSES"]).add(response_doc)
+        
+        # Recommendations are generated by the job queue workers
+        job_id = await job_queue.enqueue(
+            RECOMMENDATIONS_JOB,
+            {"user_id": current_user["id"], "response_id": doc_ref.id, "answers": answers},
+            user_id=current_user["id"]
+        )
+        
+        return {
+            "success": True,
+            "message": "Assessment submitted successfully. Recommendations are being generated.",
+            "data": {
+                "response_id": doc_ref.id,
+                "job_id": job_id,
+                "status": "queued"
             }
-            
-        except Exception as gemini_error:
-            # If Gemini fails, still save the response but note the failure
-            print(f"Gemini API error: {str(gemini_error)}")
-            
-            return {
-                "success": True,
-                "message": "Assessment submitted successfully. Recommendations will be generated shortly.",
-                "data": {
-                    "response_id": doc_ref.id,
-                    "recommendations": None,
-                    "note": "AI recommendations are being processed"
-                }
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit answers: {str(e)}"
+        )
+
+@router.post("/cohort", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
+async def submit_cohort_answers(
+    cohort: CohortSubmission,
+    current_user: dict = Depends(require_role(*COHORT_ROLES))
+):
+    """Queue recommendation generation for a whole cohort of students (educators and admins only)"""
+    try:
+        if not cohort.students:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cohort has no students"
+            )
+        if len(cohort.students) > COHORT_MAX_STUDENTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cohort has more than {COHORT_MAX_STUDENTS} students"
+            )
+        
+        # Each job packs its students into shared Gemini calls; results are
+        # stored under the cohort, never as the students' own recommendations
+        cohort_id = uuid.uuid4().hex
+        students = [student.dict() for student in cohort.students]
+        job_ids = []
+        for start in range(0, len(students), COHORT_JOB_STUDENTS):
+            job_ids.append(await job_queue.enqueue(
+                COHORT_RECOMMENDATIONS_JOB,
+                {
+                    "user_id": current_user["id"],
+                    "cohort_id": cohort_id,
+                    "offset": start,
+                    "students": students[start:start + COHORT_JOB_STUDENTS]
+                },
+                user_id=current_user["id"]
+            ))
+        
+        return {
+            "success": True,
+            "message": "Cohort submitted successfully. Recommendations are being generated.",
+            "data": {
+                "cohort_id": cohort_id,
+                "students": len(students),
+                "job_ids": job_ids,
+                "status": "queued"
             }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit cohort: {str(e)}"
+        )
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _generate_and_save(
+    answers: Dict[str, Any],
+    user_id: str,
+    response_id: str,
+    db: AsyncClient,
+    gemini_service: GeminiService,
+    events: asyncio.Queue
+):
+    """Stream recommendations into a queue, then persist the final document"""
+    try:
+        result = None
+        async for event, data in gemini_service.stream_course_recommendations(answers):
+            if event == "course":
+                events.put_nowait(_sse("course", data))
+            else:
+                result = data
+        
+        recommendations_doc = {
+            "user_id": user_id,
+            "assessment_response_id": response_id,
+            "recommendations": result.get("recommendations", {}),
+            "generated_at": datetime.utcnow(),
+            "ai_model": gemini_service.model_name,
+            "status": "completed" if result.get("success") else "failed",
+            "partial": result.get("partial", False)
+        }
+        _, rec_doc_ref = await db.collection(COLLECTIONS["RECOMMENDATIONS"]).add(recommendations_doc)
+        
+        events.put_nowait(_sse("complete", {
+            "recommendations_id": rec_doc_ref.id,
+            "status": recommendations_doc["status"],
+            "partial": recommendations_doc["partial"],
+            "recommendations": recommendations_doc["recommendations"]
+        }))
+    except Exception as e:
+        events.put_nowait(_sse("error", {"detail": f"Failed to generate recommendations: {str(e)}"}))
+    finally:
+        events.put_nowait(None)
+
+@router.post("/submit-answers/stream")
+async def stream_career_answers(
+    answers: Dict[str, Any],
+    current_user: dict = Depends(get_current_active_user),
+    db: AsyncClient = Depends(get_db),
+    gemini_service: GeminiService = Depends(get_gemini_service)
+):
+    """Submit career assessment answers and stream recommendations as Server-Sent Events"""
+    try:
+        response_doc = {
+            "user_id": current_user["id"],
+            "answers": answers,
+            "submitted_at": datetime.utcnow(),
+            "assessment_type": "career_guidance"
+        }
+        _, doc_ref = await db.collection(COLLECTIONS["ASSESSMENT_RESPONSES"]).add(response_doc)
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to submit answers: {str(e)}"
         )
+    
+    # Generation runs in its own task so the result is still saved if the client disconnects
+    events: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(
+        _generate_and_save(answers, current_user["id"], doc_ref.id, db, gemini_service, events)
+    )
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+    
+    async def event_stream():
+        yield _sse("submitted", {"response_id": doc_ref.id})
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/recommendations", response_model=Dict[str, Any])
 async def get_user_recommendations(
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
-    """Get user's course recommendations"""
+    """Get user's course recommendations and the status of the latest generation job"""
     try:
+        latest_job = await job_queue.latest_for_user(current_user["id"], RECOMMENDATIONS_JOB)
+        job = public_job(latest_job) if latest_job else None
+        
         # Get user's latest recommendations
-        recommendations_query = db.collection(COLLECTIONS["RECOMMENDATIONS"])\
+        recommendations_query = await db.collection(COLLECTIONS["RECOMMENDATIONS"])\
             .where("user_id", "==", current_user["id"])\
             .order_by("generated_at", direction="DESCENDING")\
             .limit(1)\
             .get()
         
-        if not recommendations_query:
+        recommendation_data = None
+        if recommendations_query:
+            latest_recommendation = recommendations_query[0]
+            recommendation_data = latest_recommendation.to_dict()
+            recommendation_data["id"] = latest_recommendation.id
+        
+        # A pending job will replace whatever is stored unless the stored
+        # document is that job's own (written just before a lost lease)
+        if job and job["status"] in (QUEUED, RUNNING) and \
+                (recommendation_data is None or recommendation_data.get("job_id") != job["id"]):
+            return {
+                "success": False,
+                "message": "Your recommendations are being generated. Please check back shortly.",
+                "data": {"recommendation": None, "previous_recommendation": recommendation_data, "job": job}
+            }
+        
+        if recommendation_data is None:
             return {
                 "success": False,
                 "message": "No recommendations found. Please complete the assessment first.",
                 "data": None
             }
         
-        latest_recommendation = recommendations_query[0]
-        recommendation_data = latest_recommendation.to_dict()
-        recommendation_data["id"] = latest_recommendation.id
-        
         return {
             "success": True,
             "data": {
-                "recommendation": recommendation_data
+                "recommendation": recommendation_data,
+                "job": job
             }
         }
         
@@ -395,17 +437,91 @@ async def get_user_recommendations(
             detail=f"Failed to get recommendations: {str(e)}"
         )
 
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get the status of a recommendation generation job (cohort jobs include the per-student report)"""
+    try:
+        job = await job_queue.get(job_id)
+        
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        
+        if job["user_id"] != current_user["id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: You can only view your own jobs"
+            )
+        
+        return {
+            "success": True,
+            "data": {"job": public_job(job)}
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get job: {str(e)}"
+        )
+
+@router.get("/{assessment_id}", response_model=Dict[str, Any])
+async def get_assessment(
+    assessment_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: AsyncClient = Depends(get_db)
+):
+    """Get assessment details"""
+    try:
+        assessment_doc = await db.collection(COLLECTIONS["ASSESSMENTS"]).document(assessment_id).get()
+        
+        if not assessment_doc.exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Assessment not found"
+            )
+        
+        assessment_data = assessment_doc.to_dict()
+        
+        # Check if user owns the assessment
+        if assessment_data["user_id"] != current_user["id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: You can only view your own assessments"
+            )
+        
+        assessment_data["id"] = assessment_id
+        
+        return {
+            "success": True,
+            "data": {"assessment": assessment_data}
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get assessment: {str(e)}"
+        )
+
 @router.post("/{assessment_id}/responses", response_model=Dict[str, Any])
 async def submit_response(
     assessment_id: str,
     response_data: AssessmentResponse,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Submit assessment response"""
     try:
         assessment_ref = db.collection(COLLECTIONS["ASSESSMENTS"]).document(assessment_id)
-        assessment_doc = assessment_ref.get()
+        assessment_doc = await assessment_ref.get()
         
         if not assessment_doc.exists:
             raise HTTPException(
@@ -455,7 +571,7 @@ async def submit_response(
             update_data["status"] = "completed"
             update_data["completed_at"] = datetime.utcnow()
         
-        assessment_ref.update(update_data)
+        await assessment_ref.update(update_data)
         
         return {
             "success": True,
@@ -1,38 +1,50 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 from typing import Dict, Any
+from urllib.parse import quote
 
 from models.user import UserCreate, UserLogin, UserResponse, Token, PasswordChange
-from auth.jwt_handler import verify_password, get_password_hash, create_access_token
-from auth.dependencies import get_current_active_user
+from auth.jwt_handler import create_user_access_token, verify_token, PROFILE_CLAIMS_ENABLED
+from auth.revocation import revocation_store
+from auth.password_pool import password_pool
+from auth.dependencies import get_current_active_user, invalidate_cached_user
 from config.database import get_db, COLLECTIONS
-from google.cloud.firestore import Client
+from services.write_behind import write_behind
+from google.cloud.firestore import AsyncClient, AsyncTransaction, Increment, async_transactional
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+def email_index_key(email: str) -> str:
+    """Document id of an email in the emails index collection"""
+    # Addresses are case-insensitive in practice; quoting keeps any "/" in
+    # the local part from being read as a Firestore path separator.
+    return quote(email.strip().lower(), safe="@")
+
+@async_transactional
+async def _create_user(transaction: AsyncTransaction, email_ref, user_ref, user_doc: dict) -> bool:
+    """Reserve the email and create the user document in one transaction"""
+    email_snapshot = await email_ref.get(transaction=transaction)
+    if email_snapshot.exists:
+        return False
+    
+    transaction.create(email_ref, {"user_id": user_ref.id, "created_at": datetime.utcnow()})
+    transaction.create(user_ref, user_doc)
+    return True
 
 @router.post("/register", response_model=Dict[str, Any])
-async def register(user_data: UserCreate, db: Client = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncClient = Depends(get_db)):
     """Register a new user"""
     try:
-        # Check if user already exists
-        users_ref = db.collection(COLLECTIONS["USERS"])
-        existing_user = users_ref.where("email", "==", user_data.email).limit(1).get()
-        
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="User with this email already exists"
-            )
-        
         # Split name into first and last name
         name_parts = user_data.name.strip().split(" ", 1)
         first_name = name_parts[0]
         last_name = name_parts[1] if len(name_parts) > 1 else ""
         
         # Hash password
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_pool.hash(user_data.password)
         
         # Create user document
         user_doc = {
@@ -55,6 +67,7 @@ async def register(user_data: UserCreate, db: Client = Depends(get_db)):
             "is_active": True,
             "email_verified": False,
             "profile_completion_percentage": 20,  # Basic info completed
+            "profile_version": 0,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
             "last_login_at": None,
@@ -64,14 +77,21 @@ async def register(user_data: UserCreate, db: Client = Depends(get_db)):
             }
         }
         
-        # Save to Firestore
-        doc_ref = users_ref.add(user_doc)[1]
-        user_id = doc_ref.id
+        # Save to Firestore, claiming the email in the same transaction so
+        # concurrent registrations can't both succeed
+        email_ref = db.collection(COLLECTIONS["EMAILS"]).document(email_index_key(user_data.email))
+        user_ref = db.collection(COLLECTIONS["USERS"]).document()
+        
+        if not await _create_user(db.transaction(), email_ref, user_ref, user_doc):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User with this email already exists"
+            )
+        
+        user_id = user_ref.id
         
         # Create access token
-        access_token = create_access_token(
-            data={"user_id": user_id, "email": user_data.email}
-        )
+        access_token = create_user_access_token(user_id, user_data.email, user_doc)
         
         # Remove password from response
         user_doc.pop("password", None)
@@ -95,20 +115,22 @@ async def register(user_data: UserCreate, db: Client = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Dict[str, Any])
-async def login(credentials: UserLogin, db: Client = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncClient = Depends(get_db)):
     """Login user"""
     try:
-        # Find user by email
-        users_ref = db.collection(COLLECTIONS["USERS"])
-        user_query = users_ref.where("email", "==", credentials.email).limit(1).get()
+        # Find user by email through the emails index
+        email_doc = await db.collection(COLLECTIONS["EMAILS"]).document(email_index_key(credentials.email)).get()
+        user_doc = None
+        
+        if email_doc.exists:
+            user_doc = await db.collection(COLLECTIONS["USERS"]).document(email_doc.to_dict()["user_id"]).get()
         
-        if not user_query:
+        if user_doc is None or not user_doc.exists:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        user_doc = user_query[0]
         user_data = user_doc.to_dict()
         
         # Check if user is active
@@ -119,22 +141,20 @@ async def login(credentials: UserLogin, db: Client = Depends(get_db)):
             )
         
         # Verify password
-        if not verify_password(credentials.password, user_data["password"]):
+        if not await password_pool.verify(credentials.password, user_data["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        # Update last login
-        user_doc.reference.update({
+        # Update last login; not needed to answer, so it is written behind
+        write_behind.record(COLLECTIONS["USERS"], user_doc.id, {
             "last_login_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         })
         
         # Create access token
-        access_token = create_access_token(
-            data={"user_id": user_doc.id, "email": credentials.email}
-        )
+        access_token = create_user_access_token(user_doc.id, credentials.email, user_data)
         
         # Remove password from response
         user_data.pop("password", None)
@@ -169,28 +189,36 @@ async def get_profile(current_user: dict = Depends(get_current_active_user)):
 async def update_profile(
     user_update: dict,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Update user profile"""
     try:
         # Remove fields that shouldn't be updated
         update_data = {k: v for k, v in user_update.items() 
-                      if k not in ["id", "email", "password", "created_at"]}
+                      if k not in ["id", "email", "password", "created_at", "profile_version", "role", "is_active"]}
         
         if update_data:
             update_data["updated_at"] = datetime.utcnow()
             
-            # Update in Firestore
+            # Update in Firestore; bumping profile_version marks tokens with
+            # older profile claims as stale
             user_ref = db.collection(COLLECTIONS["USERS"]).document(current_user["id"])
-            user_ref.update(update_data)
+            await user_ref.update({**update_data, "profile_version": Increment(1)})
+            invalidate_cached_user(current_user["id"])
             
             # Update current_user dict
             current_user.update(update_data)
+            current_user["profile_version"] = current_user.get("profile_version", 0) + 1
+        
+        data = {"user": current_user}
+        if PROFILE_CLAIMS_ENABLED:
+            # Hand back a token whose claims reflect the new profile
+            data["token"] = create_user_access_token(current_user["id"], current_user["email"], current_user)
         
         return {
             "success": True,
             "message": "Profile updated successfully",
-            "data": {"user": current_user}
+            "data": data
         }
         
     except Exception as e:
@@ -203,26 +231,27 @@ async def update_profile(
 async def change_password(
     password_data: PasswordChange,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Change user password"""
     try:
         # Verify current password
-        if not verify_password(password_data.current_password, current_user["password"]):
+        if not await password_pool.verify(password_data.current_password, current_user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Current password is incorrect"
             )
         
         # Hash new password
-        new_hashed_password = get_password_hash(password_data.new_password)
+        new_hashed_password = await password_pool.hash(password_data.new_password)
         
         # Update password in database
         user_ref = db.collection(COLLECTIONS["USERS"]).document(current_user["id"])
-        user_ref.update({
+        await user_ref.update({
             "password": new_hashed_password,
             "updated_at": datetime.utcnow()
         })
+        invalidate_cached_user(current_user["id"])
         
         return {
             "success": True,
@@ -238,8 +267,32 @@ async def change_password(
         )
 
 @router.post("/logout", response_model=Dict[str, Any])
-async def logout():
-    """Logout user (client-side token invalidation)"""
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(optional_security),
+    db: AsyncClient = Depends(get_db)
+):
+    """Logout user and revoke the presented token"""
+    if credentials is not None:
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        try:
+            token_data = verify_token(credentials.credentials, credentials_exception)
+        except HTTPException:
+            # Already invalid, revoked or expired: nothing left to revoke
+            token_data = None
+        
+        if token_data is not None and token_data.jti:
+            try:
+                await revocation_store.revoke(db, token_data.jti, token_data.user_id, token_data.exp)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Logout failed: {str(e)}"
+                )
+    
     return {
         "success": True,
         "message": "Logged out successfully"
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict, Any, Optional, List
+from collections import Counter
 from pydantic import BaseModel
 
-from auth.dependencies import get_current_active_user
+from auth.dependencies import get_current_active_user, get_current_user_claims
 from config.database import get_db, COLLECTIONS
-from config.bigquery import get_bigquery_client
-from google.cloud.firestore import Client
+from services import market_data
+from services.role_matcher import MAX_MATCHES
+from google.cloud.firestore import AsyncClient
 
 router = APIRouter()
 
@@ -19,59 +21,52 @@ async def get_career_recommendations(
     include_salary: bool = True,
     include_skills: bool = True,
     current_user: dict = Depends(get_current_active_user),
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Get personalized career recommendations"""
     try:
-        # Mock recommendations for now (replace with AI logic)
-        recommendations = [
-            {
-                "job_title": "Software Engineer",
-                "industry": "Technology",
-                "match_score": 85,
-                "reason": "Based on your technical skills and interests",
-                "required_skills": ["Python", "JavaScript", "React", "Node.js"],
-                "salary_range": "₹6,00,000 - ₹12,00,000",
-                "career_path": ["Junior Developer", "Senior Developer", "Tech Lead"],
-                "action_steps": [
-                    "Complete Python certification",
-                    "Build portfolio projects",
-                    "Apply for entry-level positions"
-                ]
-            },
-            {
-                "job_title": "Data Scientist",
-                "industry": "Technology",
-                "match_score": 78,
-                "reason": "Your analytical skills align with data science",
-                "required_skills": ["Python", "Machine Learning", "Statistics", "SQL"],
-                "salary_range": "₹8,00,000 - ₹15,00,000",
-                "career_path": ["Data Analyst", "Data Scientist", "Senior Data Scientist"],
-                "action_steps": [
-                    "Learn machine learning fundamentals",
-                    "Complete data science projects",
-                    "Get relevant certifications"
-                ]
-            }
-        ]
+        if limit < 1 or limit > MAX_MATCHES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Limit must be between 1 and {MAX_MATCHES}"
+            )
+
+        matcher, freshness = market_data.role_matcher()
+        recommendations = matcher.top(
+            current_user.get("technical_skills", []) + current_user.get("soft_skills", []),
+            current_user.get("career_interests", []),
+            limit
+        )
+        for recommendation in recommendations:
+            if not include_salary:
+                recommendation.pop("average_salary")
+            if not include_skills:
+                for key in ("required_skills", "matched_skills", "missing_skills"):
+                    recommendation.pop(key)
+
+        salaries = [r["average_salary"] for r in recommendations if r.get("average_salary")]
+        top_skills = Counter(skill for r in recommendations for skill in r.get("required_skills", []))
         
         return {
             "success": True,
             "data": {
-                "recommendations": recommendations[:limit],
+                "recommendations": recommendations,
                 "user_profile": {
                     "career_stage": current_user.get("current_education_level", "Not Set"),
                     "experience_level": "Entry Level",
                     "profile_completion": current_user.get("profile_completion_percentage", 0)
                 },
                 "market_insights": {
-                    "total_opportunities": len(recommendations),
-                    "average_salary": "₹9,00,000",
-                    "top_skills": ["Python", "JavaScript", "React", "Machine Learning"]
-                }
+                    "total_opportunities": len(matcher.roles),
+                    "average_salary": round(sum(salaries) / len(salaries)) if salaries else None,
+                    "top_skills": [skill for skill, _ in top_skills.most_common(4)]
+                },
+                **freshness
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,31 +81,13 @@ async def get_job_market_trends(
 ):
     """Get job market trends"""
     try:
-        # Mock trends data (replace with BigQuery integration)
-        trends = [
-            {
-                "job_title": "Software Engineer",
-                "industry": "Technology",
-                "demand_score": 0.85,
-                "growth_rate": 15.2,
-                "average_salary": 900000,
-                "skill_requirements": ["Python", "JavaScript", "React", "Node.js"],
-                "date": "2024-01-01"
-            },
-            {
-                "job_title": "Data Scientist",
-                "industry": "Technology", 
-                "demand_score": 0.78,
-                "growth_rate": 22.1,
-                "average_salary": 1200000,
-                "skill_requirements": ["Python", "Machine Learning", "Statistics"],
-                "date": "2024-01-01"
-            }
-        ]
-        
-        # Filter by industry if specified
-        if industry:
-            trends = [t for t in trends if industry.lower() in t["industry"].lower()]
+        try:
+            trends, freshness = market_data.job_trends(timeframe, location, industry)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
         return {
             "success": True,
@@ -118,10 +95,13 @@ async def get_job_market_trends(
                 "trends": trends,
                 "timeframe": timeframe,
                 "location": location,
-                "industry": industry
+                "industry": industry,
+                **freshness
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -131,44 +111,25 @@ async def get_job_market_trends(
 @router.get("/skills", response_model=Dict[str, Any])
 async def get_skill_demand_analysis(
     skills: Optional[str] = None,
-    location: str = "India"
+    location: str = "India",
+    job_title: Optional[str] = None,
+    industry: Optional[str] = None
 ):
     """Get skill demand analysis"""
     try:
-        skill_list = skills.split(",") if skills else []
-        
-        # Mock skill data (replace with BigQuery integration)
-        skill_data = [
-            {
-                "skill_name": "Python",
-                "demand_score": 0.92,
-                "growth_rate": 18.5,
-                "average_salary_impact": 150000,
-                "job_titles": ["Software Engineer", "Data Scientist", "Backend Developer"],
-                "industries": ["Technology", "Finance", "Healthcare"],
-                "date": "2024-01-01"
-            },
-            {
-                "skill_name": "JavaScript",
-                "demand_score": 0.88,
-                "growth_rate": 12.3,
-                "average_salary_impact": 120000,
-                "job_titles": ["Frontend Developer", "Full Stack Developer", "Web Developer"],
-                "industries": ["Technology", "E-commerce", "Media"],
-                "date": "2024-01-01"
-            }
-        ]
+        skill_list = [skill.strip() for skill in skills.split(",") if skill.strip()] if skills else []
         
-        # Filter by requested skills if specified
-        if skill_list:
-            skill_data = [s for s in skill_data if s["skill_name"].lower() in [sk.lower() for sk in skill_list]]
+        skill_data, freshness = market_data.skill_demand(location, skill_list, job_title, industry)
         
         return {
             "success": True,
             "data": {
                 "skills": skill_data,
                 "location": location,
-                "requested_skills": skill_list
+                "requested_skills": skill_list,
+                "job_title": job_title,
+                "industry": industry,
+                **freshness
             }
         }
         
@@ -192,23 +153,7 @@ async def get_salary_insights(
                 detail="Job title is required"
             )
         
-        # Mock salary data (replace with BigQuery integration)
-        salary_data = [
-            {
-                "job_title": job_title,
-                "location": location,
-                "experience_level": experience,
-                "min_salary": 400000,
-                "max_salary": 800000,
-                "average_salary": 600000,
-                "median_salary": 580000,
-                "percentile_25": 450000,
-                "percentile_75": 700000,
-                "percentile_90": 750000,
-                "sample_size": 150,
-                "date": "2024-01-01"
-            }
-        ]
+        salary_data, freshness = market_data.salary_insights(job_title, location, experience)
         
         return {
             "success": True,
@@ -216,7 +161,8 @@ async def get_salary_insights(
                 "salary_data": salary_data,
                 "job_title": job_title,
                 "location": location,
-                "experience": experience
+                "experience": experience,
+                **freshness
             }
         }
         
@@ -228,46 +174,70 @@ async def get_salary_insights(
             detail=f"Failed to get salary insights: {str(e)}"
         )
 
+@router.get("/salary/compare", response_model=Dict[str, Any])
+async def compare_salaries(
+    job_titles: str,
+    location: str = "India",
+    experience: str = "0-2"
+):
+    """Compare salary insights across job titles"""
+    try:
+        title_list = [title.strip() for title in job_titles.split(",") if title.strip()]
+        if not title_list:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="At least one job title is required"
+            )
+        if len(title_list) > market_data.SALARY_COMPARE_MAX_TITLES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {market_data.SALARY_COMPARE_MAX_TITLES} job titles can be compared"
+            )
+
+        comparisons = market_data.salary_comparison(title_list, location, experience)
+
+        return {
+            "success": True,
+            "data": {
+                "comparisons": comparisons,
+                "location": location,
+                "experience": experience
+            }
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compare salaries: {str(e)}"
+        )
+
 @router.get("/emerging-roles", response_model=Dict[str, Any])
 async def get_emerging_job_roles(
     timeframe: str = "6M"
 ):
     """Get emerging job roles"""
     try:
-        # Mock emerging roles data (replace with BigQuery integration)
-        emerging_roles = [
-            {
-                "job_title": "AI Engineer",
-                "industry": "Technology",
-                "emergence_score": 0.85,
-                "growth_rate": 45.2,
-                "skill_requirements": ["Python", "Machine Learning", "TensorFlow", "PyTorch"],
-                "education_requirements": "Bachelor's in Computer Science or related field",
-                "salary_range": "₹10,00,000 - ₹20,00,000",
-                "location_distribution": ["Bangalore", "Mumbai", "Delhi", "Hyderabad"],
-                "date": "2024-01-01"
-            },
-            {
-                "job_title": "DevOps Engineer",
-                "industry": "Technology",
-                "emergence_score": 0.78,
-                "growth_rate": 32.1,
-                "skill_requirements": ["Docker", "Kubernetes", "AWS", "CI/CD"],
-                "education_requirements": "Bachelor's in Computer Science or related field",
-                "salary_range": "₹8,00,000 - ₹16,00,000",
-                "location_distribution": ["Bangalore", "Pune", "Mumbai", "Chennai"],
-                "date": "2024-01-01"
-            }
-        ]
+        try:
+            emerging_roles, freshness = market_data.emerging_roles(timeframe)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
         return {
             "success": True,
             "data": {
                 "emerging_roles": emerging_roles,
-                "timeframe": timeframe
+                "timeframe": timeframe,
+                **freshness
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -276,7 +246,7 @@ async def get_emerging_job_roles(
 
 @router.get("/skill-gaps", response_model=Dict[str, Any])
 async def get_skill_gap_analysis(
-    current_user: dict = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_user_claims)
 ):
     """Get skill gap analysis for user"""
     try:
@@ -327,7 +297,7 @@ async def get_skill_gap_analysis(
 @router.post("/roadmap", response_model=Dict[str, Any])
 async def generate_career_roadmap(
     roadmap_request: CareerRoadmapRequest,
-    current_user: dict = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_user_claims)
 ):
     """Generate career roadmap"""
     try:
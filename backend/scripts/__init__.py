@@ -0,0 +1 @@
+# Maintenance and batch jobs for CareerBridgeAI backend
@@ -0,0 +1,77 @@
+"""
+Backfill the emails index collection for users created before it existed.
+
+/register and /login only consult emails/{normalized_email}, so this must be
+run once against existing data. Users whose normalized email is already
+claimed by another account are reported and left for manual cleanup.
+
+Usage (from backend/):
+    python -m scripts.backfill_email_index [--dry-run]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config.database import initialize_firebase, get_db, COLLECTIONS
+from routers.auth import email_index_key
+
+BATCH_SIZE = 400
+
+
+async def backfill(dry_run: bool):
+    db = get_db()
+    emails_ref = db.collection(COLLECTIONS["EMAILS"])
+    claimed = {}
+    created = conflicts = 0
+    batch = db.batch()
+    pending = 0
+
+    async for user_doc in db.collection(COLLECTIONS["USERS"]).stream():
+        email = user_doc.to_dict().get("email")
+        if not email:
+            continue
+        key = email_index_key(email)
+
+        if key not in claimed:
+            existing = await emails_ref.document(key).get()
+            claimed[key] = existing.to_dict()["user_id"] if existing.exists else None
+
+        owner = claimed[key]
+        if owner == user_doc.id:
+            continue
+        if owner is not None:
+            conflicts += 1
+            print(f"⚠️ {email}: user {user_doc.id} conflicts with {owner}")
+            continue
+
+        claimed[key] = user_doc.id
+        created += 1
+        if not dry_run:
+            batch.create(emails_ref.document(key), {"user_id": user_doc.id, "created_at": datetime.utcnow()})
+            pending += 1
+            if pending >= BATCH_SIZE:
+                await batch.commit()
+                batch = db.batch()
+                pending = 0
+
+    if pending:
+        await batch.commit()
+
+    print(f"✅ {'Would create' if dry_run else 'Created'} {created} index entries, {conflicts} conflicts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing")
+    args = parser.parse_args()
+
+    initialize_firebase()
+    asyncio.run(backfill(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Deactivate or delete a user account and revoke every token issued to it.
+
+Access tokens are trusted by read-only routes without a user lookup (see
+get_current_user_claims), so accounts must be deactivated or deleted
+through this script rather than by editing the user document: it records a
+per-user revocation that every worker picks up on its next revocation sync.
+
+Usage (from backend/):
+    python -m scripts.deactivate_user <user_id>
+    python -m scripts.deactivate_user <user_id> --delete
+    python -m scripts.deactivate_user <user_id> --reactivate
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from auth.jwt_handler import ACCESS_TOKEN_EXPIRE_MINUTES
+from auth.revocation import revocation_store
+from config.database import initialize_firebase, get_db, COLLECTIONS
+from routers.auth import email_index_key
+
+
+async def deactivate(user_id: str, delete: bool, reactivate: bool):
+    db = get_db()
+    user_ref = db.collection(COLLECTIONS["USERS"]).document(user_id)
+    user_doc = await user_ref.get()
+    if not user_doc.exists:
+        print(f"❌ User {user_id} not found")
+        return
+
+    if reactivate:
+        # Tokens revoked earlier stay revoked; the user logs in again
+        await user_ref.update({"is_active": True, "updated_at": datetime.utcnow()})
+        print(f"✅ Reactivated user {user_id}")
+        return
+
+    if delete:
+        batch = db.batch()
+        batch.delete(user_ref)
+        email = user_doc.to_dict().get("email")
+        if email:
+            batch.delete(db.collection(COLLECTIONS["EMAILS"]).document(email_index_key(email)))
+        await batch.commit()
+    else:
+        await user_ref.update({"is_active": False, "updated_at": datetime.utcnow()})
+
+    # The newest token the user could hold expires a full token lifetime from now
+    await revocation_store.revoke_user(db, user_id, int(time.time()) + ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    print(f"✅ {'Deleted' if delete else 'Deactivated'} user {user_id} and revoked their tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("user_id")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--delete", action="store_true", help="Delete the user and their email index entry")
+    action.add_argument("--reactivate", action="store_true", help="Mark a deactivated user active again")
+    args = parser.parse_args()
+
+    initialize_firebase()
+    asyncio.run(deactivate(args.user_id, args.delete, args.reactivate))
+
+
+if __name__ == "__main__":
+    main()
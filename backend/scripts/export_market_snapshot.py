@@ -0,0 +1,239 @@
+"""
+Export the career_data BigQuery tables into a local Arrow snapshot for
+services/market_snapshot.py.
+
+Each table is written as an uncompressed Arrow IPC file, so it can be
+memory-mapped without a copy, and is sorted by its key columns and then by
+date, newest first. --parquet also writes a zstd-compressed Parquet copy for
+archiving or loading elsewhere. The new snapshot is built next to the output
+directory and swapped in with renames. Workers that still map the old files
+keep reading them until they restart.
+
+--synthetic ROWS skips BigQuery and generates tables of that size, for local
+development and benchmarks, plus --observations raw salary observations
+(default five per row) for services/salary_engine.py.
+
+Usage (from backend/):
+    python -m scripts.export_market_snapshot --output data/market_snapshot [--parquet]
+    python -m scripts.export_market_snapshot --output data/market_snapshot --synthetic 200000 [--observations 5000000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.bigquery import BIGQUERY_CONFIG
+from services.market_snapshot import MANIFEST, SNAPSHOT_VERSION, SORT_KEYS
+
+
+def sort_table(name: str, table: pa.Table) -> pa.Table:
+    keys = [(key, "ascending") for key in SORT_KEYS.get(name, [])]
+    if "date" in table.column_names:
+        keys.append(("date", "descending"))
+    return table.sort_by(keys) if keys else table
+
+
+# Tables the endpoints work without; skipped when the dataset does not have them
+OPTIONAL_TABLES = {"salary_observations"}
+
+
+def fetch_bigquery_tables() -> Dict[str, pa.Table]:
+    from google.api_core.exceptions import NotFound
+    from config.bigquery import initialize_bigquery, get_bigquery_client
+
+    initialize_bigquery()
+    client = get_bigquery_client()
+    tables = {}
+    for table_id in BIGQUERY_CONFIG["tables"].values():
+        started_at = time.perf_counter()
+        try:
+            table = client.list_rows(f"{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{table_id}").to_arrow()
+        except NotFound:
+            if table_id not in OPTIONAL_TABLES:
+                raise
+            print(f"  {table_id}: not found, skipped")
+            continue
+        print(f"  {table_id}: {table.num_rows} rows in {time.perf_counter() - started_at:.1f}s")
+        tables[table_id] = table
+    return tables
+
+
+TITLES = [
+    "Software Engineer", "Data Scientist", "Data Analyst", "Product Manager", "UX Designer", "DevOps Engineer",
+    "AI Engineer", "Cloud Architect", "Business Analyst", "Cybersecurity Analyst", "Mechanical Engineer",
+    "Financial Analyst", "Digital Marketer", "Nurse", "Teacher", "Full Stack Developer", "Mobile Developer",
+    "QA Engineer", "Site Reliability Engineer", "Machine Learning Engineer"
+]
+LEVELED_TITLES = TITLES + [f"{title} {level}" for title in TITLES for level in ("I", "II", "III", "Lead")]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Education", "Manufacturing", "E-commerce", "Media"]
+LOCATIONS = ["India", "Bangalore", "Mumbai", "Delhi", "Hyderabad", "Pune", "Chennai", "Kolkata"]
+SKILLS = [
+    "Python", "JavaScript", "React", "Node.js", "SQL", "Machine Learning", "Statistics", "Docker", "Kubernetes",
+    "AWS", "CI/CD", "TensorFlow", "PyTorch", "Communication", "Leadership", "Excel", "Figma", "Java", "Go", "Rust"
+]
+EXPERIENCE_LEVELS = ["0-2", "2-5", "5-10", "10+"]
+
+
+def synthetic_tables(rows: int, seed: int = 7) -> Dict[str, pa.Table]:
+    """Random tables with the columns the endpoints read, about `rows` rows in each"""
+    rng = random.Random(seed)
+    today = date.today()
+    titles = LEVELED_TITLES
+
+    def dates(n):
+        return [today - timedelta(days=rng.randint(0, 900)) for _ in range(n)]
+
+    # Each title grows at its own rate, so some of them qualify as emerging
+    title_growth = {title: rng.uniform(0, 40) for title in titles}
+    trend_titles = [rng.choice(titles) for _ in range(rows)]
+    job_trends = pa.table({
+        "job_title": trend_titles,
+        "industry": [rng.choice(INDUSTRIES) for _ in range(rows)],
+        "location": [rng.choice(LOCATIONS) for _ in range(rows)],
+        "demand_score": [round(rng.random(), 3) for _ in range(rows)],
+        "growth_rate": [round(rng.gauss(title_growth[title], 8), 1) for title in trend_titles],
+        "average_salary": [rng.randint(3, 40) * 50000 for _ in range(rows)],
+        "skill_requirements": [rng.sample(SKILLS, 4) for _ in range(rows)],
+        "date": pa.array(dates(rows), pa.date32())
+    })
+    skill_names = SKILLS + [f"{skill} ({variant})" for skill in SKILLS for variant in ("basics", "advanced")]
+    skill_demand = pa.table({
+        "skill_name": [rng.choice(skill_names) for _ in range(rows)],
+        "location": [rng.choice(LOCATIONS) for _ in range(rows)],
+        "demand_score": [round(rng.random(), 3) for _ in range(rows)],
+        "growth_rate": [round(rng.gauss(12, 8), 1) for _ in range(rows)],
+        "average_salary_impact": [rng.randint(1, 40) * 10000 for _ in range(rows)],
+        "job_titles": [rng.sample(TITLES, 3) for _ in range(rows)],
+        "industries": [rng.sample(INDUSTRIES, 3) for _ in range(rows)],
+        "date": pa.array(dates(rows), pa.date32())
+    })
+    medians = [rng.randint(3, 40) * 50000 for _ in range(rows)]
+    salary_data = pa.table({
+        "job_title": [rng.choice(titles) for _ in range(rows)],
+        "location": [rng.choice(LOCATIONS) for _ in range(rows)],
+        "experience_level": [rng.choice(EXPERIENCE_LEVELS) for _ in range(rows)],
+        "min_salary": [int(m * 0.6) for m in medians],
+        "max_salary": [int(m * 1.5) for m in medians],
+        "average_salary": [int(m * 1.05) for m in medians],
+        "median_salary": medians,
+        "percentile_25": [int(m * 0.8) for m in medians],
+        "percentile_75": [int(m * 1.2) for m in medians],
+        "percentile_90": [int(m * 1.4) for m in medians],
+        "sample_size": [rng.randint(5, 500) for _ in range(rows)],
+        "date": pa.array(dates(rows), pa.date32())
+    })
+    small = max(1, rows // 100)
+    return {
+        "job_trends": job_trends,
+        "skill_demand": skill_demand,
+        "salary_data": salary_data,
+        "industry_analysis": pa.table({
+            "industry": [rng.choice(INDUSTRIES) for _ in range(small)],
+            "growth_rate": [round(rng.gauss(8, 5), 1) for _ in range(small)],
+            "date": pa.array(dates(small), pa.date32())
+        }),
+        "location_insights": pa.table({
+            "location": [rng.choice(LOCATIONS) for _ in range(small)],
+            "job_count": [rng.randint(100, 100000) for _ in range(small)],
+            "date": pa.array(dates(small), pa.date32())
+        }),
+        "education_requirements": pa.table({
+            "job_title": [rng.choice(TITLES) for _ in range(small)],
+            "education_requirements": ["Bachelor's in a related field" for _ in range(small)]
+        })
+    }
+
+
+def synthetic_salary_observations(count: int, seed: int = 7) -> pa.Table:
+    """Random salary observations: a base pay per title, scaled by location and experience"""
+    rng = np.random.default_rng(seed)
+    titles = rng.integers(0, len(LEVELED_TITLES), count)
+    locations = rng.integers(0, len(LOCATIONS), count)
+    years = np.round(rng.gamma(2.0, 2.5, count), 1)
+    base = rng.uniform(3, 15, len(LEVELED_TITLES)) * 100000
+    location_factor = rng.uniform(0.8, 1.3, len(LOCATIONS))
+    salaries = base[titles] * location_factor[locations] * (1 + 0.12 * years) * rng.lognormal(0, 0.25, count)
+    days = rng.integers(0, 900, count)
+    return pa.table({
+        "job_title": pa.DictionaryArray.from_arrays(titles.astype(np.int32), LEVELED_TITLES).cast(pa.string()),
+        "location": pa.DictionaryArray.from_arrays(locations.astype(np.int32), LOCATIONS).cast(pa.string()),
+        "years_experience": years,
+        "salary": np.round(salaries, -3).astype(np.int64),
+        "date": pa.array(np.datetime64(date.today(), "D") - days, pa.date32())
+    })
+
+
+def write_snapshot(tables: Dict[str, pa.Table], output: str, parquet: bool = False, source: str = "bigquery"):
+    """Write tables to a fresh directory and swap it into place at output"""
+    output = os.path.abspath(output)
+    staging = f"{output}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "exported_at": datetime.utcnow().isoformat(),
+        "source": source,
+        "tables": {}
+    }
+    for name, table in tables.items():
+        table = sort_table(name, table)
+        filename = f"{name}.arrow"
+        with pa.OSFile(os.path.join(staging, filename), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        if parquet:
+            pq.write_table(table, os.path.join(staging, f"{name}.parquet"), compression="zstd")
+        manifest["tables"][name] = {"file": filename, "rows": table.num_rows, "schema": table.schema.to_string()}
+
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    previous = f"{output}.old-{os.getpid()}"
+    if os.path.exists(output):
+        os.rename(output, previous)
+    os.rename(staging, output)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=os.getenv("MARKET_SNAPSHOT_DIR") or "data/market_snapshot")
+    parser.add_argument("--parquet", action="store_true", help="Also write Parquet copies")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generate this many rows per table instead of querying")
+    parser.add_argument("--observations", type=int, default=None,
+                        help="Salary observations to generate with --synthetic (default: five per row)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    if args.synthetic:
+        tables = synthetic_tables(args.synthetic, args.seed)
+        observations = args.synthetic * 5 if args.observations is None else args.observations
+        if observations:
+            tables["salary_observations"] = synthetic_salary_observations(observations, args.seed)
+    else:
+        tables = fetch_bigquery_tables()
+    manifest = write_snapshot(tables, args.output, parquet=args.parquet, source="synthetic" if args.synthetic else "bigquery")
+
+    rows = sum(info["rows"] for info in manifest["tables"].values())
+    size = sum(os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output))
+    print(f"✅ Wrote {len(manifest['tables'])} tables ({rows} rows, {size / 2**20:.1f} MiB) to {args.output} "
+          f"in {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
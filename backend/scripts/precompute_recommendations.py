@@ -0,0 +1,165 @@
+"""
+Precompute recommendations for the career-assessment answer space into a
+memory-mapped lookup table (see services/recommendation_table.py).
+
+The rule engine is cheap enough to cover all 8,192,000 combinations; Gemini
+is not, so --source gemini requires --sample and fills only the sampled
+combinations (the API generates the rest live). Identical payloads are
+stored once.
+
+Point RECOMMENDATION_TABLE_PATH at the output to serve it.
+
+Usage (from backend/):
+    python -m scripts.precompute_recommendations --output data/recommendations.tbl [--workers 8]
+    python -m scripts.precompute_recommendations --source gemini --sample 20000 --output data/recommendations.tbl
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.recommendation_cache import normalize_answers
+from services.recommendation_rules import generate_personalized_recommendations
+from services.recommendation_table import COMBINATIONS, MISSING, combination_answers, write_table
+
+CHUNK_SIZE = 65536
+
+
+def encode_payload(recommendations: Dict) -> bytes:
+    return json.dumps(recommendations, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class PayloadPool:
+    """De-duplicates payloads, handing out dense ids in first-seen order"""
+
+    def __init__(self):
+        self.ids: Dict[bytes, int] = {}
+        self.payloads: List[bytes] = []
+
+    def add(self, payload: bytes) -> int:
+        payload_id = self.ids.get(payload)
+        if payload_id is None:
+            payload_id = self.ids[payload] = len(self.payloads)
+            self.payloads.append(payload)
+        return payload_id
+
+
+def _rules_chunk(indices: List[int]) -> Tuple[List[int], List[bytes], bytes]:
+    """Run the rule engine over some combinations; ids are local to the chunk"""
+    pool = PayloadPool()
+    local_ids = array("I")
+    for index in indices:
+        answers = normalize_answers(combination_answers(index))
+        local_ids.append(pool.add(encode_payload(generate_personalized_recommendations(answers))))
+    return indices, pool.payloads, local_ids.tobytes()
+
+
+def precompute_rules(indices: List[int], workers: int, index: array, pool: PayloadPool):
+    chunks = [indices[i:i + CHUNK_SIZE] for i in range(0, len(indices), CHUNK_SIZE)]
+    done = 0
+    started = time.perf_counter()
+
+    def merge(result):
+        nonlocal done
+        chunk_indices, payloads, local_ids = result
+        remap = [pool.add(payload) for payload in payloads]
+        for combination, local_id in zip(chunk_indices, array("I", local_ids)):
+            index[combination] = remap[local_id]
+        done += len(chunk_indices)
+        rate = done / (time.perf_counter() - started)
+        print(f"  {done:,}/{len(indices):,} combinations, {len(pool.payloads):,} distinct payloads ({rate:,.0f}/s)")
+
+    if workers <= 1:
+        for chunk in chunks:
+            merge(_rules_chunk(chunk))
+        return
+
+    with multiprocessing.get_context("spawn").Pool(workers) as processes:
+        for result in processes.imap_unordered(_rules_chunk, chunks):
+            merge(result)
+
+
+async def precompute_gemini(indices: List[int], concurrency: int, index: array, pool: PayloadPool):
+    from services.gemini_service import GeminiService
+
+    # Skip the answer cache: every combination here is distinct anyway
+    service = GeminiService(cache=None)
+    await service.warm_up()
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def generate(combination: int):
+        nonlocal failures
+        async with semaphore:
+            result = await service.generate_course_recommendations_async(combination_answers(combination))
+        if result.get("success"):
+            index[combination] = pool.add(encode_payload(result["recommendations"]))
+        else:
+            failures += 1
+
+    try:
+        for start in range(0, len(indices), CHUNK_SIZE):
+            await asyncio.gather(*(generate(combination) for combination in indices[start:start + CHUNK_SIZE]))
+            print(f"  {min(start + CHUNK_SIZE, len(indices)):,}/{len(indices):,} combinations, {failures} failed")
+    finally:
+        await service.client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Table file to write")
+    parser.add_argument("--source", choices=["rules", "gemini"], default="rules")
+    parser.add_argument("--sample", type=int, help="Fill a random subset of this many combinations")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for --source rules")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent Gemini calls for --source gemini")
+    args = parser.parse_args()
+
+    if args.source == "gemini" and not args.sample:
+        parser.error("--source gemini needs --sample")
+
+    if args.sample:
+        indices = sorted(random.Random(args.seed).sample(range(COMBINATIONS), min(args.sample, COMBINATIONS)))
+    else:
+        indices = list(range(COMBINATIONS))
+
+    index = array("I", [MISSING]) * COMBINATIONS
+    pool = PayloadPool()
+    started = time.perf_counter()
+    print(f"🚀 Precomputing {len(indices):,} of {COMBINATIONS:,} combinations with {args.source}")
+
+    if args.source == "rules":
+        precompute_rules(indices, args.workers, index, pool)
+        model = "rules"
+    else:
+        asyncio.run(precompute_gemini(indices, args.concurrency, index, pool))
+        model = os.getenv("GEMINI_MODEL", "gemini-pro")
+
+    filled = COMBINATIONS - index.count(MISSING)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_table(args.output, index, pool.payloads, {
+        "source": args.source,
+        "model": model,
+        "generated_at": datetime.utcnow().isoformat(),
+        "filled": filled
+    })
+
+    size_mib = os.path.getsize(args.output) / 2**20
+    print(f"✅ Wrote {args.output}: {filled:,} combinations, {len(pool.payloads):,} payloads, "
+          f"{size_mib:.1f} MiB in {time.perf_counter() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+class CircuitBreaker:
+    """
+    Count-based circuit breaker over failures and slow calls.
+
+    While closed, the outcome of the last `window` calls is kept; once at
+    least `min_calls` are recorded and the failure rate or the slow-call rate
+    reaches its threshold, the circuit opens and callers are turned away
+    immediately. After `open_seconds` it goes half-open and lets
+    `half_open_calls` probes through: all of them succeeding quickly closes
+    it again, any failure or slow probe re-opens it.
+
+    Like TTLCache, it is only touched from the event loop, so there is no locking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        # (failed, slow) per recorded call
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "CircuitBreaker":
+        """Build a breaker from {prefix}_* environment settings"""
+        return cls(
+            name,
+            failure_rate=float(os.getenv(f"{prefix}_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv(f"{prefix}_SLOW_CALL_SECONDS", "10")),
+            slow_call_rate=float(os.getenv(f"{prefix}_SLOW_CALL_RATE", "0.8")),
+            window=int(os.getenv(f"{prefix}_WINDOW", "20")),
+            min_calls=int(os.getenv(f"{prefix}_MIN_CALLS", "10")),
+            open_seconds=float(os.getenv(f"{prefix}_OPEN_SECONDS", "30")),
+            half_open_calls=int(os.getenv(f"{prefix}_HALF_OPEN_CALLS", "3"))
+        )
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        print(f"⚠️ Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.times_opened += 1
+        elif state == HALF_OPEN:
+            self._probes_started = 0
+            self._probes_passed = 0
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; a True in half-open state starts a probe"""
+        if self.state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self._probes_started < self.half_open_calls:
+            self._probes_started += 1
+            return True
+
+        self.rejected += 1
+        return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+
+    def release(self):
+        """Forget a call that allow() let through but that ended without an outcome, e.g. cancelled"""
+        if self.state == HALF_OPEN and self._probes_started > 0:
+            self._probes_started -= 1
+
+    def record(self, duration: float, failed: bool):
+        """Record the outcome of a call that allow() let through"""
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._transition(OPEN)
+            else:
+                self._probes_passed += 1
+                if self._probes_passed >= self.half_open_calls:
+                    self._transition(CLOSED)
+            return
+
+        if self.state == OPEN:
+            # A call that started before the circuit opened
+            return
+
+        self._outcomes.append((failed, slow))
+        rates = self._rates()
+        if len(self._outcomes) >= self.min_calls and (
+            rates["failure_rate"] >= self.failure_rate or rates["slow_call_rate"] >= self.slow_call_rate
+        ):
+            self._transition(OPEN)
+
+    def _rates(self) -> Dict[str, float]:
+        calls = len(self._outcomes)
+        if not calls:
+            return {"failure_rate": 0.0, "slow_call_rate": 0.0}
+        return {
+            "failure_rate": sum(failed for failed, _ in self._outcomes) / calls,
+            "slow_call_rate": sum(slow for _, slow in self._outcomes) / calls
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        rates = self._rates()
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "failure_rate": round(rates["failure_rate"], 4),
+            "slow_call_rate": round(rates["slow_call_rate"], 4),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
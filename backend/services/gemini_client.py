@@ -0,0 +1,307 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+import httpx
+
+class GeminiAPIError(Exception):
+    """Error returned by the Gemini REST API"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+class LatencyWindow:
+    """Rolling window of recent durations for percentile reporting"""
+
+    def __init__(self, size: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self._samples:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        samples = sorted(self._samples)
+        pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 1)
+        return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class GeminiClient:
+    """
+    Async client for the Gemini generateContent REST endpoint.
+
+    Every call has an overall deadline that covers waiting for a concurrency
+    slot, the request itself and any retries. A semaphore caps concurrent
+    upstream calls for the whole process, and transient failures are retried
+    with exponential backoff and full jitter. Point base_url at a local fake
+    server (see benchmarks/fake_gemini_server.py) to exercise it offline.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-pro",
+        base_url: str = "https://generativelanguage.googleapis.com",
+        deadline: float = 30.0,
+        max_concurrency: int = 8,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.model = model
+        self.deadline = deadline
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=deadline,
+            headers={"x-goog-api-key": api_key}
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.latency = LatencyWindow()
+        self.queue_wait = LatencyWindow()
+        self.first_chunk = LatencyWindow()
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    @classmethod
+    def from_env(cls, api_key: str, **kwargs) -> "GeminiClient":
+        """Build a client from GEMINI_* environment settings"""
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com"),
+            deadline=float(os.getenv("GEMINI_DEADLINE_SECONDS", "30")),
+            max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "2")),
+            **kwargs
+        )
+
+    def _request_body(self, prompt: str) -> Dict[str, Any]:
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    @staticmethod
+    def _extract_text(payload: Dict[str, Any]) -> str:
+        try:
+            parts = payload["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError):
+            raise GeminiAPIError("Gemini response has no candidates")
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def _extract_usage(payload: Dict[str, Any]) -> Dict[str, int]:
+        usage = payload.get("usageMetadata") or {}
+        return {
+            "prompt_tokens": int(usage.get("promptTokenCount", 0)),
+            "output_tokens": int(usage.get("candidatesTokenCount", 0))
+        }
+
+    async def _post(self, prompt: str, timeout: float) -> Tuple[str, Dict[str, int]]:
+        response = await self._http.post(
+            f"/v1beta/models/{self.model}:generateContent",
+            json=self._request_body(prompt),
+            timeout=timeout
+        )
+        if response.status_code != 200:
+            raise GeminiAPIError(
+                f"Gemini returned HTTP {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retryable=response.status_code in RETRYABLE_STATUS_CODES
+            )
+        payload = response.json()
+        return self._extract_text(payload), self._extract_usage(payload)
+
+    async def warm_up(self):
+        """Fetch the model's metadata, failing fast on a bad key or model name"""
+        response = await self._http.get(f"/v1beta/models/{self.model}", timeout=self.deadline)
+        if response.status_code != 200:
+            raise GeminiAPIError(
+                f"Gemini model {self.model} unavailable: HTTP {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code
+            )
+
+    async def generate_content(self, prompt: str) -> str:
+        """Generate text for a prompt within the client's deadline"""
+        text, _ = await self.generate_content_with_usage(prompt)
+        return text
+
+    async def generate_content_with_usage(self, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """generate_content, also returning the call's prompt and output token counts"""
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        self.calls += 1
+        attempt = 0
+        
+        while True:
+            remaining = deadline_at - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                
+                queued_at = time.perf_counter()
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining)
+                finally:
+                    self.waiting -= 1
+                self.queue_wait.add(time.perf_counter() - queued_at)
+                
+                self.in_flight += 1
+                started_at = time.perf_counter()
+                try:
+                    attempt_timeout = max(0.001, deadline_at - loop.time())
+                    text, usage = await asyncio.wait_for(self._post(prompt, attempt_timeout), timeout=attempt_timeout)
+                finally:
+                    self.in_flight -= 1
+                    self._semaphore.release()
+                
+                self.latency.add(time.perf_counter() - started_at)
+                self.successes += 1
+                self.prompt_tokens += usage["prompt_tokens"]
+                self.output_tokens += usage["output_tokens"]
+                return text, usage
+            
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                self.timeouts += 1
+                error = GeminiAPIError(f"Gemini call exceeded {self.deadline}s deadline", retryable=False)
+            except httpx.TransportError as e:
+                error = GeminiAPIError(f"Gemini transport error: {e}", retryable=True)
+            except GeminiAPIError as e:
+                error = e
+            
+            backoff = random.uniform(0, self.backoff_base * (2 ** attempt))
+            if not error.retryable or attempt >= self.max_retries or loop.time() + backoff >= deadline_at:
+                self.failures += 1
+                raise error
+            
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(backoff)
+
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream generated text chunks via streamGenerateContent (SSE).
+
+        The deadline covers the whole stream. Failures are retried like
+        generate_content only until the first chunk has been yielded;
+        after that the error is raised to the consumer.
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        self.calls += 1
+        attempt = 0
+        yielded = False
+        usage = {"prompt_tokens": 0, "output_tokens": 0}
+        
+        while True:
+            remaining = deadline_at - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                
+                queued_at = time.perf_counter()
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining)
+                finally:
+                    self.waiting -= 1
+                self.queue_wait.add(time.perf_counter() - queued_at)
+                
+                self.in_flight += 1
+                started_at = time.perf_counter()
+                try:
+                    async with self._http.stream(
+                        "POST",
+                        f"/v1beta/models/{self.model}:streamGenerateContent",
+                        params={"alt": "sse"},
+                        json=self._request_body(prompt),
+                        timeout=max(0.001, deadline_at - loop.time())
+                    ) as response:
+                        if response.status_code != 200:
+                            body = (await response.aread()).decode("utf-8", "replace")
+                            raise GeminiAPIError(
+                                f"Gemini returned HTTP {response.status_code}: {body[:200]}",
+                                status_code=response.status_code,
+                                retryable=response.status_code in RETRYABLE_STATUS_CODES
+                            )
+                        async for line in response.aiter_lines():
+                            if loop.time() > deadline_at:
+                                raise asyncio.TimeoutError()
+                            if not line.startswith("data:"):
+                                continue
+                            payload = json.loads(line[5:])
+                            if "usageMetadata" in payload:
+                                # Running totals; the last chunk carries the final counts
+                                usage = self._extract_usage(payload)
+                            text = self._extract_text(payload)
+                            if not text:
+                                continue
+                            if not yielded:
+                                self.first_chunk.add(time.perf_counter() - started_at)
+                                yielded = True
+                            yield text
+                finally:
+                    self.in_flight -= 1
+                    self._semaphore.release()
+                
+                self.latency.add(time.perf_counter() - started_at)
+                self.successes += 1
+                self.prompt_tokens += usage["prompt_tokens"]
+                self.output_tokens += usage["output_tokens"]
+                return
+            
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                self.timeouts += 1
+                error = GeminiAPIError(f"Gemini call exceeded {self.deadline}s deadline", retryable=False)
+            except httpx.TransportError as e:
+                error = GeminiAPIError(f"Gemini transport error: {e}", retryable=True)
+            except GeminiAPIError as e:
+                error = e
+            
+            backoff = random.uniform(0, self.backoff_base * (2 ** attempt))
+            if yielded or not error.retryable or attempt >= self.max_retries or loop.time() + backoff >= deadline_at:
+                self.failures += 1
+                raise error
+            
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(backoff)
+
+    async def aclose(self):
+        """Close the underlying HTTP connection pool"""
+        await self._http.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "latency": self.latency.percentiles(),
+            "queue_wait": self.queue_wait.percentiles(),
+            "time_to_first_chunk": self.first_chunk.percentiles()
+        }
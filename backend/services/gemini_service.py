@@ -1,48 +1,335 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
 import os
 import json
-from typing import Dict, List, Any
+import time
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from services.gemini_client import GeminiClient
+from services.recommendation_cache import RecommendationCache, recommendation_cache, normalize_answers, answers_key
+from services.recommendation_table import get_recommendation_table
+from services.json_stream import JSONStreamExtractor, extract_json_object
+from services.recommendation_schema import validate_course, validate_recommendations
+from services.single_flight import SingleFlight
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.recommendation_rules import generate_personalized_recommendations
+
+# Profiles packed into one Gemini call by cohort generation
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "5"))
+# USD per million tokens, used for the per-student cost report
+GEMINI_INPUT_COST_PER_MTOK = float(os.getenv("GEMINI_INPUT_COST_PER_MTOK", "0.5"))
+GEMINI_OUTPUT_COST_PER_MTOK = float(os.getenv("GEMINI_OUTPUT_COST_PER_MTOK", "1.5"))
+
+RECOMMENDATION_FORMAT = """{
+    "career_path": "Recommended career path based on interests and skills",
+    "skill_gaps": ["List of skills the student should develop"],
+    "courses": [
+        {
+            "title": "Course Title",
+            "description": "Brief course description",
+            "category": "Technical/Soft Skills/Business/etc",
+            "difficulty": "Beginner/Intermediate/Advanced",
+            "duration": "Estimated duration (e.g., 3 months, 6 weeks)",
+            "platform": "Suggested learning platform",
+            "priority": "High/Medium/Low",
+            "reason": "Why this course is recommended"
+        }
+    ],
+    "learning_path": "Step-by-step learning progression",
+    "next_steps": ["Immediate actions the student should take"]
+}"""
+
+RECOMMENDATION_FOCUS = """Focus on:
+1. Courses that align with their career interests
+2. Skills that bridge their current level to their goals
+3. Practical, industry-relevant recommendations
+4. Mix of technical and soft skills
+5. Consider their experience level and preferred work environment"""
+
+class InvalidRecommendationsError(ValueError):
+    """Raised when a Gemini reply holds no recommendation document that passes the schema"""
 
 class GeminiService:
-    def __init__(self):
+    def __init__(self, cache: Optional[RecommendationCache] = recommendation_cache):
         """Initialize Gemini Pro API"""
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model_name = os.getenv('GEMINI_MODEL', 'gemini-pro')
+        self.client = GeminiClient.from_env(self.api_key, model=self.model_name)
+        self.cache = cache
+        # Identical concurrent prompts share one upstream call
+        self.single_flight = SingleFlight()
+        # Stops calling Gemini while it is failing or slow; callers get rule-based results
+        self.breaker = CircuitBreaker.from_env("gemini", "GEMINI_BREAKER")
+    
+    async def warm_up(self):
+        """Check the key and model against the API and open the connection pool"""
+        await self.client.warm_up()
     
-    def generate_course_recommendations(self, student_responses: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_course_recommendations_async(self, student_responses: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Generate personalized course recommendations based on student responses
+        Generate personalized course recommendations without blocking the event loop
         """
         try:
-            # Create a structured prompt for Gemini
-            prompt = self._create_recommendation_prompt(student_responses)
+            answers = normalize_answers(student_responses)
+            cache_key = answers_key(answers, self.model_name)
+            cached = self._get_cached(answers, cache_key)
+            if cached is not None:
+                return cached
             
-            # Generate response from Gemini
-            response = self.model.generate_content(prompt)
+            recommendations, _ = await self._generate_single(answers)
             
-            # Parse the response
-            recommendations = self._parse_gemini_response(response.text)
+            return self._store_result(cache_key, recommendations)
             
-            return {
-                "success": True,
-                "recommendations": recommendations,
-                "generated_at": datetime.utcnow().isoformat()
+        except Exception as e:
+            return self._fallback_result(student_responses, e)
+    
+    async def _generate_single(self, answers: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Recommendations and token usage for one student's normalized answers"""
+        prompt = self._create_recommendation_prompt(answers)
+        prompt_key = hashlib.sha256(f"{self.model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        return await self.single_flight.do(prompt_key, lambda: self._generate_and_parse(prompt))
+    
+    async def _generate_and_parse(self, prompt: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        response_text, usage = await self._call_gemini(prompt)
+        return self._parse_gemini_response(response_text), usage
+    
+    async def _call_gemini(self, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """One generateContent call through the circuit breaker"""
+        self.breaker.check()
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.generate_content_with_usage(prompt)
+        except asyncio.CancelledError:
+            # The caller gave up; that says nothing about Gemini's health
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record(time.perf_counter() - started_at, failed=True)
+            raise
+        self.breaker.record(time.perf_counter() - started_at, failed=False)
+        return response
+    
+    async def generate_cohort_recommendations_async(
+        self,
+        cohort: List[Dict[str, Any]],
+        batch_size: int = GEMINI_BATCH_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        Recommendations for many students at once, in input order.
+        
+        Cached students are answered directly, identical profiles are generated
+        once, and the rest are packed batch_size to a Gemini call with keyed
+        outputs. A student whose entry is missing from the batch answer or fails
+        the schema falls back to a single-mode call. Every result carries a
+        "usage" entry with the mode used and the latency, tokens and estimated
+        cost attributed to that student.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cohort)
+        pending: Dict[str, List[int]] = {}
+        pending_answers: Dict[str, Dict[str, Any]] = {}
+        
+        for index, student_responses in enumerate(cohort):
+            started_at = time.perf_counter()
+            try:
+                answers = normalize_answers(student_responses)
+                cache_key = answers_key(answers, self.model_name)
+                cached = self._get_cached(answers, cache_key)
+            except Exception as e:
+                results[index] = self._with_usage(self._fallback_result(student_responses, e), "fallback", 0.0)
+                continue
+            if cached is not None:
+                results[index] = self._with_usage(cached, "cached", time.perf_counter() - started_at)
+                continue
+            pending.setdefault(cache_key, []).append(index)
+            pending_answers[cache_key] = answers
+        
+        keys = list(pending)
+        batches = [
+            [(cache_key, pending_answers[cache_key], len(pending[cache_key])) for cache_key in keys[i:i + batch_size]]
+            for i in range(0, len(keys), max(1, batch_size))
+        ]
+        for batch_results in await asyncio.gather(*(self._generate_batch(batch) for batch in batches)):
+            for cache_key, result in batch_results.items():
+                for index in pending[cache_key]:
+                    results[index] = result
+        
+        return results
+    
+    async def _generate_batch(self, batch: List[Tuple[str, Dict[str, Any], int]]) -> Dict[str, Dict[str, Any]]:
+        """Results by cache key for (cache_key, answers, students) entries sharing one call"""
+        started_at = time.perf_counter()
+        usage = None
+        document: Dict[str, Any] = {}
+        if len(batch) > 1:
+            try:
+                response_text, usage = await self._call_gemini(self._create_batch_prompt([answers for _, answers, _ in batch]))
+                document = extract_json_object(response_text) or {}
+            except Exception as e:
+                print(f"⚠️ Cohort batch of {len(batch)} failed, falling back to single calls: {e}")
+        latency = time.perf_counter() - started_at
+        students = sum(count for _, _, count in batch)
+        
+        results = {}
+        retries = []
+        for index, (cache_key, answers, count) in enumerate(batch):
+            recommendations = document.get(f"s{index + 1}")
+            if isinstance(recommendations, dict) and not validate_recommendations(recommendations):
+                result = self._store_result(cache_key, recommendations)
+                results[cache_key] = self._with_usage(result, "batch", latency, [(usage, 1 / students)])
+            else:
+                retries.append((cache_key, answers, count))
+        
+        async def single(cache_key: str, answers: Dict[str, Any], count: int):
+            started_at = time.perf_counter()
+            try:
+                recommendations, single_usage = await self._generate_single(answers)
+                result = self._store_result(cache_key, recommendations)
+                mode = "single"
+            except Exception as e:
+                result, single_usage, mode = self._fallback_result(answers, e), None, "fallback"
+            # The failed batch call is shared by everyone in it; the retry only by this profile
+            results[cache_key] = self._with_usage(
+                result, mode, latency + time.perf_counter() - started_at,
+                [(usage, 1 / students), (single_usage, 1 / count)]
+            )
+        
+        await asyncio.gather(*(single(*entry) for entry in retries))
+        return results
+    
+    def _with_usage(
+        self,
+        result: Dict[str, Any],
+        mode: str,
+        latency: float,
+        calls: List[Tuple[Optional[Dict[str, int]], float]] = ()
+    ) -> Dict[str, Any]:
+        """A copy of result with a usage report built from (call usage, student's share) pairs"""
+        prompt_tokens = sum(usage["prompt_tokens"] * share for usage, share in calls if usage)
+        output_tokens = sum(usage["output_tokens"] * share for usage, share in calls if usage)
+        cost = (prompt_tokens * GEMINI_INPUT_COST_PER_MTOK + output_tokens * GEMINI_OUTPUT_COST_PER_MTOK) / 1_000_000
+        return {
+            **result,
+            "usage": {
+                "mode": mode,
+                "latency_ms": round(latency * 1000, 1),
+                "prompt_tokens": round(prompt_tokens, 1),
+                "output_tokens": round(output_tokens, 1),
+                "cost_usd": round(cost, 8)
             }
+        }
+    
+    async def stream_course_recommendations(self, student_responses: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate recommendations as a stream of ("course", course) events, one per
+        course as soon as it is complete, followed by one ("complete", result)
+        event carrying the same envelope as generate_course_recommendations_async.
+        
+        The courses in the final result are always exactly the ones streamed: if
+        Gemini fails after some courses were sent, or the stream ends without a
+        valid document holding just those courses (truncated output, a schema
+        error, an abandoned draft), the result keeps the streamed courses, takes
+        the other fields from the fallback and is marked "partial". Only a
+        validated document is cached.
+        """
+        streamed: List[Dict[str, Any]] = []
+        try:
+            answers = normalize_answers(student_responses)
+            cache_key = answers_key(answers, self.model_name)
+            result = self._get_cached(answers, cache_key)
+            if result is not None:
+                for course in result["recommendations"].get("courses", []):
+                    yield "course", course
+                yield "complete", result
+                return
+            
+            prompt = self._create_recommendation_prompt(answers)
+            extractor = JSONStreamExtractor(array_key="courses", item_validator=validate_course)
+            self.breaker.check()
+            started_at = time.perf_counter()
+            try:
+                async for chunk in self.client.stream_content(prompt):
+                    for course in extractor.feed(chunk):
+                        streamed.append(course)
+                        yield "course", course
+            except (GeneratorExit, asyncio.CancelledError):
+                # The consumer stopped reading; not Gemini's fault
+                self.breaker.release()
+                raise
+            except Exception:
+                self.breaker.record(time.perf_counter() - started_at, failed=True)
+                raise
+            self.breaker.record(time.perf_counter() - started_at, failed=False)
+            
+            recommendations = self._validated_recommendations(extractor.document)
+            if recommendations["courses"] != streamed:
+                raise InvalidRecommendationsError("Gemini response courses differ from the streamed courses")
+            result = self._store_result(cache_key, recommendations)
             
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to generate recommendations: {str(e)}",
-                "recommendations": self._get_fallback_recommendations(student_responses)
-            }
+            result = self._fallback_result(student_responses, e)
+            if streamed:
+                # The client already shows these courses; don't swap them for the fallback's
+                result["recommendations"] = {**result["recommendations"], "courses": streamed}
+                result["partial"] = True
+            else:
+                for course in result["recommendations"].get("courses", []):
+                    yield "course", course
+        
+        yield "complete", result
     
-    def _create_recommendation_prompt(self, responses: Dict[str, Any]) -> str:
-        """Create a structured prompt for Gemini Pro"""
+    def _fallback_result(self, student_responses: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Rule-engine recommendations for when Gemini is unavailable"""
+        try:
+            recommendations = generate_personalized_recommendations(normalize_answers(student_responses))
+            source = "rules"
+        except Exception:
+            recommendations = self._get_fallback_recommendations(student_responses)
+            source = "static"
+        
+        return {
+            "success": False,
+            "error": f"Failed to generate recommendations: {str(error)}",
+            "fallback": source,
+            # Gemini was not called at all, so retrying soon would only fall back again
+            "circuit_open": isinstance(error, CircuitOpenError),
+            "recommendations": recommendations
+        }
+    
+    def _get_cached(self, answers: Dict[str, Any], cache_key: str) -> Optional[Dict[str, Any]]:
+        """Precomputed or previously generated result for the same normalized answers"""
+        table = get_recommendation_table()
+        if table is not None:
+            recommendations = table.get(answers)
+            if recommendations is not None:
+                return {
+                    "success": True,
+                    "cached": True,
+                    "recommendations": recommendations,
+                    "generated_at": table.metadata.get("generated_at")
+                }
+        
+        if self.cache is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        return {"success": True, "cached": True, **cached}
+    
+    def _store_result(self, cache_key: str, recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the success envelope and cache it; only validated documents may be stored"""
+        result = {
+            "recommendations": recommendations,
+            "generated_at": datetime.utcnow().isoformat()
+        }
+        if self.cache is not None:
+            self.cache.set(cache_key, result)
+        return {"success": True, "cached": False, **result}
+    
+    def _format_profile(self, responses: Dict[str, Any]) -> str:
+        """The profile lines of a prompt for one student's normalized answers"""
         
         # Extract key information from responses
         education_level = responses.get('1', 'Not specified')
@@ -51,87 +338,67 @@ class GeminiService:
         work_environment = responses.get('4', 'Not specified')
         skills = responses.get('5', [])
         
+        return f"""- Education Level: {education_level}
+- Career Interests: {', '.join(career_interests) if isinstance(career_interests, list) else career_interests}
+- Work Experience: {work_experience}
+- Preferred Work Environment: {work_environment}
+- Current Skills: {', '.join(skills) if isinstance(skills, list) else skills}"""
+    
+    def _create_recommendation_prompt(self, responses: Dict[str, Any]) -> str:
+        """Create a structured prompt for Gemini Pro"""
+        
         prompt = f"""
 You are a career guidance expert AI assistant. Based on the following student assessment responses, provide personalized course recommendations.
 
 STUDENT PROFILE:
-- Education Level: {education_level}
-- Career Interests: {', '.join(career_interests) if isinstance(career_interests, list) else career_interests}
-- Work Experience: {work_experience}
-- Preferred Work Environment: {work_environment}
-- Current Skills: {', '.join(skills) if isinstance(skills, list) else skills}
+{self._format_profile(responses)}
 
 Please provide course recommendations in the following JSON format:
-{{
-    "career_path": "Recommended career path based on interests and skills",
-    "skill_gaps": ["List of skills the student should develop"],
-    "courses": [
-        {{
-            "title": "Course Title",
-            "description": "Brief course description",
-            "category": "Technical/Soft Skills/Business/etc",
-            "difficulty": "Beginner/Intermediate/Advanced",
-            "duration": "Estimated duration (e.g., 3 months, 6 weeks)",
-            "platform": "Suggested learning platform",
-            "priority": "High/Medium/Low",
-            "reason": "Why this course is recommended"
-        }}
-    ],
-    "learning_path": "Step-by-step learning progression",
-    "next_steps": ["Immediate actions the student should take"]
-}}
+{RECOMMENDATION_FORMAT}
 
-Focus on:
-1. Courses that align with their career interests
-2. Skills that bridge their current level to their goals
-3. Practical, industry-relevant recommendations
-4. Mix of technical and soft skills
-5. Consider their experience level and preferred work environment
+{RECOMMENDATION_FOCUS}
 
 Provide 5-8 specific course recommendations with detailed information.
+"""
+        return prompt
+    
+    def _create_batch_prompt(self, profiles: List[Dict[str, Any]]) -> str:
+        """One prompt for several students, asking for recommendations keyed s1, s2, ..."""
+        students = "\n\n".join(
+            f"STUDENT s{index + 1}:\n{self._format_profile(responses)}"
+            for index, responses in enumerate(profiles)
+        )
+        
+        prompt = f"""
+You are a career guidance expert AI assistant. Below are the assessment responses of {len(profiles)} students, each with an ID. Provide personalized course recommendations for each student separately.
+
+{students}
+
+Respond with a single JSON object that maps every student ID (s1 to s{len(profiles)}) to that student's recommendations, where each value has the following JSON format:
+{RECOMMENDATION_FORMAT}
+
+{RECOMMENDATION_FOCUS}
+
+Provide 5-8 specific course recommendations with detailed information for each student.
 """
         return prompt
     
     def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
         """Parse Gemini's response and extract structured data"""
-        try:
-            # Try to extract JSON from the response
-            import re
-            
-            # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                return json.loads(json_str)
-            else:
-                # If no JSON found, create a structured response from the text
-                return self._parse_text_response(response_text)
-                
-        except json.JSONDecodeError:
-            # If JSON parsing fails, parse as text
-            return self._parse_text_response(response_text)
-    
-    def _parse_text_response(self, text: str) -> Dict[str, Any]:
-        """Parse text response when JSON parsing fails"""
-        return {
-            "career_path": "AI-Generated Career Path",
-            "skill_gaps": ["Communication", "Technical Skills", "Leadership"],
-            "courses": [
-                {
-                    "title": "Introduction to Career Development",
-                    "description": "Comprehensive course covering career planning and development",
-                    "category": "Career Development",
-                    "difficulty": "Beginner",
-                    "duration": "4 weeks",
-                    "platform": "Online Learning Platform",
-                    "priority": "High",
-                    "reason": "Essential for career growth"
-                }
-            ],
-            "learning_path": "Start with foundational skills, then progress to advanced topics",
-            "next_steps": ["Complete the assessment", "Review recommendations", "Start with high-priority courses"],
-            "raw_response": text
-        }
+        return self._validated_recommendations(extract_json_object(response_text))
+    
+    def _validated_recommendations(self, document: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The extracted document; raises InvalidRecommendationsError unless it matches the recommendation schema"""
+        if document is None:
+            raise InvalidRecommendationsError("Gemini response contains no JSON document")
+        
+        errors = validate_recommendations(document)
+        if errors:
+            raise InvalidRecommendationsError(
+                f"Gemini response does not match the recommendation schema: {'; '.join(errors[:3])}"
+            )
+        
+        return document
     
     def _get_fallback_recommendations(self, responses: Dict[str, Any]) -> Dict[str, Any]:
         """Provide fallback recommendations when Gemini API fails"""
@@ -166,3 +433,34 @@ Provide 5-8 specific course recommendations with detailed information.
             "learning_path": "Begin with foundational courses, then progress to specialized skills",
             "next_steps": ["Review your career goals", "Start with high-priority courses", "Track your progress"]
         }
+
+# Global service instance, created once in the app lifespan
+gemini_service: Optional[GeminiService] = None
+
+async def initialize_gemini():
+    """Create the Gemini service and verify it can reach the configured model"""
+    global gemini_service
+    
+    try:
+        service = GeminiService()
+        await service.warm_up()
+        gemini_service = service
+        print(f"✅ Gemini service initialized successfully ({service.model_name})")
+        
+    except Exception as e:
+        print(f"❌ Error initializing Gemini: {e}")
+        raise e
+
+async def close_gemini():
+    """Close the Gemini service's HTTP client"""
+    global gemini_service
+    
+    if gemini_service is not None:
+        await gemini_service.client.aclose()
+        gemini_service = None
+
+def get_gemini_service() -> GeminiService:
+    """Get Gemini service instance"""
+    if gemini_service is None:
+        raise Exception("Gemini service not initialized")
+    return gemini_service
@@ -0,0 +1,288 @@
+"""
+Durable local job queue backed by SQLite.
+
+Jobs survive restarts: a job is claimed with a lease, and a worker that dies
+mid-job simply lets the lease expire so another worker picks it up again.
+Failed attempts are retried with exponential backoff until max_attempts,
+after which the job is marked failed. A worker only records the outcome of
+the attempt it leased: once its lease expired and the job was claimed again,
+its late result is discarded.
+
+SQLite calls are short but blocking, so the async helpers run them in a
+thread; a lock serializes access to the shared connection.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "604800"))
+JOB_POLL_SECONDS = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user_id, created_at);
+"""
+
+class JobRetry(Exception):
+    """Raised by a handler to retry a job after an expected, transient failure"""
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+class JobQueue:
+    def __init__(self, path: str, max_attempts: int = JOB_MAX_ATTEMPTS, lease_seconds: float = JOB_LEASE_SECONDS,
+                 retry_base: float = JOB_RETRY_BASE_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_base = retry_base
+        self.handlers: Dict[str, Handler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.lost_leases = 0
+
+    def register(self, kind: str, handler: Handler):
+        """Register the coroutine that processes jobs of a kind"""
+        self.handlers[kind] = handler
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._wakeup = asyncio.Event()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # Blocking operations, run through asyncio.to_thread by the async API
+
+    def _enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, payload, status, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, json.dumps(payload, default=str), QUEUED, self.max_attempts, now, now, now)
+            )
+        return job_id
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest ready job, including running jobs whose lease expired"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs"
+                    " WHERE (status = ? AND available_at <= ?) OR (status = ? AND locked_until < ?)"
+                    " ORDER BY available_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, now + self.lease_seconds, now, row["id"])
+                )
+                job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(job)
+
+    def _finish(self, job: Dict[str, Any], status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None, retry_at: Optional[float] = None) -> bool:
+        """Record the outcome of a leased attempt; False if the job was re-leased since"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, last_error = ?, available_at = COALESCE(?, available_at),"
+                " locked_until = NULL, updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, retry_at, now,
+                 job["id"], RUNNING, job["attempts"])
+            )
+        return cursor.rowcount == 1
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def _latest_for_user(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE user_id = ? AND kind = ? ORDER BY created_at DESC LIMIT 1",
+                (user_id, kind)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def _purge(self, older_than: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, older_than)
+            )
+        return cursor.rowcount
+
+    def _counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    # Async API
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[str] = None) -> str:
+        """Persist a job and wake a worker; returns the job id"""
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job_id = await asyncio.to_thread(self._enqueue, kind, payload, user_id)
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def latest_for_user(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._latest_for_user, user_id, kind)
+
+    async def _process(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind {job['kind']!r}")
+            result = await handler(job)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if handler is not None and job["attempts"] < job["max_attempts"]:
+                delay = self.retry_base * 2 ** (job["attempts"] - 1)
+                retry_at = time.time() + random.uniform(delay / 2, delay)
+                if await asyncio.to_thread(self._finish, job, QUEUED, error=error, retry_at=retry_at):
+                    self.retried += 1
+                else:
+                    self._lost_lease(job)
+            else:
+                if not isinstance(e, JobRetry):
+                    traceback.print_exc()
+                print(f"❌ Job {job['id']} ({job['kind']}) failed after {job['attempts']} attempts: {error}")
+                if await asyncio.to_thread(self._finish, job, FAILED, error=error):
+                    self.failed += 1
+                else:
+                    self._lost_lease(job)
+            return
+
+        if await asyncio.to_thread(self._finish, job, SUCCEEDED, result=result):
+            self.processed += 1
+        else:
+            self._lost_lease(job)
+
+    def _lost_lease(self, job: Dict[str, Any]):
+        print(f"⚠️ Job {job['id']} ({job['kind']}) attempt {job['attempts']} outlived its lease; result discarded")
+        self.lost_leases += 1
+
+    async def run_worker(self):
+        """Claim and process jobs until cancelled"""
+        while True:
+            # Cleared before claiming so an enqueue during the claim still wakes us
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(job)
+
+    async def purge(self, retention: float = JOB_RETENTION_SECONDS) -> int:
+        """Delete finished jobs older than the retention period"""
+        return await asyncio.to_thread(self._purge, time.time() - retention)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self._counts() if self._conn is not None else {}
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "succeeded": counts.get(SUCCEEDED, 0),
+            "failed": counts.get(FAILED, 0),
+            "processed": self.processed,
+            "retried": self.retried,
+            "gave_up": self.failed,
+            "lost_leases": self.lost_leases
+        }
+
+job_queue = JobQueue(JOB_QUEUE_PATH)
+
+def start_job_workers(workers: int = JOB_WORKERS):
+    """Open the queue and start worker tasks; returns the tasks to cancel on shutdown"""
+    job_queue.open()
+    return [asyncio.create_task(job_queue.run_worker()) for _ in range(workers)]
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a job that are safe to return to its owner"""
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "result": job["result"],
+        "error": job["last_error"] if job["status"] == FAILED else None,
+        "created_at": datetime.utcfromtimestamp(job["created_at"]).isoformat(),
+        "updated_at": datetime.utcfromtimestamp(job["updated_at"]).isoformat()
+    }
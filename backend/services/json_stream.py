@@ -0,0 +1,257 @@
+"""
+Incremental extraction of a JSON object from LLM output.
+
+Models wrap the document in code fences and prose that may itself contain
+braces, and streaming delivers it a few tokens at a time. JSONStreamExtractor
+scans text as it arrives, keeping string/escape/nesting state between
+chunks so every character is examined once (regex jumps between structural
+characters, and any object or array that is already complete, from a whole
+candidate down to a single course, is handed straight to the C decoder),
+and returns:
+
+- each element of a watched top-level array (e.g. "courses") as soon as its
+  closing brace arrives, and
+- the first balanced top-level object that parses as JSON, as `document`.
+
+A candidate object that turns out not to be JSON (prose such as
+"{with}") is dropped and scanning continues after it. A code fence met
+inside a candidate means the model abandoned that object, so scanning
+restarts after the fence; so does a raw newline inside a string, which
+JSON does not allow and which usually means the object was cut off
+mid-string.
+
+Chunks are kept in a list and only the unscanned tail and completed
+fragments are ever joined, so streaming costs time linear in the output.
+On well-formed output the extractor is as fast as a greedy regex plus
+json.loads; it spends more only on truncated or abandoned candidates, which
+the regex gets wrong anyway (see benchmarks/bench_json_extraction.py).
+"""
+import bisect
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+_STRING_SPECIAL = re.compile(r'["\\\n]')
+_STRUCTURAL = re.compile(r'[{}\[\]":`]')
+# How every JSON object starts (or may yet start, at the end of the text so
+# far); anything else ("{with}") is not worth a decode attempt
+_OBJECT_START = re.compile(r'\{\s*(?:["}]|\Z)')
+_CLOSERS = {"}": "{", "]": "["}
+_DECODER = json.JSONDecoder()
+FENCE = "```"
+
+class JSONStreamExtractor:
+    def __init__(self, array_key: Optional[str] = None, item_validator: Optional[Callable[[Any], List[str]]] = None):
+        """
+        array_key names a top-level array whose elements are returned by feed()
+        as they complete; item_validator, if given, returns a list of errors
+        for an element and elements with errors are skipped.
+        """
+        self.array_key = array_key
+        self.item_validator = item_validator
+        self._chunks: List[str] = []
+        self._offsets: List[int] = []
+        self._length = 0
+        self._text: Optional[str] = None
+        self.document: Optional[Dict[str, Any]] = None
+        self.done = False
+        self.candidates_rejected = 0
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = (0, 0)
+        self._reset_candidate()
+
+    def _reset_candidate(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._candidate_start = 0
+        self._candidate_plausible = False
+        self._top_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        if self._text is None:
+            self._text = "".join(self._chunks)
+        return self._text
+
+    def _slice(self, start: int, end: int) -> str:
+        """Fed text between two absolute positions, joining only the chunks it spans"""
+        if start >= end:
+            return ""
+        last_offset = self._offsets[-1]
+        if start >= last_offset:
+            return self._chunks[-1][start - last_offset:end - last_offset]
+        first = bisect.bisect_right(self._offsets, start) - 1
+        last = bisect.bisect_right(self._offsets, end - 1)
+        joined = "".join(self._chunks[first:last])
+        offset = start - self._offsets[first]
+        return joined[offset:offset + end - start]
+
+    def _reject_candidate(self):
+        self.candidates_rejected += 1
+        self._reset_candidate()
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Add streamed text; returns the watched-array elements completed by it"""
+        if chunk:
+            self._chunks.append(chunk)
+            self._offsets.append(self._length)
+            self._length += len(chunk)
+            self._text = None
+        completed = []
+        if self.done:
+            return completed
+        # Positions below are relative to base; state kept between calls is absolute
+        base = self._pos
+        text = self._slice(base, self._length)
+        n = len(text)
+        pos = 0
+        stack = self._stack
+
+        while pos < n and not self.done:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    pos = n
+                    break
+                i = match.start()
+                if text[i] == "\n":
+                    # JSON strings cannot hold raw newlines: the object was cut off mid-string
+                    self._reject_candidate()
+                    stack = self._stack
+                    pos = i + 1
+                    continue
+                if text[i] == "\\":
+                    if i + 1 < n:
+                        pos = i + 2
+                    else:
+                        self._escape = True
+                        pos = n
+                    continue
+                self._in_string = False
+                self._last_string = (self._string_start, base + i)
+                pos = i + 1
+                continue
+
+            if not stack:
+                # Prose before (or between) candidate objects
+                start = text.find("{", pos)
+                if start < 0:
+                    pos = n
+                    break
+                # Fast path: the candidate is already complete, valid JSON
+                document = None
+                self._candidate_plausible = _OBJECT_START.match(text, start) is not None
+                if self._candidate_plausible:
+                    try:
+                        document, _ = _DECODER.raw_decode(text, start)
+                    except ValueError:
+                        pass
+                if isinstance(document, dict):
+                    completed.extend(self._valid_items(document.get(self.array_key) if self.array_key else None))
+                    self.document = document
+                    self.done = True
+                    break
+                self._candidate_start = base + start
+                stack.append("{")
+                pos = start + 1
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                pos = n
+                break
+            i = match.start()
+            char = text[i]
+            pos = i + 1
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = base + i + 1
+            elif char == ":":
+                if len(stack) == 1:
+                    self._top_key = self._slice(*self._last_string)
+            elif char == "`":
+                if text.startswith(FENCE, i):
+                    self._reject_candidate()
+                    stack = self._stack
+                    pos = i + len(FENCE)
+                elif FENCE.startswith(text[i:]):
+                    # Possibly the start of a fence split across chunks
+                    pos = i
+                    break
+            elif char in "{[":
+                watched = char == "[" and len(stack) == 1 and self.array_key is not None and self._top_key == self.array_key
+                item = char == "{" and self._array_depth is not None and len(stack) == self._array_depth
+                # A value that is already complete is decoded in C rather than scanned.
+                # Not the watched array as a whole: its items get the same treatment.
+                if not watched and (char == "[" or _OBJECT_START.match(text, i)):
+                    try:
+                        value, end = _DECODER.raw_decode(text, i)
+                    except ValueError:
+                        pass
+                    else:
+                        if item:
+                            completed.extend(self._valid_items([value]))
+                        pos = end
+                        continue
+                if watched:
+                    self._array_depth = 2
+                elif item:
+                    self._item_start = base + i
+                stack.append(char)
+            else:
+                if stack[-1] != _CLOSERS[char]:
+                    self._reject_candidate()
+                    stack = self._stack
+                    continue
+                stack.pop()
+                if self._item_start is not None and len(stack) == self._array_depth:
+                    item = self._parse(self._slice(self._item_start, base + i + 1))
+                    if item is not None and not (self.item_validator and self.item_validator(item)):
+                        completed.append(item)
+                    self._item_start = None
+                elif char == "]" and self._array_depth is not None and len(stack) == self._array_depth - 1:
+                    self._array_depth = None
+                if not stack:
+                    document = None
+                    if self._candidate_plausible:
+                        document = self._parse(self._slice(self._candidate_start, base + i + 1))
+                    if isinstance(document, dict):
+                        self.document = document
+                        self.done = True
+                    else:
+                        self._reject_candidate()
+                        stack = self._stack
+
+        self._pos = base + pos
+        return completed
+
+    def _valid_items(self, items: Any) -> List[Any]:
+        if not isinstance(items, list):
+            return []
+        return [item for item in items if isinstance(item, dict) and not (self.item_validator and self.item_validator(item))]
+
+    @staticmethod
+    def _parse(fragment: str) -> Any:
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            return None
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object embedded in text, or None"""
+    extractor = JSONStreamExtractor()
+    extractor.feed(text)
+    return extractor.document
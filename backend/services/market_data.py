@@ -0,0 +1,489 @@
+"""
+Market data for the /api/career endpoints, served from BigQuery through a
+materialized in-process cache.
+
+Every query result is cached per (query, SQL parameters) and requests never
+wait on a BigQuery job:
+
+- fresh entries (younger than the TTL) are served as they are;
+- stale entries are served immediately while one background refresh runs;
+- a key that has never loaded is answered from the built-in snapshot below
+  while its first load runs.
+
+A refresher task re-runs recently requested keys shortly before they go
+stale, and the default keys are loaded at startup. When a local Arrow
+snapshot is mapped (services/market_snapshot.py) the endpoints are served
+from it instead and BigQuery is not queried at all; if the snapshot has raw
+salary observations, salary figures are computed from them
+(services/salary_engine.py). Cheap filters (industry,
+skill names, job title) are applied in Python to the cached rows, so all
+values of such a filter share one cached query; skill rows are looked up
+through an index built once per result (services/skill_index.py), and the
+role catalog is matched against user profiles the same way
+(services/role_matcher.py).
+
+Expected columns are the ones each query selects; skill_requirements,
+job_titles and industries are REPEATED STRING.
+"""
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from google.cloud import bigquery
+
+from config.bigquery import BIGQUERY_CONFIG, get_bigquery_client
+from services.market_snapshot import get_market_snapshot
+from services.salary_engine import get_salary_engine
+from services.skill_index import SkillIndex
+from services.role_matcher import RoleMatcher
+
+MARKET_DATA_TTL_SECONDS = float(os.getenv("MARKET_DATA_TTL_SECONDS", "3600"))
+MARKET_DATA_MAX_ENTRIES = int(os.getenv("MARKET_DATA_MAX_ENTRIES", "256"))
+MARKET_DATA_REFRESH_SECONDS = float(os.getenv("MARKET_DATA_REFRESH_SECONDS", "60"))
+MARKET_DATA_RETRY_SECONDS = float(os.getenv("MARKET_DATA_RETRY_SECONDS", "300"))
+MARKET_DATA_MAX_CONCURRENT_QUERIES = int(os.getenv("MARKET_DATA_MAX_CONCURRENT_QUERIES", "4"))
+MARKET_DATA_PREWARM_SECONDS = float(os.getenv("MARKET_DATA_PREWARM_SECONDS", "10"))
+
+EMERGING_MIN_GROWTH_RATE = 25.0
+SALARY_COMPARE_MAX_TITLES = 20
+
+def _table(name: str) -> str:
+    return f"`{BIGQUERY_CONFIG['project_id']}.{BIGQUERY_CONFIG['dataset_id']}.{BIGQUERY_CONFIG['tables'][name]}`"
+
+QUERIES = {
+    "trends": f"""
+        SELECT job_title, industry, demand_score, growth_rate, average_salary, skill_requirements, date
+        FROM {_table("JOB_TRENDS")}
+        WHERE location = @location AND date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY job_title ORDER BY date DESC) = 1
+        ORDER BY demand_score DESC
+        LIMIT 500
+    """,
+    "skills": f"""
+        SELECT skill_name, demand_score, growth_rate, average_salary_impact, job_titles, industries, date
+        FROM {_table("SKILL_DEMAND")}
+        WHERE location = @location
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY skill_name ORDER BY date DESC) = 1
+        ORDER BY demand_score DESC
+        LIMIT 5000
+    """,
+    "salary": f"""
+        SELECT job_title, location, experience_level, min_salary, max_salary, average_salary, median_salary,
+               percentile_25, percentile_75, percentile_90, sample_size, date
+        FROM {_table("SALARY_DATA")}
+        WHERE location = @location
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY job_title, experience_level ORDER BY date DESC) = 1
+        LIMIT 20000
+    """,
+    "emerging_roles": f"""
+        SELECT job_title, ANY_VALUE(industry) AS industry, MAX(demand_score) AS emergence_score,
+               AVG(growth_rate) AS growth_rate, ANY_VALUE(skill_requirements) AS skill_requirements,
+               ARRAY_AGG(DISTINCT location IGNORE NULLS ORDER BY location LIMIT 5) AS location_distribution,
+               MAX(date) AS date
+        FROM {_table("JOB_TRENDS")}
+        WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+        GROUP BY job_title
+        HAVING AVG(growth_rate) >= @min_growth
+        ORDER BY growth_rate DESC
+        LIMIT 50
+    """,
+    "roles": f"""
+        SELECT job_title, industry, demand_score, average_salary, skill_requirements, date
+        FROM {_table("JOB_TRENDS")}
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY job_title ORDER BY date DESC) = 1
+        ORDER BY demand_score DESC
+    """
+}
+
+# Served until a key's first BigQuery load lands (and when BigQuery is unreachable)
+SNAPSHOT = {
+    "trends": [
+        {
+            "job_title": "Software Engineer",
+            "industry": "Technology",
+            "demand_score": 0.85,
+            "growth_rate": 15.2,
+            "average_salary": 900000,
+            "skill_requirements": ["Python", "JavaScript", "React", "Node.js"],
+            "date": "2024-01-01"
+        },
+        {
+            "job_title": "Data Scientist",
+            "industry": "Technology",
+            "demand_score": 0.78,
+            "growth_rate": 22.1,
+            "average_salary": 1200000,
+            "skill_requirements": ["Python", "Machine Learning", "Statistics"],
+            "date": "2024-01-01"
+        }
+    ],
+    "skills": [
+        {
+            "skill_name": "Python",
+            "demand_score": 0.92,
+            "growth_rate": 18.5,
+            "average_salary_impact": 150000,
+            "job_titles": ["Software Engineer", "Data Scientist", "Backend Developer"],
+            "industries": ["Technology", "Finance", "Healthcare"],
+            "date": "2024-01-01"
+        },
+        {
+            "skill_name": "JavaScript",
+            "demand_score": 0.88,
+            "growth_rate": 12.3,
+            "average_salary_impact": 120000,
+            "job_titles": ["Frontend Developer", "Full Stack Developer", "Web Developer"],
+            "industries": ["Technology", "E-commerce", "Media"],
+            "date": "2024-01-01"
+        }
+    ],
+    # Salary figures are not title-specific; they are labelled with the requested title
+    "salary": [
+        {
+            "job_title": None,
+            "location": None,
+            "experience_level": None,
+            "min_salary": 400000,
+            "max_salary": 800000,
+            "average_salary": 600000,
+            "median_salary": 580000,
+            "percentile_25": 450000,
+            "percentile_75": 700000,
+            "percentile_90": 750000,
+            "sample_size": 150,
+            "date": "2024-01-01"
+        }
+    ],
+    "emerging_roles": [
+        {
+            "job_title": "AI Engineer",
+            "industry": "Technology",
+            "emergence_score": 0.85,
+            "growth_rate": 45.2,
+            "skill_requirements": ["Python", "Machine Learning", "TensorFlow", "PyTorch"],
+            "education_requirements": "Bachelor's in Computer Science or related field",
+            "salary_range": "₹10,00,000 - ₹20,00,000",
+            "location_distribution": ["Bangalore", "Mumbai", "Delhi", "Hyderabad"],
+            "date": "2024-01-01"
+        },
+        {
+            "job_title": "DevOps Engineer",
+            "industry": "Technology",
+            "emergence_score": 0.78,
+            "growth_rate": 32.1,
+            "skill_requirements": ["Docker", "Kubernetes", "AWS", "CI/CD"],
+            "education_requirements": "Bachelor's in Computer Science or related field",
+            "salary_range": "₹8,00,000 - ₹16,00,000",
+            "location_distribution": ["Bangalore", "Pune", "Mumbai", "Chennai"],
+            "date": "2024-01-01"
+        }
+    ]
+}
+# The role catalog falls back to the sample trends
+SNAPSHOT["roles"] = SNAPSHOT["trends"]
+
+_TIMEFRAME = re.compile(r"^(\d+)([DMY])$")
+_TIMEFRAME_DAYS = {"D": 1, "M": 30, "Y": 365}
+
+def timeframe_days(timeframe: str) -> int:
+    """Days in a timeframe such as 30D, 6M or 2Y; raises ValueError otherwise"""
+    match = _TIMEFRAME.match(timeframe.strip().upper())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid timeframe {timeframe!r}: use a number followed by D, M or Y (e.g. 6M)")
+    return int(match.group(1)) * _TIMEFRAME_DAYS[match.group(2)]
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+async def run_bigquery(query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run a parameterized query off the event loop and return plain dict rows"""
+    client = get_bigquery_client()
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter(
+            name,
+            "INT64" if isinstance(value, int) else "FLOAT64" if isinstance(value, float) else "STRING",
+            value
+        )
+        for name, value in params.items()
+    ])
+
+    def run():
+        rows = client.query(QUERIES[query], job_config=job_config).result()
+        return [{key: _plain(value) for key, value in row.items()} for row in rows]
+
+    return await asyncio.to_thread(run)
+
+class _Entry:
+    __slots__ = ("rows", "loaded_at", "as_of", "last_access", "task", "retry_at")
+
+    def __init__(self, now: float):
+        self.rows: Optional[List[Dict[str, Any]]] = None
+        self.loaded_at = 0.0
+        self.as_of: Optional[str] = None
+        self.last_access = now
+        self.task: Optional[asyncio.Task] = None
+        self.retry_at = 0.0
+
+Loader = Callable[[str, Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]
+
+class MaterializedCache:
+    """
+    Stale-while-revalidate cache of query results keyed by (query, params).
+
+    get() never awaits: it returns what is materialized (or None) and
+    schedules a background load when the entry is missing or stale. At most
+    one load per key runs at a time, loads share a concurrency limit, and a
+    failed load is retried after retry_seconds while the old rows keep being
+    served. Like TTLCache, it is only touched from the event loop.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        ttl: float = MARKET_DATA_TTL_SECONDS,
+        maxsize: int = MARKET_DATA_MAX_ENTRIES,
+        retry_seconds: float = MARKET_DATA_RETRY_SECONDS,
+        max_concurrent: int = MARKET_DATA_MAX_CONCURRENT_QUERIES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.load_seconds = 0.0
+        self.evictions = 0
+
+    @staticmethod
+    def key(query: str, params: Dict[str, Any]) -> Tuple[str, tuple]:
+        return query, tuple(sorted(params.items()))
+
+    def get(self, query: str, params: Dict[str, Any]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Materialized rows and their as_of time, or (None, None) until the first load lands"""
+        key = self.key(query, params)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(now)
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+            entry.last_access = now
+
+        if entry.rows is None:
+            self.misses += 1
+            self._refresh(key, entry)
+            return None, None
+
+        if now - entry.loaded_at >= self.ttl:
+            self.stale_hits += 1
+            self._refresh(key, entry)
+        else:
+            self.hits += 1
+        return entry.rows, entry.as_of
+
+    def _refresh(self, key: Tuple[str, tuple], entry: _Entry):
+        if entry.task is not None or self._clock() < entry.retry_at:
+            return
+        entry.task = asyncio.create_task(self._load(key, entry))
+
+    async def _load(self, key: Tuple[str, tuple], entry: _Entry):
+        query, params = key
+        started_at = time.perf_counter()
+        try:
+            async with self._semaphore:
+                rows = await self.loader(query, dict(params))
+        except Exception as e:
+            self.load_failures += 1
+            entry.retry_at = self._clock() + self.retry_seconds
+            print(f"⚠️ Market data query {query} {dict(params)} failed: {e}")
+            return
+        finally:
+            entry.task = None
+            self.load_seconds += time.perf_counter() - started_at
+
+        entry.rows = rows
+        entry.loaded_at = self._clock()
+        entry.as_of = datetime.utcnow().isoformat()
+        self.loads += 1
+
+    async def prewarm(self, keys: List[Tuple[str, Dict[str, Any]]], timeout: float = MARKET_DATA_PREWARM_SECONDS):
+        """Start loading keys and wait up to timeout for them; failures are only logged"""
+        for query, params in keys:
+            self.get(query, params)
+        tasks = [entry.task for entry in self._entries.values() if entry.task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    async def run(self, interval: float = MARKET_DATA_REFRESH_SECONDS):
+        """Background task that reloads recently requested keys before they go stale"""
+        while True:
+            await asyncio.sleep(interval)
+            now = self._clock()
+            for key, entry in list(self._entries.items()):
+                recently_used = now - entry.last_access < self.ttl
+                expiring = entry.rows is not None and now - entry.loaded_at >= self.ttl - 2 * interval
+                if recently_used and expiring:
+                    self._refresh(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "loads_in_flight": sum(1 for entry in self._entries.values() if entry.task is not None),
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "mean_load_seconds": round(self.load_seconds / (self.loads + self.load_failures), 3)
+            if self.loads + self.load_failures else 0.0,
+            "evictions": self.evictions
+        }
+
+market_cache = MaterializedCache(run_bigquery)
+
+DEFAULT_LOCATION = "India"
+
+# Keys behind the endpoints' default parameters, loaded at startup
+PREWARM_KEYS = [
+    ("trends", {"location": DEFAULT_LOCATION, "days": timeframe_days("1Y")}),
+    ("skills", {"location": DEFAULT_LOCATION}),
+    ("salary", {"location": DEFAULT_LOCATION}),
+    ("emerging_roles", {"days": timeframe_days("6M"), "min_growth": EMERGING_MIN_GROWTH_RATE}),
+    ("roles", {})
+]
+
+def _materialized(query: str, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    rows, as_of = market_cache.get(query, params)
+    if rows is None:
+        return SNAPSHOT[query], {"source": "snapshot", "as_of": None}
+    return rows, {"source": "bigquery", "as_of": as_of}
+
+def job_trends(timeframe: str, location: str, industry: Optional[str] = None):
+    """Latest trend per job title in the timeframe, optionally filtered by industry substring"""
+    snapshot = get_market_snapshot()
+    if snapshot is not None:
+        return snapshot.job_trends(location, timeframe_days(timeframe), industry), snapshot.freshness()
+    rows, freshness = _materialized("trends", {"location": location, "days": timeframe_days(timeframe)})
+    if industry:
+        rows = [row for row in rows if industry.lower() in (row.get("industry") or "").lower()]
+    return rows, freshness
+
+# Skill index per location, with the rows (or snapshot) it was built from
+_skill_indexes: "OrderedDict[str, Tuple[Any, SkillIndex]]" = OrderedDict()
+
+def _skill_index(location: str) -> Tuple[SkillIndex, Dict[str, Any]]:
+    """Index over the location's skill rows, rebuilt only when those rows change"""
+    snapshot = get_market_snapshot()
+    if snapshot is not None:
+        rows, freshness = None, snapshot.freshness()
+        origin = snapshot
+    else:
+        rows, freshness = _materialized("skills", {"location": location})
+        origin = rows
+
+    entry = _skill_indexes.get(location)
+    if entry is None or entry[0] is not origin:
+        if rows is None:
+            rows = snapshot.skill_demand(location, [])
+        entry = (origin, SkillIndex(rows))
+        _skill_indexes[location] = entry
+        while len(_skill_indexes) > MARKET_DATA_MAX_ENTRIES:
+            _skill_indexes.popitem(last=False)
+    _skill_indexes.move_to_end(location)
+    return entry[1], freshness
+
+# Role matcher, with the rows (or snapshot) it was built from
+_role_matcher: Optional[Tuple[Any, RoleMatcher]] = None
+
+def role_matcher() -> Tuple[RoleMatcher, Dict[str, Any]]:
+    """Matcher over the role catalog, rebuilt only when the catalog changes"""
+    global _role_matcher
+
+    snapshot = get_market_snapshot()
+    if snapshot is not None:
+        rows, freshness = None, snapshot.freshness()
+        origin = snapshot
+    else:
+        rows, freshness = _materialized("roles", {})
+        origin = rows
+
+    if _role_matcher is None or _role_matcher[0] is not origin:
+        _role_matcher = (origin, RoleMatcher(snapshot.roles() if rows is None else rows))
+    return _role_matcher[1], freshness
+
+def get_role_matcher() -> Optional[RoleMatcher]:
+    """Get the last built role matcher, if any"""
+    return _role_matcher[1] if _role_matcher else None
+
+def skill_demand(location: str, skills: List[str], job_title: Optional[str] = None, industry: Optional[str] = None):
+    """Latest demand per skill, optionally only the named skills or those a job title or industry lists"""
+    index, freshness = _skill_index(location)
+    return index.lookup(skills, job_title, industry), freshness
+
+def salary_insights(job_title: str, location: str, experience: str):
+    """Salary figures for a job title and experience level"""
+    engine = get_salary_engine()
+    if engine is not None:
+        row = engine.summaries([job_title], location, experience)[0]
+        if row is not None:
+            return [row], engine.freshness()
+    return _aggregate_salary(job_title, location, experience)
+
+def salary_comparison(job_titles: List[str], location: str, experience: str) -> List[Dict[str, Any]]:
+    """Salary figures for several job titles, each with the source it came from"""
+    engine = get_salary_engine()
+    rows = engine.summaries(job_titles, location, experience) if engine is not None else [None] * len(job_titles)
+    comparisons = []
+    for job_title, row in zip(job_titles, rows):
+        if row is not None:
+            salary_data, freshness = [row], engine.freshness()
+        else:
+            salary_data, freshness = _aggregate_salary(job_title, location, experience)
+        comparisons.append({"job_title": job_title, "salary_data": salary_data, **freshness})
+    return comparisons
+
+def _aggregate_salary(job_title: str, location: str, experience: str):
+    """Salary figures from the precomputed salary_data rows"""
+    snapshot = get_market_snapshot()
+    if snapshot is not None:
+        return snapshot.salary_insights(job_title, location, experience), snapshot.freshness()
+    rows, freshness = _materialized("salary", {"location": location})
+    if freshness["source"] == "snapshot":
+        return [
+            {**row, "job_title": job_title, "location": location, "experience_level": experience}
+            for row in rows
+        ], freshness
+    title = job_title.strip().lower()
+    return [
+        row for row in rows
+        if (row.get("job_title") or "").lower() == title and row.get("experience_level") == experience
+    ], freshness
+
+def emerging_roles(timeframe: str):
+    """Fastest-growing roles in the timeframe"""
+    snapshot = get_market_snapshot()
+    if snapshot is not None:
+        return snapshot.emerging_roles(timeframe_days(timeframe), EMERGING_MIN_GROWTH_RATE), snapshot.freshness()
+    return _materialized("emerging_roles", {"days": timeframe_days(timeframe), "min_growth": EMERGING_MIN_GROWTH_RATE})
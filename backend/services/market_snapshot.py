@@ -0,0 +1,219 @@
+"""
+Memory-mapped Arrow snapshot of the career_data BigQuery tables.
+
+scripts/export_market_snapshot.py writes one uncompressed Arrow IPC file per
+table plus a manifest. The files are mapped read-only and read without
+copying, so every uvicorn worker on a host shares the same page-cache pages
+and startup costs no parsing. The market endpoints then run their filters as
+vectorized scans over the columns (pyarrow.compute) instead of BigQuery
+queries. Each table is sorted by its key columns and then by date, newest
+first, so the latest row per key is the first row of each run.
+
+Point MARKET_SNAPSHOT_DIR at an export to serve it; a new export is picked up
+on restart.
+"""
+import json
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MARKET_SNAPSHOT_DIR = os.getenv("MARKET_SNAPSHOT_DIR", "")
+MANIFEST = "manifest.json"
+SNAPSHOT_VERSION = 1
+
+# Key columns each table is sorted by (then by date, newest first)
+SORT_KEYS = {
+    "job_trends": ["job_title"],
+    "skill_demand": ["skill_name"],
+    "salary_data": ["job_title", "experience_level"],
+    "industry_analysis": [],
+    "location_insights": [],
+    "education_requirements": [],
+    "salary_observations": ["job_title"]
+}
+
+# Columns the endpoints read; a snapshot missing any of them is not served
+REQUIRED_COLUMNS = {
+    "job_trends": ["job_title", "industry", "location", "demand_score", "growth_rate", "average_salary",
+                   "skill_requirements", "date"],
+    "skill_demand": ["skill_name", "location", "demand_score", "growth_rate", "average_salary_impact",
+                     "job_titles", "industries", "date"],
+    "salary_data": ["job_title", "location", "experience_level", "min_salary", "max_salary", "average_salary",
+                    "median_salary", "percentile_25", "percentile_75", "percentile_90", "sample_size", "date"]
+}
+
+def _latest(table: pa.Table, rows: pa.Array, keys: List[str]) -> pa.Array:
+    """Of the given row positions (in table order), those that start a run of equal keys"""
+    if len(rows) <= 1 or not keys:
+        return rows
+    changed = None
+    for key in keys:
+        column = table[key].take(rows)
+        differs = pc.fill_null(pc.not_equal(column[1:], column[:-1]), True)
+        changed = differs if changed is None else pc.or_(changed, differs)
+    return rows.filter(pa.concat_arrays([pa.array([True]), changed.combine_chunks()]))
+
+def _positions(mask) -> pa.Array:
+    return pc.indices_nonzero(pc.fill_null(mask, False))
+
+def _rows(table: pa.Table) -> List[Dict[str, Any]]:
+    """Rows as dicts, with dates as ISO strings like the BigQuery path returns"""
+    for index, field in enumerate(table.schema):
+        if pa.types.is_date(field.type) or pa.types.is_timestamp(field.type):
+            table = table.set_column(index, field.name, pc.cast(table[field.name], pa.string()))
+    return table.to_pylist()
+
+def _top(table: pa.Table, column: str, limit: int) -> pa.Table:
+    return table.sort_by([(column, "descending")]).slice(0, limit)
+
+class MarketSnapshot:
+    """Read-only view over an exported snapshot directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.manifest.get('version')}")
+
+        self._maps = []
+        self.tables: Dict[str, pa.Table] = {}
+        for name, info in self.manifest["tables"].items():
+            source = pa.memory_map(os.path.join(directory, info["file"]), "r")
+            self._maps.append(source)
+            self.tables[name] = pa.ipc.open_file(source).read_all()
+
+        for name, columns in REQUIRED_COLUMNS.items():
+            if name not in self.tables:
+                raise ValueError(f"Snapshot has no {name} table")
+            missing = [column for column in columns if column not in self.tables[name].column_names]
+            if missing:
+                raise ValueError(f"Snapshot table {name} lacks columns {missing}")
+
+        self.lookups = 0
+
+    def close(self):
+        self.tables = {}
+        for source in self._maps:
+            source.close()
+        self._maps = []
+
+    def freshness(self) -> Dict[str, Any]:
+        return {"source": "arrow", "as_of": self.manifest.get("exported_at")}
+
+    @staticmethod
+    def _since(days: int) -> pa.Scalar:
+        return pa.scalar(date.today() - timedelta(days=days), pa.date32())
+
+    def job_trends(self, location: str, days: int, industry: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Latest trend per job title in the timeframe, optionally filtered by industry substring"""
+        self.lookups += 1
+        table = self.tables["job_trends"]
+        # Filters narrow a list of row positions; only the result rows are materialized
+        rows = _positions(pc.and_(pc.equal(table["location"], location), pc.greater_equal(table["date"], self._since(days))))
+        rows = _latest(table, rows, SORT_KEYS["job_trends"])
+        if industry:
+            rows = rows.filter(pc.fill_null(pc.match_substring(table["industry"].take(rows), industry, ignore_case=True), False))
+        columns = ["job_title", "industry", "demand_score", "growth_rate", "average_salary", "skill_requirements", "date"]
+        return _rows(_top(table.select(columns).take(rows), "demand_score", 500))
+
+    def skill_demand(self, location: str, skills: List[str]) -> List[Dict[str, Any]]:
+        """Latest demand per skill, optionally only the named skills"""
+        self.lookups += 1
+        table = self.tables["skill_demand"]
+        rows = _positions(pc.equal(table["location"], location))
+        if skills:
+            # Lower-casing is the expensive part, so it only runs on the location's rows
+            wanted = pa.array(sorted({skill.strip().lower() for skill in skills} - {""}), pa.string())
+            rows = rows.filter(pc.is_in(pc.utf8_lower(table["skill_name"].take(rows)), value_set=wanted))
+        rows = _latest(table, rows, SORT_KEYS["skill_demand"])
+        columns = ["skill_name", "demand_score", "growth_rate", "average_salary_impact", "job_titles", "industries", "date"]
+        return _rows(_top(table.select(columns).take(rows), "demand_score", 5000))
+
+    def salary_insights(self, job_title: str, location: str, experience: str) -> List[Dict[str, Any]]:
+        """Latest salary figures for a job title and experience level"""
+        self.lookups += 1
+        table = self.tables["salary_data"]
+        rows = _positions(pc.and_(pc.equal(table["location"], location), pc.equal(table["experience_level"], experience)))
+        rows = rows.filter(pc.equal(pc.utf8_lower(table["job_title"].take(rows)), job_title.strip().lower()))
+        rows = _latest(table, rows, SORT_KEYS["salary_data"])
+        return _rows(table.select(REQUIRED_COLUMNS["salary_data"]).take(rows))
+
+    def emerging_roles(self, days: int, min_growth: float) -> List[Dict[str, Any]]:
+        """Fastest-growing roles in the timeframe"""
+        self.lookups += 1
+        table = self.tables["job_trends"]
+        rows = _positions(pc.greater_equal(table["date"], self._since(days)))
+        recent = table.select(["job_title", "growth_rate", "demand_score", "date", "location"]).take(rows)
+        grouped = recent.group_by("job_title").aggregate([
+            ("growth_rate", "mean"), ("demand_score", "max"), ("date", "max"), ("location", "distinct")
+        ])
+        grouped = grouped.filter(pc.greater_equal(grouped["growth_rate_mean"], min_growth))
+        grouped = _top(grouped, "growth_rate_mean", 50)
+
+        # Industry and skills come from each title's latest row
+        latest = table.select(["job_title", "industry", "skill_requirements"]).take(_latest(table, rows, SORT_KEYS["job_trends"]))
+        positions = pc.index_in(grouped["job_title"], value_set=latest["job_title"])
+        details = latest.take(positions)
+
+        roles = _rows(pa.table({
+            "job_title": grouped["job_title"],
+            "industry": details["industry"],
+            "emergence_score": grouped["demand_score_max"],
+            "growth_rate": grouped["growth_rate_mean"],
+            "skill_requirements": details["skill_requirements"],
+            "location_distribution": grouped["location_distinct"],
+            "date": grouped["date_max"]
+        }))
+        for role in roles:
+            role["location_distribution"] = sorted(location for location in role["location_distribution"] if location)[:5]
+        return roles
+
+    def roles(self) -> List[Dict[str, Any]]:
+        """Latest trend of every job title, highest demand first"""
+        self.lookups += 1
+        table = self.tables["job_trends"]
+        rows = _latest(table, _positions(pc.is_valid(table["job_title"])), SORT_KEYS["job_trends"])
+        columns = ["job_title", "industry", "demand_score", "average_salary", "skill_requirements", "date"]
+        return _rows(_top(table.select(columns).take(rows), "demand_score", len(rows)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "directory": self.directory,
+            "exported_at": self.manifest.get("exported_at"),
+            "rows": {name: table.num_rows for name, table in self.tables.items()},
+            "mapped_bytes": sum(source.size() for source in self._maps),
+            "lookups": self.lookups
+        }
+
+# Global snapshot, mapped once in the app lifespan
+market_snapshot: Optional[MarketSnapshot] = None
+
+def load_market_snapshot(directory: str = MARKET_SNAPSHOT_DIR):
+    """Map the exported snapshot; a missing or invalid one only disables it"""
+    global market_snapshot
+
+    if not directory:
+        return
+    try:
+        market_snapshot = MarketSnapshot(directory)
+        rows = sum(table.num_rows for table in market_snapshot.tables.values())
+        print(f"✅ Mapped market snapshot {directory} ({rows} rows, exported {market_snapshot.manifest.get('exported_at')})")
+    except Exception as e:
+        market_snapshot = None
+        print(f"⚠️ Market snapshot {directory} not loaded: {e}")
+
+def close_market_snapshot():
+    global market_snapshot
+
+    if market_snapshot is not None:
+        market_snapshot.close()
+        market_snapshot = None
+
+def get_market_snapshot() -> Optional[MarketSnapshot]:
+    """Get the mapped snapshot, or None when there is none"""
+    return market_snapshot
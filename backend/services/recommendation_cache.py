@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import socket
+import time
+from typing import Any, Dict, Optional
+
+from services.cache import TTLCache
+
+RECOMMENDATION_CACHE_MAX_SIZE = int(os.getenv("RECOMMENDATION_CACHE_MAX_SIZE", "5000"))
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "604800"))
+# Empty disables persistence
+RECOMMENDATION_CACHE_PATH = os.getenv("RECOMMENDATION_CACHE_PATH", "")
+DEPLOYMENT_NAME = os.getenv("DEPLOYMENT_NAME") or socket.gethostname()
+
+SNAPSHOT_VERSION = 1
+
+_QUESTION_KEY = re.compile(r"^(?:q|question)?[_ -]?0*(\d+)$", re.IGNORECASE)
+
+def _normalize_key(key: Any) -> str:
+    """'1', 1, 'q1' and 'Question_01' all name question 1"""
+    text = str(key).strip()
+    match = _QUESTION_KEY.match(text)
+    return match.group(1) if match else text.lower()
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple, set)):
+        # Multi-select answers are unordered
+        return sorted({_normalize_value(item) for item in value if item not in (None, "")}, key=str)
+    return value
+
+def normalize_answers(answers: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of a set of assessment answers.
+
+    Keys are canonicalized, whitespace collapsed, multi-select lists sorted and
+    de-duplicated, and unanswered questions dropped, so equivalent submissions
+    produce the same prompt and the same cache key.
+    """
+    normalized = {}
+    for key, value in answers.items():
+        value = _normalize_value(value)
+        if value in (None, "", []):
+            continue
+        normalized[_normalize_key(key)] = value
+    return dict(sorted(normalized.items()))
+
+def answers_key(normalized_answers: Dict[str, Any], model: str) -> str:
+    """Content address of normalized answers for a given model"""
+    payload = json.dumps({"model": model, "answers": normalized_answers}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RecommendationCache:
+    """
+    Generated recommendations keyed by the hash of the normalized answers.
+
+    Backed by a TTLCache; when a path is configured the live entries are
+    written to a JSON snapshot on shutdown and reloaded on startup. Lifetime
+    hit/miss counts are kept per deployment in the same snapshot.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, path: str = "", deployment: str = DEPLOYMENT_NAME):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.path = path
+        self.deployment = deployment
+        self.loaded = 0
+        self._deployments: Dict[str, Dict[str, int]] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self.cache.set(key, value)
+
+    def _lifetime_counts(self) -> Dict[str, Dict[str, int]]:
+        deployments = {name: dict(counts) for name, counts in self._deployments.items()}
+        previous = deployments.get(self.deployment, {"hits": 0, "misses": 0})
+        deployments[self.deployment] = {
+            "hits": previous["hits"] + self.cache.hits,
+            "misses": previous["misses"] + self.cache.misses
+        }
+        return deployments
+
+    def load(self):
+        """Restore entries from the snapshot file, dropping any that expired meanwhile"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                print(f"⚠️ Ignoring recommendation cache snapshot with version {snapshot.get('version')}")
+                return
+
+            elapsed = max(0.0, time.time() - snapshot["saved_at"])
+            for key, value, ttl_left in snapshot["entries"]:
+                if ttl_left > elapsed:
+                    self.cache.set(key, value, ttl=ttl_left - elapsed)
+                    self.loaded += 1
+            self._deployments = snapshot.get("deployments", {})
+            print(f"✅ Loaded {self.loaded} cached recommendations from {self.path}")
+
+        except Exception as e:
+            print(f"⚠️ Could not load recommendation cache from {self.path}: {e}")
+
+    def save(self):
+        """Write live entries to the snapshot file (atomically)"""
+        if not self.path:
+            return
+
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "entries": self.cache.items(),
+            "deployments": self._lifetime_counts()
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            print(f"✅ Saved {len(snapshot['entries'])} cached recommendations to {self.path}")
+
+        except Exception as e:
+            print(f"⚠️ Could not save recommendation cache to {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters plus lifetime hit ratios for each deployment"""
+        lifetime = {}
+        for name, counts in self._lifetime_counts().items():
+            lookups = counts["hits"] + counts["misses"]
+            lifetime[name] = {**counts, "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0}
+
+        return {
+            **self.cache.stats(),
+            "deployment": self.deployment,
+            "persisted": bool(self.path),
+            "loaded_from_disk": self.loaded,
+            "lifetime": lifetime
+        }
+
+recommendation_cache = RecommendationCache(
+    maxsize=RECOMMENDATION_CACHE_MAX_SIZE,
+    ttl=RECOMMENDATION_CACHE_TTL_SECONDS,
+    path=RECOMMENDATION_CACHE_PATH
+)
@@ -0,0 +1,106 @@
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict
+
+from config.database import get_db, COLLECTIONS
+from services.gemini_service import get_gemini_service
+from services.job_queue import job_queue, JobRetry
+
+RECOMMENDATIONS_JOB = "recommendations"
+COHORT_RECOMMENDATIONS_JOB = "cohort_recommendations"
+# Cohorts are split into jobs of this many students so each finishes well within its lease
+COHORT_JOB_STUDENTS = int(os.getenv("COHORT_JOB_STUDENTS", "40"))
+COHORT_MAX_STUDENTS = int(os.getenv("COHORT_MAX_STUDENTS", "1000"))
+# User roles allowed to submit cohorts on behalf of students
+COHORT_ROLES = ("educator", "admin")
+
+async def generate_recommendations_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate and store recommendations for a submitted assessment.
+
+    Gemini failures are retried by the queue; the last attempt stores the
+    fallback recommendations instead so the student is never left waiting.
+    While the Gemini circuit is open the fallback is stored at once, since
+    retrying within the backoff would only be turned away again.
+    The recommendations document is keyed by the job id, so a retried or
+    re-leased job overwrites rather than duplicates it.
+    """
+    payload = job["payload"]
+    gemini_service = get_gemini_service()
+    result = await gemini_service.generate_course_recommendations_async(payload["answers"])
+
+    last_attempt = job["attempts"] >= job["max_attempts"]
+    if not result.get("success") and not result.get("circuit_open") and not last_attempt:
+        raise JobRetry(result.get("error", "Recommendation generation failed"))
+
+    recommendations_doc = {
+        "user_id": payload["user_id"],
+        "assessment_response_id": payload["response_id"],
+        "job_id": job["id"],
+        "recommendations": result.get("recommendations", {}),
+        "generated_at": datetime.utcnow(),
+        "ai_model": gemini_service.model_name,
+        "status": "completed" if result.get("success") else "failed"
+    }
+    db = get_db()
+    await db.collection(COLLECTIONS["RECOMMENDATIONS"]).document(job["id"]).set(recommendations_doc)
+
+    return {"recommendations_id": job["id"], "status": recommendations_doc["status"]}
+
+async def generate_cohort_recommendations_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate and store recommendations for a slice of a cohort.
+
+    Students are packed into shared Gemini calls; the service already falls
+    back per student, so the job is not retried for individual failures.
+    Results go to the cohort collection, keyed by cohort id and the student's
+    position in the cohort, with the requester recorded; student_id is the
+    submitter's label, so it is never written as a user_id. The job result
+    reports the usage (mode, latency, tokens, cost) of every student.
+    """
+    payload = job["payload"]
+    students = payload["students"]
+    cohort_id = payload.get("cohort_id", job["id"])
+    offset = payload.get("offset", 0)
+    gemini_service = get_gemini_service()
+    results = await gemini_service.generate_cohort_recommendations_async(
+        [student["answers"] for student in students]
+    )
+
+    db = get_db()
+    collection = db.collection(COLLECTIONS["COHORT_RECOMMENDATIONS"])
+    batch = db.batch()
+    report = []
+    for index, (student, result) in enumerate(zip(students, results)):
+        position = offset + index
+        recommendations_id = f"{cohort_id}-{position}"
+        status = "completed" if result.get("success") else "failed"
+        batch.set(collection.document(recommendations_id), {
+            "cohort_id": cohort_id,
+            "requested_by": payload["user_id"],
+            "student_id": student["student_id"],
+            "position": position,
+            "cohort_job_id": job["id"],
+            "recommendations": result.get("recommendations", {}),
+            "generated_at": datetime.utcnow(),
+            "ai_model": gemini_service.model_name,
+            "status": status
+        })
+        report.append({
+            "student_id": student["student_id"],
+            "recommendations_id": recommendations_id,
+            "status": status,
+            "usage": result["usage"]
+        })
+    await batch.commit()
+
+    return {
+        "students": len(report),
+        "cost_usd": round(sum(entry["usage"]["cost_usd"] for entry in report), 6),
+        "students_by_mode": dict(Counter(entry["usage"]["mode"] for entry in report)),
+        "report": report
+    }
+
+job_queue.register(RECOMMENDATIONS_JOB, generate_recommendations_job)
+job_queue.register(COHORT_RECOMMENDATIONS_JOB, generate_cohort_recommendations_job)
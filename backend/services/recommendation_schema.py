@@ -0,0 +1,131 @@
+"""
+Shape checks for recommendation documents produced by the model.
+
+Schemas are written as plain Python values and compiled once, at import,
+into nested validator functions, so checking a document is a walk over the
+document rather than over the schema description:
+
+    str / int / float / bool     value of that type (bool is not a number)
+    SCALAR                       str, int or float
+    [schema]                     list whose items all match schema
+    {"key": schema}              dict with the key (extra keys are allowed)
+    optional(schema)             as a dict value: key may be missing or null
+    one_of(a, b, ...)            matches any of the schemas
+
+A validator returns a list of error strings; an empty list means valid.
+"""
+from typing import Any, Callable, List
+
+Validator = Callable[[Any, str], List[str]]
+
+class _Optional:
+    def __init__(self, schema: Any):
+        self.schema = schema
+
+class _OneOf:
+    def __init__(self, schemas: tuple):
+        self.schemas = schemas
+
+def optional(schema: Any) -> _Optional:
+    return _Optional(schema)
+
+def one_of(*schemas: Any) -> _OneOf:
+    return _OneOf(schemas)
+
+SCALAR = one_of(str, int, float)
+
+_TYPE_NAMES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+def compile_schema(schema: Any) -> Validator:
+    """Compile a schema description into a validator function"""
+    if schema in (int, float):
+        numeric = (int, float) if schema is float else (int,)
+        name = _TYPE_NAMES[schema]
+
+        def check_number(value, path):
+            if isinstance(value, bool) or not isinstance(value, numeric):
+                return [f"{path}: expected {name}"]
+            return []
+        return check_number
+
+    if schema in (str, bool):
+        name = _TYPE_NAMES[schema]
+
+        def check_type(value, path):
+            return [] if isinstance(value, schema) else [f"{path}: expected {name}"]
+        return check_type
+
+    if isinstance(schema, list):
+        if len(schema) != 1:
+            raise ValueError("list schemas take exactly one item schema")
+        check_item = compile_schema(schema[0])
+
+        def check_list(value, path):
+            if not isinstance(value, list):
+                return [f"{path}: expected array"]
+            errors = []
+            for index, item in enumerate(value):
+                errors.extend(check_item(item, f"{path}[{index}]"))
+            return errors
+        return check_list
+
+    if isinstance(schema, dict):
+        fields = []
+        for key, field_schema in schema.items():
+            required = not isinstance(field_schema, _Optional)
+            inner = field_schema.schema if not required else field_schema
+            fields.append((key, required, compile_schema(inner)))
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return [f"{path}: expected object"]
+            errors = []
+            for key, required, check_field in fields:
+                field_value = value.get(key)
+                if field_value is None:
+                    if required:
+                        errors.append(f"{path}.{key}: missing")
+                    continue
+                errors.extend(check_field(field_value, f"{path}.{key}"))
+            return errors
+        return check_object
+
+    if isinstance(schema, _OneOf):
+        checks = [compile_schema(option) for option in schema.schemas]
+
+        def check_any(value, path):
+            for check in checks:
+                if not check(value, path):
+                    return []
+            return [f"{path}: matches none of the allowed types"]
+        return check_any
+
+    raise ValueError(f"Unsupported schema: {schema!r}")
+
+COURSE_SCHEMA = {
+    "title": str,
+    "description": optional(str),
+    "category": optional(str),
+    "difficulty": optional(str),
+    "duration": optional(SCALAR),
+    "platform": optional(str),
+    "priority": optional(str),
+    "reason": optional(str)
+}
+
+RECOMMENDATION_SCHEMA = {
+    "career_path": optional(str),
+    "skill_gaps": optional([str]),
+    "courses": [COURSE_SCHEMA],
+    "learning_path": optional(one_of(str, [str])),
+    "next_steps": optional([str])
+}
+
+_check_course = compile_schema(COURSE_SCHEMA)
+_check_recommendations = compile_schema(RECOMMENDATION_SCHEMA)
+
+def validate_course(course: Any) -> List[str]:
+    return _check_course(course, "$")
+
+def validate_recommendations(document: Any) -> List[str]:
+    return _check_recommendations(document, "$")
@@ -0,0 +1,230 @@
+"""
+Precomputed recommendations for the whole career-assessment answer space.
+
+Every complete submission maps to a combination number by treating each
+question as a digit: single-choice questions have one digit per option and
+multi-select questions use the 2^n bitmask of chosen options as theirs
+(5 x 256 x 5 x 5 x 256 = 8,192,000 combinations). The table file holds a
+uint32 payload id per combination plus a de-duplicated pool of JSON
+payloads, and is memory-mapped so a lookup is two array reads and, on the
+first use of a payload, one json.loads.
+
+Layout (little-endian):
+    header | metadata JSON | uint32 index[combinations] | uint64 offsets[payloads + 1] | payload bytes
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from models.assessment import CAREER_QUESTIONS
+from services.cache import TTLCache
+
+RECOMMENDATION_TABLE_PATH = os.getenv("RECOMMENDATION_TABLE_PATH", "")
+
+MAGIC = b"CBRTBL01"
+# magic, metadata length, combinations, index pos, payloads, offsets pos, payloads pos
+HEADER = struct.Struct("<8sQQQQQQ")
+MISSING = 0xFFFFFFFF
+DECODED_PAYLOAD_CACHE_SIZE = 4096
+
+if sys.byteorder != "little":
+    raise ImportError("recommendation tables are only supported on little-endian hosts")
+
+def _question_radices() -> List[int]:
+    return [
+        len(q["options"]) if q["type"] == "single" else 1 << len(q["options"])
+        for q in CAREER_QUESTIONS
+    ]
+
+RADICES = _question_radices()
+COMBINATIONS = 1
+for _radix in RADICES:
+    COMBINATIONS *= _radix
+
+_OPTION_POSITIONS = [
+    {option.strip(): position for position, option in enumerate(q["options"])}
+    for q in CAREER_QUESTIONS
+]
+
+def questions_fingerprint() -> str:
+    """Hash of the question types and options a table was built against"""
+    shape = [[q["id"], q["type"], [option.strip() for option in q["options"]]] for q in CAREER_QUESTIONS]
+    return hashlib.sha256(json.dumps(shape).encode("utf-8")).hexdigest()
+
+def combination_index(normalized_answers: Dict[str, Any]) -> Optional[int]:
+    """
+    Combination number of normalized answers, or None when they fall outside
+    the table (unanswered single-choice question or an unknown option).
+    """
+    index = 0
+    for question, positions, radix in zip(CAREER_QUESTIONS, _OPTION_POSITIONS, RADICES):
+        answer = normalized_answers.get(str(question["id"]))
+        if question["type"] == "single":
+            if not isinstance(answer, str) or answer not in positions:
+                return None
+            digit = positions[answer]
+        else:
+            if answer is None:
+                answer = []
+            elif isinstance(answer, str):
+                answer = [answer]
+            digit = 0
+            for option in answer:
+                if option not in positions:
+                    return None
+                digit |= 1 << positions[option]
+        index = index * radix + digit
+    return index
+
+def combination_answers(index: int) -> Dict[str, Any]:
+    """Inverse of combination_index"""
+    digits = []
+    for radix in reversed(RADICES):
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    digits.reverse()
+
+    answers = {}
+    for question, digit in zip(CAREER_QUESTIONS, digits):
+        options = [option.strip() for option in question["options"]]
+        if question["type"] == "single":
+            answers[str(question["id"])] = options[digit]
+        else:
+            answers[str(question["id"])] = sorted(
+                option for position, option in enumerate(options) if digit & (1 << position)
+            )
+    return answers
+
+def _align(position: int, boundary: int = 8) -> int:
+    return (position + boundary - 1) // boundary * boundary
+
+def write_table(path: str, index: array, payloads: Iterable[bytes], metadata: Dict[str, Any]):
+    """Write a table file atomically; index holds one payload id (or MISSING) per combination"""
+    if index.typecode != "I" or index.itemsize != 4 or len(index) != COMBINATIONS:
+        raise ValueError(f"index must be a uint32 array of {COMBINATIONS} entries")
+
+    payloads = list(payloads)
+    metadata = {**metadata, "questions_fingerprint": questions_fingerprint()}
+    meta_bytes = json.dumps(metadata).encode("utf-8")
+
+    index_pos = _align(HEADER.size + len(meta_bytes))
+    offsets_pos = _align(index_pos + index.itemsize * len(index))
+    offsets = array("Q", [0])
+    for payload in payloads:
+        offsets.append(offsets[-1] + len(payload))
+    payloads_pos = offsets_pos + offsets.itemsize * len(offsets)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta_bytes), len(index), index_pos, len(payloads), offsets_pos, payloads_pos))
+        f.write(meta_bytes)
+        f.write(b"\0" * (index_pos - f.tell()))
+        index.tofile(f)
+        f.write(b"\0" * (offsets_pos - f.tell()))
+        offsets.tofile(f)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp_path, path)
+
+class RecommendationTable:
+    """Read-only, memory-mapped view of a table file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, meta_len, combinations, index_pos, payload_count, offsets_pos, payloads_pos = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a recommendation table")
+            self.metadata = json.loads(self._mm[HEADER.size:HEADER.size + meta_len])
+            if combinations != COMBINATIONS or self.metadata.get("questions_fingerprint") != questions_fingerprint():
+                raise ValueError(f"{path} was built for a different questionnaire")
+
+            view = memoryview(self._mm)
+            self._index = view[index_pos:index_pos + 4 * combinations].cast("I")
+            self._offsets = view[offsets_pos:offsets_pos + 8 * (payload_count + 1)].cast("Q")
+            self._payloads_pos = payloads_pos
+            view.release()
+        except Exception:
+            self.close()
+            raise
+
+        self.payload_count = payload_count
+        self._decoded = TTLCache(maxsize=DECODED_PAYLOAD_CACHE_SIZE, ttl=float("inf"))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, normalized_answers: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Precomputed recommendations for normalized answers, if the table has them"""
+        index = combination_index(normalized_answers)
+        payload_id = MISSING if index is None else self._index[index]
+        if payload_id == MISSING:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        payload = self._decoded.get(payload_id)
+        if payload is None:
+            start = self._payloads_pos + self._offsets[payload_id]
+            end = self._payloads_pos + self._offsets[payload_id + 1]
+            payload = json.loads(self._mm[start:end])
+            self._decoded.set(payload_id, payload)
+        return payload
+
+    def close(self):
+        for name in ("_index", "_offsets"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "source": self.metadata.get("source"),
+            "generated_at": self.metadata.get("generated_at"),
+            "combinations": COMBINATIONS,
+            "filled": self.metadata.get("filled"),
+            "payloads": self.payload_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Global table, mapped once in the app lifespan when RECOMMENDATION_TABLE_PATH is set
+recommendation_table: Optional[RecommendationTable] = None
+
+def load_recommendation_table(path: str = RECOMMENDATION_TABLE_PATH):
+    """Map the precomputed table; a missing or stale table only disables the fast path"""
+    global recommendation_table
+
+    if not path:
+        return
+    try:
+        recommendation_table = RecommendationTable(path)
+        print(f"✅ Mapped recommendation table {path} ({recommendation_table.metadata.get('filled')} combinations)")
+    except Exception as e:
+        recommendation_table = None
+        print(f"⚠️ Recommendation table {path} not loaded: {e}")
+
+def close_recommendation_table():
+    global recommendation_table
+
+    if recommendation_table is not None:
+        recommendation_table.close()
+        recommendation_table = None
+
+def get_recommendation_table() -> Optional[RecommendationTable]:
+    """Get the mapped table, or None when there is none"""
+    return recommendation_table
@@ -0,0 +1,155 @@
+"""
+Top-k matching of a user's profile against the role catalog.
+
+The catalog is the latest job_trends row of every job title, in demand
+order. At build time each role's skill_requirements become one column of a
+bitset matrix (a bit per skill in the catalog's vocabulary, 64 per uint64
+word, stored word-major), and its industry an integer code. A user's
+technical and soft skills become a bitset over the same vocabulary and
+their career interests a set of industry codes.
+
+Scoring ANDs each word in which the user has bits against that word of
+every role at once and popcounts the result (numpy.bitwise_count), so a
+request costs O(roles x user words) whatever the vocabulary size. That
+skill coverage is combined with the industry match, and the best `limit`
+roles are picked with argpartition and ordered through a heap.
+"""
+import heapq
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from services.skill_index import SKILL_ALIASES, fold
+
+# Share of the match score that comes from skill coverage; the rest is the industry match
+SKILL_WEIGHT = 0.75
+MAX_MATCHES = 100
+
+# Career fields from the questionnaire (models/assessment.py), mapped to the industries they cover
+INTEREST_INDUSTRIES = {
+    "Technology/Software Development": ["Technology"],
+    "Healthcare": ["Healthcare"],
+    "Finance/Banking": ["Finance", "Banking"],
+    "Education": ["Education"],
+    "Marketing/Advertising": ["Marketing", "Advertising", "Media"],
+    "Engineering": ["Engineering", "Manufacturing"],
+    "Business/Management": ["Business", "Consulting", "E-commerce"],
+    "Arts/Design": ["Design", "Media"]
+}
+
+class RoleMatcher:
+    """Scores every role in a catalog against one user's skills and interests"""
+
+    def __init__(self, roles: List[Dict[str, Any]]):
+        self.roles = roles
+        self._skills: Dict[str, int] = {}
+        self._industries: Dict[str, int] = {}
+        role_index, skill_bits = [], []
+        required, industry_codes = [], []
+        for position, role in enumerate(roles):
+            names = {fold(skill) for skill in role.get("skill_requirements") or []} - {""}
+            bits = {self._skills.setdefault(name, len(self._skills)) for name in names}
+            role_index.extend([position] * len(bits))
+            skill_bits.extend(bits)
+            required.append(len(bits))
+            industry_codes.append(self._industries.setdefault(fold(role.get("industry") or ""), len(self._industries)))
+
+        skill_bits = np.array(skill_bits, dtype=np.int64)
+        self._bits = np.zeros((max(1, -(-len(self._skills) // 64)), len(roles)), dtype=np.uint64)
+        np.bitwise_or.at(
+            self._bits,
+            (skill_bits // 64, np.array(role_index, dtype=np.int64)),
+            np.left_shift(np.uint64(1), (skill_bits % 64).astype(np.uint64))
+        )
+        # Score points each matched skill is worth in a role
+        self._skill_points = 100 * SKILL_WEIGHT / np.maximum(np.array(required, dtype=np.float64), 1)
+        self._industry_codes = np.array(industry_codes, dtype=np.int64)
+        # Ties go to the earlier (higher-demand) role
+        self._tiebreak = np.arange(len(roles) - 1, -1, -1, dtype=np.int64)
+        self._aliases = {fold(alias): fold(name) for alias, name in SKILL_ALIASES.items()}
+        self._interests = {fold(field): [fold(name) for name in names] for field, names in INTEREST_INDUSTRIES.items()}
+        self.matches = 0
+
+    def _skill_names(self, skills: Iterable[str]) -> set:
+        """Folded catalog names of the user's skills; unknown names fall back to their alias"""
+        names = set()
+        for skill in skills:
+            name = fold(skill)
+            names.add(name if name in self._skills else self._aliases.get(name, name))
+        return names
+
+    def _industry_codes_for(self, interests: Iterable[str]) -> List[int]:
+        codes = []
+        for interest in interests:
+            names = self._interests.get(fold(interest)) or [fold(part) for part in str(interest).split("/")]
+            codes.extend(self._industries[name] for name in names if name in self._industries)
+        return codes
+
+    def scores(self, skills: Iterable[str], interests: Iterable[str]) -> np.ndarray:
+        """Match score (0-100) of every role, in catalog order"""
+        words: Dict[int, int] = {}
+        for name in self._skill_names(skills):
+            bit = self._skills.get(name)
+            if bit is not None:
+                words[bit // 64] = words.get(bit // 64, 0) | (1 << (bit % 64))
+
+        # One pass per word the user has bits in, accumulating matched skills per role
+        overlap = np.zeros(len(self.roles), dtype=np.int32)
+        matched = np.empty(len(self.roles), dtype=np.uint64)
+        for row, mask in words.items():
+            np.bitwise_and(self._bits[row], np.uint64(mask), out=matched)
+            overlap += np.bitwise_count(matched)
+        points = overlap * self._skill_points
+
+        industry_points = np.zeros(len(self._industries))
+        industry_points[self._industry_codes_for(interests)] = 100 * (1 - SKILL_WEIGHT)
+        points += industry_points[self._industry_codes]
+        return np.rint(points, out=points).astype(np.int64)
+
+    def top(self, skills: List[str], interests: List[str], limit: int) -> List[Dict[str, Any]]:
+        """The `limit` best-matching roles, best first"""
+        self.matches += 1
+        count = min(limit, len(self.roles))
+        if count <= 0:
+            return []
+
+        scores = self.scores(skills, interests)
+        # Unique keys, so argpartition keeps exactly the roles the heap would
+        keys = scores * len(self.roles) + self._tiebreak
+        candidates = np.argpartition(keys, len(keys) - count)[len(keys) - count:]
+        best = heapq.nlargest(count, candidates.tolist(), key=keys.__getitem__)
+
+        user_skills = self._skill_names(skills)
+        wanted = set(self._industry_codes_for(interests))
+        matches = []
+        for position in best:
+            role = self.roles[position]
+            required = [skill for skill in role.get("skill_requirements") or [] if fold(skill)]
+            matched = [skill for skill in required if fold(skill) in user_skills]
+            if required:
+                reason = f"You have {len(matched)} of the {len(required)} skills this role asks for"
+            else:
+                reason = "This role lists no specific skills"
+            if self._industry_codes[position] in wanted:
+                reason += f", in an industry you are interested in ({role.get('industry')})"
+            matches.append({
+                "job_title": role.get("job_title"),
+                "industry": role.get("industry"),
+                "match_score": int(scores[position]),
+                "reason": reason,
+                "required_skills": required,
+                "matched_skills": matched,
+                "missing_skills": [skill for skill in required if fold(skill) not in user_skills],
+                "average_salary": role.get("average_salary"),
+                "demand_score": role.get("demand_score")
+            })
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "roles": len(self.roles),
+            "skills": len(self._skills),
+            "bitset_bytes": self._bits.nbytes,
+            "matches": self.matches
+        }
@@ -0,0 +1,208 @@
+"""
+Salary figures computed from raw salary observations.
+
+The market snapshot's salary_observations table holds one row per reported
+salary (job title, location, years of experience, salary, date). At load,
+the observations are banded by experience and grouped by (job title,
+location, experience band) into one NumPy array sorted by group and then by
+salary, with a running sum alongside. Min, max, mean and any percentile of a
+group are then a few index reads into its slice. A list of groups, such as a
+multi-title comparison, is summarized in one vectorized pass. Summaries of
+the groups with the most observations are precomputed at load.
+"""
+import os
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SALARY_OBSERVATIONS_TABLE = "salary_observations"
+SALARY_PRECOMPUTE_KEYS = int(os.getenv("SALARY_PRECOMPUTE_KEYS", "1024"))
+
+# Experience bands the salary endpoint accepts; a band starts at the years in _BAND_EDGES before it
+EXPERIENCE_BANDS = ["0-2", "2-5", "5-10", "10+"]
+_BAND_EDGES = np.array([2, 5, 10])
+
+# Reported percentiles, interpolated linearly between observations like numpy.percentile
+PERCENTILES = {"percentile_25": 0.25, "median_salary": 0.5, "percentile_75": 0.75, "percentile_90": 0.9}
+
+_EPOCH = date(1970, 1, 1)
+
+def _codes(column) -> Tuple[np.ndarray, Dict[str, int], List[str]]:
+    """Integer code per row, merging values that differ only in case or surrounding spaces"""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    encoded = pc.dictionary_encode(pc.fill_null(column, ""))
+
+    codes: Dict[str, int] = {}
+    names: List[str] = []
+    remap = []
+    for value in encoded.dictionary.to_pylist():
+        key = value.strip().lower()
+        if key not in codes:
+            codes[key] = len(names)
+            names.append(value.strip())
+        remap.append(codes[key])
+    return np.array(remap, dtype=np.int64)[encoded.indices.to_numpy()], codes, names
+
+class SalaryEngine:
+    """Per-group salary statistics over a table of observations"""
+
+    def __init__(self, table: pa.Table, as_of: Optional[str] = None, precompute: int = SALARY_PRECOMPUTE_KEYS):
+        started_at = time.perf_counter()
+        missing = [c for c in ("job_title", "location", "years_experience", "salary") if c not in table.column_names]
+        if missing:
+            raise ValueError(f"Salary observations lack columns {missing}")
+
+        self.as_of = as_of
+        title_codes, self._titles, self._title_names = _codes(table["job_title"])
+        location_codes, self._locations, self._location_names = _codes(table["location"])
+        years = table["years_experience"].to_numpy().astype(np.float64)
+        salaries = table["salary"].to_numpy().astype(np.float64)
+        bands = np.searchsorted(_BAND_EDGES, years, side="right")
+
+        groups = (title_codes * len(self._location_names) + location_codes) * len(EXPERIENCE_BANDS) + bands
+        # Observations without a salary or experience are dropped (nulls are NaN here)
+        valid = ~(np.isnan(years) | np.isnan(salaries))
+        if not valid.all():
+            groups, salaries = groups[valid], salaries[valid]
+        # An unstable sort by group and then a sort of each group's slice is several times faster than lexsort
+        order = np.argsort(groups)
+        groups = groups[order]
+        self._values = salaries[order]
+        self._starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]])) if len(groups) else groups
+        self._counts = np.diff(np.append(self._starts, len(groups)))
+        for start, end in zip(self._starts.tolist(), (self._starts + self._counts).tolist()):
+            self._values[start:end].sort()
+        self._sums = np.concatenate([[0.0], np.cumsum(self._values)])
+        self._group_ids = groups[self._starts]
+        self._latest = None
+        if "date" in table.column_names and len(groups):
+            days = pc.fill_null(table["date"].cast(pa.date32()).cast(pa.int32()), 0).to_numpy()[valid]
+            self._latest = np.maximum.reduceat(days[order], self._starts)
+
+        # Largest groups first; they are the likeliest to be asked for
+        self._precomputed: Dict[int, Dict[str, Any]] = {}
+        if precompute > 0 and len(self._counts):
+            top = np.argsort(self._counts)[::-1][:precompute]
+            self._precomputed = dict(zip(top.tolist(), self._rows(top)))
+
+        self.build_ms = (time.perf_counter() - started_at) * 1000
+        self.lookups = 0
+        self.precomputed_hits = 0
+        self.computed = 0
+
+    def _positions(self, job_titles: List[str], location: str, experience: str) -> np.ndarray:
+        """Group position of each title, or -1 where it has no observations"""
+        if not len(self._group_ids) or experience not in EXPERIENCE_BANDS:
+            return np.full(len(job_titles), -1)
+        location_code = self._locations.get(location.strip().lower(), -1)
+        titles = np.array([self._titles.get(title.strip().lower(), -1) for title in job_titles], dtype=np.int64)
+        ids = (titles * len(self._location_names) + location_code) * len(EXPERIENCE_BANDS) + EXPERIENCE_BANDS.index(experience)
+
+        positions = np.minimum(np.searchsorted(self._group_ids, ids), len(self._group_ids) - 1)
+        found = (titles >= 0) & (location_code >= 0) & (self._group_ids[positions] == ids)
+        return np.where(found, positions, -1)
+
+    def _rows(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """Summaries of the groups at positions, computed together"""
+        starts = self._starts[positions]
+        counts = self._counts[positions]
+        ends = starts + counts
+        columns = {
+            "min_salary": self._values[starts],
+            "max_salary": self._values[ends - 1],
+            "average_salary": (self._sums[ends] - self._sums[starts]) / counts
+        }
+        ranks = (counts - 1)[:, None] * np.array(list(PERCENTILES.values()))
+        lower = np.floor(ranks).astype(np.int64)
+        upper = np.minimum(lower + 1, (counts - 1)[:, None])
+        below = self._values[starts[:, None] + lower]
+        above = self._values[starts[:, None] + upper]
+        quantiles = below + (above - below) * (ranks - lower)
+        for index, name in enumerate(PERCENTILES):
+            columns[name] = quantiles[:, index]
+        columns = {name: np.rint(values).astype(np.int64).tolist() for name, values in columns.items()}
+
+        group_ids = self._group_ids[positions]
+        bands = group_ids % len(EXPERIENCE_BANDS)
+        locations = group_ids // len(EXPERIENCE_BANDS) % len(self._location_names)
+        titles = group_ids // len(EXPERIENCE_BANDS) // len(self._location_names)
+        rows = []
+        for i in range(len(positions)):
+            row = {
+                "job_title": self._title_names[titles[i]],
+                "location": self._location_names[locations[i]],
+                "experience_level": EXPERIENCE_BANDS[bands[i]],
+                **{name: values[i] for name, values in columns.items()},
+                "sample_size": int(counts[i])
+            }
+            if self._latest is not None:
+                row["date"] = (_EPOCH + timedelta(days=int(self._latest[positions[i]]))).isoformat()
+            rows.append(row)
+        return rows
+
+    def summaries(self, job_titles: List[str], location: str, experience: str) -> List[Optional[Dict[str, Any]]]:
+        """Salary figures for each title, or None where there are no observations"""
+        self.lookups += 1
+        positions = self._positions(job_titles, location, experience)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(job_titles)
+        pending = []
+        for index, position in enumerate(positions.tolist()):
+            if position < 0:
+                continue
+            row = self._precomputed.get(position)
+            if row is None:
+                pending.append(index)
+            else:
+                self.precomputed_hits += 1
+                results[index] = dict(row)
+        if pending:
+            self.computed += len(pending)
+            for index, row in zip(pending, self._rows(positions[pending])):
+                results[index] = row
+        return results
+
+    def freshness(self) -> Dict[str, Any]:
+        return {"source": "observations", "as_of": self.as_of}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "observations": len(self._values),
+            "groups": len(self._group_ids),
+            "precomputed": len(self._precomputed),
+            "build_ms": round(self.build_ms, 1),
+            "lookups": self.lookups,
+            "precomputed_hits": self.precomputed_hits,
+            "computed": self.computed
+        }
+
+# Global engine, built from the market snapshot in the app lifespan
+salary_engine: Optional[SalaryEngine] = None
+
+def load_salary_engine(snapshot=None):
+    """Index the snapshot's salary observations; without them the engine stays off"""
+    global salary_engine
+
+    if snapshot is None or SALARY_OBSERVATIONS_TABLE not in snapshot.tables:
+        return
+    try:
+        salary_engine = SalaryEngine(snapshot.tables[SALARY_OBSERVATIONS_TABLE], as_of=snapshot.manifest.get("exported_at"))
+        stats = salary_engine.stats()
+        print(f"✅ Indexed {stats['observations']} salary observations in {stats['groups']} groups "
+              f"({stats['build_ms']:.0f}ms)")
+    except Exception as e:
+        salary_engine = None
+        print(f"⚠️ Salary observations not indexed: {e}")
+
+def close_salary_engine():
+    global salary_engine
+    salary_engine = None
+
+def get_salary_engine() -> Optional[SalaryEngine]:
+    """Get the salary engine, or None when there are no observations"""
+    return salary_engine
@@ -0,0 +1,89 @@
+"""
+Case-folded lookup index over skill demand rows.
+
+/api/career/skills asks which of a list of skills are in demand, and which
+skills a job title or industry calls for. SkillIndex is built once per set
+of rows (a cached query result or the mapped snapshot) and maps folded skill
+names, and the job titles and industries each skill lists, to row positions.
+A request for M skills is then M dictionary lookups instead of a scan of
+every row. Names that are not indexed are resolved through SKILL_ALIASES.
+Blank names are never indexed and blank filters are ignored, so a stray
+comma in a request cannot match every row with a missing name.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Short forms and alternative spellings, mapped to the name skill rows use
+SKILL_ALIASES = {
+    "JS": "JavaScript",
+    "ECMAScript": "JavaScript",
+    "TS": "TypeScript",
+    "Py": "Python",
+    "Python3": "Python",
+    "ML": "Machine Learning",
+    "DL": "Deep Learning",
+    "AI": "Artificial Intelligence",
+    "NLP": "Natural Language Processing",
+    "CV": "Computer Vision",
+    "Node": "Node.js",
+    "NodeJS": "Node.js",
+    "ReactJS": "React",
+    "React.js": "React",
+    "K8s": "Kubernetes",
+    "Golang": "Go",
+    "Postgres": "PostgreSQL",
+    "TF": "TensorFlow",
+    "sklearn": "Scikit-learn",
+    "CICD": "CI/CD",
+    "GCP": "Google Cloud",
+    "Amazon Web Services": "AWS",
+    "MS Excel": "Excel",
+    "Stats": "Statistics"
+}
+
+def fold(value: Any) -> str:
+    """Case-insensitive form of a name, with whitespace collapsed"""
+    return " ".join(str(value).casefold().split())
+
+class SkillIndex:
+    """Skill, job title and industry lookups over one list of skill rows"""
+
+    def __init__(self, rows: List[Dict[str, Any]], aliases: Dict[str, str] = SKILL_ALIASES):
+        self.rows = rows
+        self._skills: Dict[str, List[int]] = {}
+        self._job_titles: Dict[str, List[int]] = {}
+        self._industries: Dict[str, List[int]] = {}
+        for position, row in enumerate(rows):
+            name = fold(row.get("skill_name") or "")
+            if name:
+                self._skills.setdefault(name, []).append(position)
+            for title in set(map(fold, row.get("job_titles") or [])) - {""}:
+                self._job_titles.setdefault(title, []).append(position)
+            for industry in set(map(fold, row.get("industries") or [])) - {""}:
+                self._industries.setdefault(industry, []).append(position)
+        self._aliases = {fold(alias): fold(name) for alias, name in aliases.items()}
+
+    def resolve(self, skill: str) -> List[int]:
+        """Positions of the rows for a skill; an indexed name wins over an alias"""
+        name = fold(skill)
+        if name not in self._skills:
+            name = self._aliases.get(name, name)
+        return self._skills.get(name, [])
+
+    def lookup(
+        self,
+        skills: Optional[Iterable[str]] = None,
+        job_title: Optional[str] = None,
+        industry: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows matching every given filter, in their original order; blank filters are ignored"""
+        positions: Optional[Set[int]] = None
+        skills = [skill for skill in skills or [] if fold(skill)]
+        if skills:
+            positions = {position for skill in skills for position in self.resolve(skill)}
+        for reverse, value in ((self._job_titles, job_title), (self._industries, industry)):
+            if value and fold(value):
+                matches = reverse.get(fold(value), [])
+                positions = set(matches) if positions is None else positions.intersection(matches)
+        if positions is None:
+            return list(self.rows)
+        return [self.rows[position] for position in sorted(positions)]
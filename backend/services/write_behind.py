@@ -0,0 +1,116 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Tuple
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore import AsyncClient
+
+class WriteBehindBuffer:
+    """
+    Coalesces non-critical field updates per document and flushes them to
+    Firestore in batch commits on an interval.
+
+    Only use this for telemetry-style fields (last_login_at and the like):
+    buffered writes are lost if the process dies between flushes, and a
+    later write to the same field replaces an earlier one before it lands.
+    Updates never create documents: one whose document was deleted before
+    the flush is dropped.
+    """
+
+    # Firestore rejects batches with more than 500 writes
+    MAX_BATCH_SIZE = 500
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.buffered = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def record(self, collection: str, doc_id: str, fields: Dict[str, Any]):
+        """Queue a field update, merging it into any pending one for the document"""
+        key = (collection, doc_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = dict(fields)
+        else:
+            pending.update(fields)
+            self.coalesced += 1
+        self.buffered += 1
+
+    def _requeue(self, items: List[Tuple[Tuple[str, str], Dict[str, Any]]]):
+        for key, fields in items:
+            # Newer updates recorded since the swap take precedence
+            self._pending[key] = {**fields, **self._pending.get(key, {})}
+
+    async def flush(self, db: AsyncClient) -> int:
+        """Write every pending update; failed writes are put back for the next flush"""
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        written = 0
+        
+        for start in range(0, len(items), self.MAX_BATCH_SIZE):
+            chunk = items[start:start + self.MAX_BATCH_SIZE]
+            batch = db.batch()
+            for (collection, doc_id), fields in chunk:
+                batch.update(db.collection(collection).document(doc_id), fields)
+            try:
+                await batch.commit()
+            except NotFound:
+                # A document was deleted since its update was recorded, which
+                # fails the whole batch; write the chunk one by one without it
+                written += await self._update_each(db, chunk)
+                continue
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Write-behind flush failed: {e}")
+                self._requeue(chunk)
+                continue
+            self.batches += 1
+            written += len(chunk)
+        
+        self.flushed += written
+        return written
+
+    async def _update_each(self, db: AsyncClient, chunk: List[Tuple[Tuple[str, str], Dict[str, Any]]]) -> int:
+        """Update a chunk's documents individually, dropping those that no longer exist"""
+        results = await asyncio.gather(
+            *(db.collection(collection).document(doc_id).update(fields) for (collection, doc_id), fields in chunk),
+            return_exceptions=True
+        )
+        written, failed = 0, []
+        for item, result in zip(chunk, results):
+            if isinstance(result, NotFound):
+                self.dropped += 1
+            elif isinstance(result, BaseException):
+                failed.append(item)
+            else:
+                written += 1
+        if failed:
+            self.failures += 1
+            print(f"⚠️ Write-behind flush failed for {len(failed)} documents")
+            self._requeue(failed)
+        return written
+
+    async def run(self, db: AsyncClient):
+        """Background task that flushes every interval"""
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._pending:
+                await self.flush(db)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "pending": len(self._pending),
+            "buffered": self.buffered,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped
+        }
+
+write_behind = WriteBehindBuffer(interval=float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "5")))
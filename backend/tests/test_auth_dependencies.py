@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from auth.dependencies import get_current_user, get_current_user_claims, user_cache
+from auth.jwt_handler import build_profile_claims, create_access_token
+from auth.revocation import RevocationStore
+from benchmarks.fake_firestore import FakeFirestore
+from config.database import COLLECTIONS
+
+USER = {
+    "email": "asha@example.com",
+    "is_active": True,
+    "profile_version": 2,
+    "current_education_level": "Bachelor's Degree",
+    "technical_skills": ["Python"],
+    "soft_skills": ["Communication"],
+    "career_interests": ["Technology/Software Development"]
+}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = RevocationStore(capacity=16)
+    monkeypatch.setattr("auth.jwt_handler.revocation_store", store)
+    user_cache.clear()
+    return store
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    db.data[COLLECTIONS["USERS"]] = {"u1": dict(USER)}
+    return db
+
+
+def bearer(claims=True):
+    data = {"user_id": "u1", "email": USER["email"]}
+    if claims:
+        data["prf"] = build_profile_claims(USER)
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(data))
+
+
+def test_claims_are_served_without_reading_the_user(store, db):
+    user = asyncio.run(get_current_user_claims(bearer(), db))
+
+    assert user["technical_skills"] == ["Python"]
+    assert user["profile_version"] == 2
+    assert db.round_trips == 0
+
+
+def test_token_without_claims_falls_back_to_the_user_document(store, db):
+    user = asyncio.run(get_current_user_claims(bearer(claims=False), db))
+
+    assert user["id"] == "u1" and user["is_active"]
+    assert db.round_trips == 1
+
+
+def test_revoking_a_user_rejects_their_existing_tokens(store, db):
+    credentials = bearer()
+    asyncio.run(get_current_user_claims(credentials, db))
+
+    asyncio.run(store.revoke_user(db, "u1", int(time.time()) + 3600))
+
+    for dependency in (get_current_user_claims, get_current_user):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(dependency(credentials, db))
+        assert error.value.status_code == 401
@@ -0,0 +1,113 @@
+import pytest
+
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_rate=0.5, slow_call_seconds=5, slow_call_rate=0.8, window=10,
+                          min_calls=4, open_seconds=30, half_open_calls=2, clock=clock)
+
+
+def trip(breaker):
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(0.1, failed=True)
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_min_calls_or_failure_rate(breaker):
+    for _ in range(3):
+        breaker.record(0.1, failed=True)
+    assert breaker.state == CLOSED
+
+    breaker = CircuitBreaker("test", failure_rate=0.5, window=10, min_calls=4)
+    for failed in (False, False, False, True, False, True, True):
+        breaker.record(0.1, failed=failed)
+    # 3 failures in 7 calls
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects_calls(breaker):
+    breaker.record(0.1, failed=False)
+    breaker.record(0.1, failed=True)
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+    breaker.record(0.1, failed=True)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_opens_on_slow_call_rate(breaker):
+    for _ in range(4):
+        breaker.record(6, failed=False)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probes_close_the_circuit(breaker, clock):
+    trip(breaker)
+    clock.now = 29.9
+    assert not breaker.allow()
+
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only half_open_calls probes at a time
+    assert not breaker.allow()
+
+    breaker.record(0.1, failed=False)
+    assert breaker.state == HALF_OPEN
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit(breaker, clock):
+    trip(breaker)
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record(0.1, failed=True)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+    clock.now = 59
+    assert not breaker.allow()
+
+
+def test_released_probe_frees_its_slot(breaker, clock):
+    trip(breaker)
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A cancelled probe records no outcome
+    breaker.release()
+    assert breaker.allow()
+    breaker.record(0.1, failed=False)
+    breaker.record(0.1, failed=False)
+    assert breaker.state == CLOSED
+
+
+def test_release_is_a_no_op_while_closed(breaker):
+    breaker.release()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
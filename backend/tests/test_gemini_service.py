@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import pytest
+
+from services.gemini_service import GeminiService
+from services.recommendation_cache import RecommendationCache
+
+ANSWERS = {"1": "Bachelor's Degree", "2": ["Technology/Software Development"], "5": ["Programming/Coding"]}
+
+
+def course(title):
+    return {
+        "title": title,
+        "description": "Hands-on introduction",
+        "category": "Technical",
+        "difficulty": "Beginner",
+        "duration": "6 weeks",
+        "platform": "Coursera",
+        "priority": "High",
+        "reason": "Matches your interests"
+    }
+
+
+def document(*titles):
+    return {
+        "career_path": "Software Engineer",
+        "skill_gaps": ["Testing"],
+        "courses": [course(title) for title in titles],
+        "learning_path": "Basics first",
+        "next_steps": ["Enroll"]
+    }
+
+
+class FakeClient:
+    """Replies to every call with the same text, whole or in chunks"""
+
+    def __init__(self, text, chunk_size=20):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    async def generate_content_with_usage(self, prompt):
+        self.calls += 1
+        return self.text, {"prompt_tokens": 10, "output_tokens": 20}
+
+    async def stream_content(self, prompt):
+        self.calls += 1
+        for start in range(0, len(self.text), self.chunk_size):
+            yield self.text[start:start + self.chunk_size]
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    service = GeminiService(cache=RecommendationCache(maxsize=100, ttl=60))
+    asyncio.run(service.client.aclose())
+    return service
+
+
+def reply(service, text):
+    service.client = FakeClient(text)
+    return asyncio.run(service.generate_course_recommendations_async(ANSWERS))
+
+
+def test_valid_reply_is_returned_and_cached(service):
+    text = f"```json\n{json.dumps(document('C0', 'C1'))}\n```"
+    result = reply(service, text)
+    assert result["success"] and not result["cached"]
+    assert [c["title"] for c in result["recommendations"]["courses"]] == ["C0", "C1"]
+
+    again = asyncio.run(service.generate_course_recommendations_async(ANSWERS))
+    assert again["cached"] and again["recommendations"] == result["recommendations"]
+    assert service.client.calls == 1
+
+
+@pytest.mark.parametrize("text", [
+    "Sorry, I cannot help with that.",
+    json.dumps(document("C0"))[:-40],
+    json.dumps({**document("C0"), "courses": "none"})
+])
+def test_unusable_reply_falls_back_and_is_not_cached(service, text):
+    result = reply(service, text)
+    assert result["success"] is False
+    assert result["fallback"] in ("rules", "static")
+    assert not result["circuit_open"]
+
+    # The next identical submission calls Gemini again
+    asyncio.run(service.generate_course_recommendations_async(ANSWERS))
+    assert service.client.calls == 2
+    assert len(service.cache.cache) == 0
+
+
+def stream(service, text):
+    service.client = FakeClient(text)
+
+    async def collect():
+        return [event async for event in service.stream_course_recommendations(ANSWERS)]
+
+    events = asyncio.run(collect())
+    courses = [data["title"] for event, data in events if event == "course"]
+    assert [event for event, _ in events[:-1]] == ["course"] * len(courses)
+    assert events[-1][0] == "complete"
+    return courses, events[-1][1]
+
+
+def test_streamed_document_is_cached(service):
+    courses, result = stream(service, json.dumps(document("C0", "C1", "C2")))
+    assert courses == ["C0", "C1", "C2"]
+    assert result["success"] and not result.get("partial")
+    assert len(service.cache.cache) == 1
+
+
+def test_truncated_stream_keeps_streamed_courses_and_is_not_cached(service):
+    text = json.dumps(document("C0", "C1", "C2", "C3"))
+    courses, result = stream(service, text[:text.index('{"title": "C3"')])
+
+    assert courses == ["C0", "C1", "C2"]
+    assert result["success"] is False and result["partial"] is True
+    assert [c["title"] for c in result["recommendations"]["courses"]] == courses
+    assert len(service.cache.cache) == 0
+
+
+def test_abandoned_draft_is_not_cached(service):
+    draft = json.dumps(document("D0", "D1"))
+    courses, result = stream(service, f"```json\n{draft[:draft.index('D1') + 20]}\n```\nAgain:\n"
+                                      f"```json\n{json.dumps(document('C0'))}\n```")
+
+    assert courses == ["D0", "C0"]
+    assert result["success"] is False and result["partial"] is True
+    assert [c["title"] for c in result["recommendations"]["courses"]] == courses
+    assert len(service.cache.cache) == 0
+
+
+def test_invalid_stream_without_courses_streams_the_fallback(service):
+    courses, result = stream(service, json.dumps({**document(), "skill_gaps": "Testing"}))
+
+    assert result["success"] is False and not result.get("partial")
+    assert courses == [c["title"] for c in result["recommendations"]["courses"]]
+    assert courses and len(service.cache.cache) == 0
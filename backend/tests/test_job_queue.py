@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from services.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobRetry
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, lease_seconds=60, retry_base=0)
+    queue.open()
+    yield queue
+    queue.close()
+
+
+def run_next(queue):
+    job = queue._claim()
+    assert job is not None
+    asyncio.run(queue._process(job))
+    return queue._get(job["id"])
+
+
+def test_job_succeeds_with_handler_result(queue):
+    async def handler(job):
+        return {"echo": job["payload"]["value"]}
+
+    queue.register("echo", handler)
+    job_id = asyncio.run(queue.enqueue("echo", {"value": 3}, user_id="u1"))
+
+    job = run_next(queue)
+    assert job["id"] == job_id
+    assert (job["status"], job["attempts"], job["result"]) == (SUCCEEDED, 1, {"echo": 3})
+    assert queue._claim() is None
+    assert queue.stats()["processed"] == 1
+
+
+def test_job_is_retried_then_fails_after_max_attempts(queue):
+    async def handler(job):
+        raise JobRetry("upstream busy")
+
+    queue.register("flaky", handler)
+    asyncio.run(queue.enqueue("flaky", {}))
+
+    for attempt in (1, 2):
+        job = run_next(queue)
+        assert (job["status"], job["attempts"]) == (QUEUED, attempt)
+        assert job["last_error"] == "JobRetry: upstream busy"
+
+    job = run_next(queue)
+    assert (job["status"], job["attempts"]) == (FAILED, 3)
+    stats = queue.stats()
+    assert (stats["retried"], stats["gave_up"], stats["failed"]) == (2, 1, 1)
+
+
+def test_retry_waits_for_backoff(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, lease_seconds=60, retry_base=60)
+    queue.open()
+    try:
+        async def handler(job):
+            raise RuntimeError("boom")
+
+        queue.register("slow", handler)
+        asyncio.run(queue.enqueue("slow", {}))
+        job = run_next(queue)
+
+        assert job["status"] == QUEUED
+        assert job["available_at"] >= time.time() + 29
+        assert queue._claim() is None
+    finally:
+        queue.close()
+
+
+def test_attempt_that_outlives_its_lease_is_discarded(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=3, lease_seconds=0.01, retry_base=0)
+    queue.open()
+    try:
+        async def handler(job):
+            return {"attempt": job["attempts"]}
+
+        queue.register("work", handler)
+        job_id = asyncio.run(queue.enqueue("work", {}))
+
+        stale = queue._claim()
+        time.sleep(0.02)
+        # The lease expired, so another worker takes the job over
+        current = queue._claim()
+        assert current["id"] == job_id and current["attempts"] == 2
+
+        asyncio.run(queue._process(stale))
+        assert queue._get(job_id)["status"] == RUNNING
+        assert queue.stats()["lost_leases"] == 1
+
+        asyncio.run(queue._process(current))
+        job = queue._get(job_id)
+        assert (job["status"], job["result"]) == (SUCCEEDED, {"attempt": 2})
+    finally:
+        queue.close()
+
+
+def test_enqueue_rejects_unknown_kinds(queue):
+    with pytest.raises(ValueError):
+        asyncio.run(queue.enqueue("missing", {}))
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from benchmarks.llm_output_corpus import build_corpus
+from services.json_stream import JSONStreamExtractor, extract_json_object
+from services.recommendation_schema import validate_course
+
+CORPUS = build_corpus(seed=3, per_kind=3)
+
+
+@pytest.mark.parametrize("name, text, expected", CORPUS, ids=[case[0] for case in CORPUS])
+def test_corpus_document_is_extracted(name, text, expected):
+    assert extract_json_object(text) == expected
+
+
+@pytest.mark.parametrize("name, text, expected", CORPUS, ids=[case[0] for case in CORPUS])
+def test_streaming_in_random_chunks_matches_one_shot(name, text, expected):
+    whole = JSONStreamExtractor(array_key="courses", item_validator=validate_course)
+    expected_courses = whole.feed(text)
+
+    rng = random.Random(name)
+    for _ in range(3):
+        extractor = JSONStreamExtractor(array_key="courses", item_validator=validate_course)
+        courses, i = [], 0
+        while i < len(text):
+            size = rng.choice([1, 2, 3, rng.randint(4, 64)])
+            courses += extractor.feed(text[i:i + size])
+            i += size
+        assert extractor.document == whole.document
+        assert courses == expected_courses
+    if expected is not None:
+        # An abandoned draft has already streamed its complete courses ahead of the document's
+        valid = [course for course in expected["courses"] if not validate_course(course)]
+        assert expected_courses[len(expected_courses) - len(valid):] == valid
+
+
+def test_courses_are_emitted_as_each_one_closes():
+    extractor = JSONStreamExtractor(array_key="courses")
+    assert extractor.feed('Here: {"courses": [{"title": "A", "tags": ["x", "}"]}') == [{"title": "A", "tags": ["x", "}"]}]
+    assert extractor.feed(', {"title": "B"') == []
+    assert extractor.feed('}]') == [{"title": "B"}]
+    assert extractor.document is None
+    assert extractor.feed(', "summary": "done"}') == []
+    assert extractor.done
+    assert extractor.document == {"courses": [{"title": "A", "tags": ["x", "}"]}, {"title": "B"}], "summary": "done"}
+
+
+def test_invalid_items_are_skipped():
+    extractor = JSONStreamExtractor(array_key="courses", item_validator=lambda item: [] if "title" in item else ["title"])
+    assert extractor.feed('{"courses": [{"title": "A"}, {"name": "B"}, 3, {"title": "C"}]}') == [
+        {"title": "A"}, {"title": "C"}
+    ]
+
+
+def test_prose_braces_are_rejected_before_the_document():
+    extractor = JSONStreamExtractor()
+    extractor.feed('Fill in the {name} and {role} fields: {"name": "Asha"} and {"ignored": true}')
+    assert extractor.document == {"name": "Asha"}
+    assert extractor.candidates_rejected == 2
+
+
+def test_a_fence_or_raw_newline_abandons_the_candidate():
+    assert extract_json_object('```json\n{"a": [1, 2\n```\nAgain:\n```json\n{"a": 3}\n```') == {"a": 3}
+    assert extract_json_object('{"a": "cut off\n{"b": 1}') == {"b": 1}
+
+
+def test_truncated_output_has_no_document():
+    extractor = JSONStreamExtractor(array_key="courses")
+    assert extractor.feed('```json\n{"courses": [{"title": "A"}, {"title": "B", "url": "ht') == [{"title": "A"}]
+    assert extractor.document is None
+    assert not extractor.done
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from auth.jwt_handler import create_access_token
+from middleware.rate_limit import InMemoryBackend, RateLimitBackend, RateLimiter, RateLimitPolicy, create_rate_limiter
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def scope(path="/api/career/trends", headers=(), client=("10.0.0.1", 5000)):
+    return {"type": "http", "path": path, "headers": list(headers), "client": client}
+
+
+@pytest.mark.parametrize("path, policy", [
+    ("/api/auth/login", "auth"),
+    ("/api/assessments/submit-answers", "submit_answers"),
+    ("/api/assessments/recommendations", "results"),
+    ("/api/assessments/jobs/abc123", "results"),
+    ("/api/assessments/questions", "assessments"),
+    ("/api/career/trends", "general")
+])
+def test_longest_prefix_policy_wins(path, policy):
+    assert create_rate_limiter().policy_for(path).name == policy
+
+
+def test_bucket_empties_then_refills(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr("middleware.rate_limit.time.monotonic", clock)
+    backend = InMemoryBackend()
+
+    async def take():
+        return await backend.take("key", 3, 1.0)
+
+    results = [asyncio.run(take()) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[2][1] == 0
+
+    clock.now += 1.5
+    allowed, tokens = asyncio.run(take())
+    assert allowed and tokens == pytest.approx(0.5)
+
+    clock.now += 60
+    assert asyncio.run(take()) == (True, 2.0)
+
+
+def test_identity_prefers_a_valid_token():
+    limiter = RateLimiter([], RateLimitPolicy("general", "/", 10), InMemoryBackend())
+    token = create_access_token({"user_id": "u1", "email": "u1@example.com"})
+
+    assert limiter.identity(scope(headers=[(b"authorization", f"Bearer {token}".encode())])) == "user:u1"
+    assert limiter.identity(scope(headers=[(b"authorization", b"Bearer not-a-token")])) == "ip:10.0.0.1"
+    assert limiter.identity(scope(client=None)) == "ip:unknown"
+
+
+def test_forwarded_for_is_only_used_when_trusted():
+    headers = [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.2")]
+    default = RateLimitPolicy("general", "/", 10)
+
+    assert RateLimiter([], default, InMemoryBackend()).identity(scope(headers=headers)) == "ip:10.0.0.1"
+    trusted = RateLimiter([], default, InMemoryBackend(), trust_forwarded_for=True)
+    assert trusted.identity(scope(headers=headers)) == "ip:203.0.113.7"
+
+
+def test_check_limits_each_caller_separately():
+    limiter = RateLimiter([RateLimitPolicy("auth", "/api/auth/login", 2)], RateLimitPolicy("general", "/", 10),
+                          InMemoryBackend())
+
+    async def check(client):
+        allowed, policy, _ = await limiter.check(scope("/api/auth/login", client=(client, 1)))
+        return allowed, policy.name
+
+    assert [asyncio.run(check("10.0.0.1")) for _ in range(3)] == [(True, "auth")] * 2 + [(False, "auth")]
+    assert asyncio.run(check("10.0.0.2")) == (True, "auth")
+    assert limiter.stats()["allowed"] == {"auth": 3}
+    assert limiter.stats()["limited"] == {"auth": 1}
+
+
+def test_backend_must_implement_take():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
@@ -0,0 +1,62 @@
+import json
+import random
+from array import array
+
+import pytest
+
+from models.assessment import CAREER_QUESTIONS
+from services.recommendation_cache import normalize_answers
+from services.recommendation_table import (
+    COMBINATIONS, MISSING, RecommendationTable, combination_answers, combination_index, write_table
+)
+
+
+@pytest.mark.parametrize("index", [0, 1, 255, COMBINATIONS // 2, COMBINATIONS - 1])
+def test_boundary_combinations_round_trip(index):
+    assert combination_index(combination_answers(index)) == index
+
+
+def test_random_combinations_round_trip_through_normalization():
+    rng = random.Random(7)
+    for index in rng.sample(range(COMBINATIONS), 2000):
+        answers = normalize_answers(combination_answers(index))
+        assert combination_index(answers) == index
+
+
+def test_equivalent_submissions_share_a_combination():
+    tech, health = CAREER_QUESTIONS[1]["options"][:2]
+    base = {"1": "High School", "2": [tech, health], "3": "0-1 years (Entry level)", "4": "Remote work"}
+    variant = {"q1": " High  School ", "question_02": [health, tech, tech], "3": "0-1 years (Entry level)",
+               "4": "Remote work", "5": []}
+
+    index = combination_index(normalize_answers(base))
+    assert index is not None
+    assert combination_index(normalize_answers(variant)) == index
+    # An unanswered multi-select question is the empty selection
+    assert combination_answers(index)["5"] == []
+
+
+def test_answers_outside_the_table_have_no_combination():
+    answers = combination_answers(12345)
+    assert combination_index({**answers, "1": "Kindergarten"}) is None
+    assert combination_index({**answers, "2": ["Astronomy"]}) is None
+    assert combination_index({key: value for key, value in answers.items() if key != "3"}) is None
+
+
+def test_table_lookup_returns_the_written_payload(tmp_path):
+    index = array("I", [MISSING]) * COMBINATIONS
+    filled = [0, 4242, COMBINATIONS - 1]
+    for payload_id, combination in enumerate(filled):
+        index[combination] = payload_id % 2
+    payloads = [json.dumps({"courses": [{"title": name}]}).encode() for name in ("Even", "Odd")]
+
+    path = str(tmp_path / "table.bin")
+    write_table(path, index, payloads, {"source": "test", "filled": len(filled)})
+    table = RecommendationTable(path)
+    try:
+        found = [table.get(combination_answers(combination)) for combination in filled]
+        assert [payload["courses"][0]["title"] for payload in found] == ["Even", "Odd", "Even"]
+        assert table.get(combination_answers(1)) is None
+        assert table.stats()["hits"] == 3 and table.stats()["misses"] == 1
+    finally:
+        table.close()
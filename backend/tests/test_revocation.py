@@ -0,0 +1,131 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from auth.revocation import BloomFilter, RevocationStore
+from benchmarks.fake_firestore import FakeFirestore
+
+
+def jtis(count, seed=0):
+    rng = random.Random(seed)
+    return [uuid.UUID(int=rng.getrandbits(128), version=4).hex for _ in range(count)]
+
+
+def test_bloom_from_keys_matches_scalar_adds():
+    keys = RevocationStore._keys(jtis(5000))
+    bulk = BloomFilter.from_keys(keys, 5000, 0.01)
+    scalar = BloomFilter(5000, 0.01)
+    for key in keys.tolist():
+        scalar.add(key)
+
+    assert bulk._bits == scalar._bits
+    assert bulk.count == scalar.count
+    assert all(key in bulk for key in keys.tolist())
+
+
+def test_bloom_false_positive_rate_is_near_target():
+    keys = RevocationStore._keys(jtis(10000))
+    bloom = BloomFilter.from_keys(keys, 10000, 0.01)
+    others = RevocationStore._keys(jtis(10000, seed=1)).tolist()
+
+    assert sum(key in bloom for key in others) / len(others) < 0.03
+
+
+def test_batch_keys_match_single_keys():
+    mixed = jtis(3) + ["not-a-uuid", "z" * 32]
+    assert RevocationStore._keys(mixed).tolist() == [RevocationStore._key(jti) for jti in mixed]
+    assert RevocationStore._keys(jtis(3)).tolist() == [RevocationStore._key(jti) for jti in jtis(3)]
+
+
+def test_added_tokens_are_revoked_and_others_are_not():
+    store = RevocationStore(capacity=16)
+    revoked = jtis(100)
+    for jti in revoked:
+        store.add(jti)
+
+    assert all(store.is_revoked(jti) for jti in revoked)
+    assert not any(store.is_revoked(jti) for jti in jtis(1000, seed=1))
+    # The filter grew past its initial capacity without losing keys
+    assert store._bloom.capacity >= 100
+
+
+def test_recent_additions_survive_a_merge(monkeypatch):
+    monkeypatch.setattr("auth.revocation.REVOCATION_MERGE_BATCH", 8)
+    store = RevocationStore(capacity=1000)
+    revoked = jtis(50)
+    for jti in revoked:
+        store.add(jti)
+
+    assert len(store._recent) < 8
+    assert np.all(store._exact[:-1] < store._exact[1:])
+    assert all(store.is_revoked(jti) for jti in revoked)
+
+
+def test_replace_swaps_the_whole_list():
+    store = RevocationStore(capacity=16)
+    old, new = jtis(10), jtis(10, seed=1)
+    for jti in old:
+        store.add(jti)
+
+    store.replace(new + new[:3])
+
+    assert len(store._exact) == len(new)
+    assert all(store.is_revoked(jti) for jti in new)
+    assert not any(store.is_revoked(jti) for jti in old)
+
+
+def test_replace_async_keeps_tokens_revoked_during_the_reload(monkeypatch):
+    store = RevocationStore(capacity=16)
+    loaded, revoked_meanwhile = jtis(20), jtis(5, seed=1)
+    build = store._build
+
+    def slow_build(*args):
+        # Revocations arriving while the worker thread builds the new list
+        for jti in revoked_meanwhile:
+            store.add(jti)
+        return build(*args)
+
+    monkeypatch.setattr(store, "_build", slow_build)
+    asyncio.run(store.replace_async(loaded))
+
+    assert store._added_during_reload is None
+    assert all(store.is_revoked(jti) for jti in loaded + revoked_meanwhile)
+
+
+def test_revoke_user_rejects_tokens_issued_before_it():
+    store = RevocationStore(capacity=16)
+    db = FakeFirestore()
+    asyncio.run(store.revoke_user(db, "u1", int(time.time()) + 3600))
+
+    assert store.is_user_revoked("u1", int(time.time()) - 10)
+    # Tokens without an issue time predate the cutoff
+    assert store.is_user_revoked("u1", None)
+    assert not store.is_user_revoked("u1", int(time.time()) + 10)
+    assert not store.is_user_revoked("u2", int(time.time()) - 10)
+    assert db.data["revoked_users"]["u1"]["user_id"] == "u1"
+
+
+def test_user_cutoffs_merge_from_sync_and_drop_once_expired():
+    store = RevocationStore(capacity=16)
+    now = time.time()
+
+    def doc(user_id, revoked_before, expires_at):
+        data = {
+            "revoked_before": datetime.fromtimestamp(revoked_before, timezone.utc),
+            "expires_at": datetime.utcfromtimestamp(expires_at)
+        }
+        return SimpleNamespace(id=user_id, to_dict=lambda: data)
+
+    store._merge_user_cutoffs([doc("u1", now - 100, now + 3600), doc("u2", now - 100, now - 1)])
+    assert store.is_user_revoked("u1", int(now) - 200)
+    assert not store.is_user_revoked("u2", int(now) - 200)
+
+    # An older cutoff synced later never replaces a newer one
+    store._merge_user_cutoffs([doc("u1", now - 1000, now + 3600)])
+    assert store.is_user_revoked("u1", int(now) - 200)
+    assert store.stats()["revoked_users"] == 1
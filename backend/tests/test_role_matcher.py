@@ -0,0 +1,89 @@
+import random
+
+from services.role_matcher import INTEREST_INDUSTRIES, SKILL_WEIGHT, RoleMatcher
+from services.skill_index import fold
+
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Education", "Media", "Manufacturing"]
+
+
+def catalog(count, vocabulary, rng):
+    return [
+        {
+            "job_title": f"Role {i}",
+            "industry": rng.choice(INDUSTRIES),
+            "average_salary": 100000 + i,
+            "demand_score": 1 - i / count,
+            "skill_requirements": rng.sample(vocabulary, rng.randint(0, 6))
+        }
+        for i in range(count)
+    ]
+
+
+def python_top(roles, skills, interests, limit):
+    """Score every role with set intersections and sort the whole catalog"""
+    user_skills = {fold(skill) for skill in skills}
+    industries = {fold(name) for interest in interests for name in INTEREST_INDUSTRIES[interest]}
+    scored = []
+    for position, role in enumerate(roles):
+        required = {fold(skill) for skill in role["skill_requirements"]}
+        coverage = len(required & user_skills) / max(len(required), 1)
+        score = round(100 * (SKILL_WEIGHT * coverage + (1 - SKILL_WEIGHT) * (fold(role["industry"]) in industries)))
+        scored.append((-score, position))
+    scored.sort()
+    return [(roles[position]["job_title"], -score) for score, position in scored[:limit]]
+
+
+def test_top_matches_a_brute_force_ranking():
+    rng = random.Random(11)
+    # Over 64 skills, so user bits span several bitset words
+    vocabulary = [f"Skill {i}" for i in range(150)]
+    roles = catalog(500, vocabulary, rng)
+    matcher = RoleMatcher(roles)
+
+    for _ in range(50):
+        skills = rng.sample(vocabulary, rng.randint(0, 20))
+        interests = rng.sample(list(INTEREST_INDUSTRIES), rng.randint(0, 3))
+        for limit in (1, 10, 600):
+            found = [(match["job_title"], match["match_score"]) for match in matcher.top(skills, interests, limit)]
+            assert found == python_top(roles, skills, interests, limit)
+
+
+def test_ties_go_to_the_earlier_role():
+    roles = [{"job_title": f"Role {i}", "industry": "Technology", "skill_requirements": ["Python"]} for i in range(5)]
+    matcher = RoleMatcher(roles)
+    assert [match["job_title"] for match in matcher.top(["python"], [], 3)] == ["Role 0", "Role 1", "Role 2"]
+
+
+def test_match_details_use_aliases_and_folded_names():
+    roles = [
+        {"job_title": "Frontend Developer", "industry": "Technology",
+         "skill_requirements": ["JavaScript", "React", "CSS", ""]},
+        {"job_title": "Nurse", "industry": "Healthcare", "skill_requirements": []}
+    ]
+    matcher = RoleMatcher(roles)
+
+    best, other = matcher.top(["JS", " react "], ["Technology/Software Development"], 5)
+    assert best["job_title"] == "Frontend Developer"
+    assert best["matched_skills"] == ["JavaScript", "React"]
+    assert best["missing_skills"] == ["CSS"]
+    assert best["required_skills"] == ["JavaScript", "React", "CSS"]
+    assert best["match_score"] == round(100 * (SKILL_WEIGHT * 2 / 3 + 1 - SKILL_WEIGHT))
+    assert best["reason"] == ("You have 2 of the 3 skills this role asks for, "
+                              "in an industry you are interested in (Technology)")
+    assert (other["match_score"], other["reason"]) == (0, "This role lists no specific skills")
+
+
+def test_interests_outside_the_questionnaire_match_by_name():
+    roles = [
+        {"job_title": "Teacher", "industry": "Education", "skill_requirements": ["Communication"]},
+        {"job_title": "Banker", "industry": "Banking", "skill_requirements": ["Communication"]}
+    ]
+    matcher = RoleMatcher(roles)
+    assert [match["job_title"] for match in matcher.top([], ["Retail/Banking"], 2)] == ["Banker", "Teacher"]
+
+
+def test_limit_is_capped_by_the_catalog():
+    matcher = RoleMatcher([{"job_title": "Only", "industry": "Technology", "skill_requirements": ["Go"]}])
+    assert len(matcher.top(["Go"], [], 10)) == 1
+    assert matcher.top(["Go"], [], 0) == []
+    assert RoleMatcher([]).top(["Go"], [], 10) == []
@@ -0,0 +1,107 @@
+from datetime import date
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from services.salary_engine import EXPERIENCE_BANDS, PERCENTILES, SalaryEngine
+
+TITLES = ["Data Analyst", "Software Engineer", "Product Manager"]
+LOCATIONS = ["India", "Bangalore"]
+
+
+def observations(count=3000, seed=5):
+    rng = np.random.default_rng(seed)
+    return {
+        "job_title": rng.choice(TITLES, count).tolist(),
+        "location": rng.choice(LOCATIONS, count).tolist(),
+        "years_experience": rng.uniform(0, 15, count).round(1).tolist(),
+        "salary": rng.integers(200_000, 4_000_000, count).tolist(),
+        "date": [date(2024, 1, 1 + i % 28) for i in range(count)]
+    }
+
+
+def expected_summary(data, title, location, band):
+    edges = [0, 2, 5, 10, float("inf")]
+    low, high = edges[band], edges[band + 1]
+    rows = [
+        i for i in range(len(data["salary"]))
+        if data["job_title"][i] == title and data["location"][i] == location
+        and low <= data["years_experience"][i] < high
+    ]
+    salaries = np.array([data["salary"][i] for i in rows], dtype=np.float64)
+    summary = {
+        "min_salary": int(salaries.min()),
+        "max_salary": int(salaries.max()),
+        "average_salary": int(np.rint(salaries.mean())),
+        "sample_size": len(rows),
+        "date": max(data["date"][i] for i in rows).isoformat()
+    }
+    for name, q in PERCENTILES.items():
+        summary[name] = int(np.rint(np.percentile(salaries, q * 100)))
+    return summary
+
+
+@pytest.mark.parametrize("precompute", [0, 4, 1024])
+def test_summaries_match_numpy_for_every_group(precompute):
+    data = observations()
+    engine = SalaryEngine(pa.table(data), precompute=precompute)
+
+    for location in LOCATIONS:
+        for band, experience in enumerate(EXPERIENCE_BANDS):
+            for title, summary in zip(TITLES, engine.summaries(TITLES, location, experience)):
+                expected = expected_summary(data, title, location, band)
+                assert {key: summary[key] for key in expected} == expected
+                assert (summary["job_title"], summary["location"], summary["experience_level"]) == (
+                    title, location, experience
+                )
+
+
+def test_band_edges_start_the_next_band():
+    data = {
+        "job_title": ["Analyst"] * 5,
+        "location": ["India"] * 5,
+        "years_experience": [0, 1.9, 2, 5, 10],
+        "salary": [100, 200, 300, 400, 500]
+    }
+    engine = SalaryEngine(pa.table(data), precompute=0)
+
+    sizes = [engine.summaries(["Analyst"], "India", band)[0]["sample_size"] for band in EXPERIENCE_BANDS]
+    assert sizes == [2, 1, 1, 1]
+    assert engine.summaries(["Analyst"], "India", "2-5")[0]["median_salary"] == 300
+
+
+def test_names_fold_case_and_spaces_and_nulls_are_dropped():
+    data = {
+        "job_title": ["Data Analyst", " data analyst", "DATA ANALYST ", "Data Analyst"],
+        "location": ["India", "india", "India ", "India"],
+        "years_experience": [1, 1, None, 1],
+        "salary": [100, 300, 900, None]
+    }
+    engine = SalaryEngine(pa.table(data), precompute=0)
+
+    summary = engine.summaries(["  DATA analyst"], " INDIA", "0-2")[0]
+    assert (summary["job_title"], summary["sample_size"], summary["median_salary"]) == ("Data Analyst", 2, 200)
+    assert "date" not in summary
+
+
+def test_unknown_groups_have_no_summary():
+    engine = SalaryEngine(pa.table(observations(300)))
+
+    assert engine.summaries(["Astronaut", "Data Analyst"], "India", "0-2")[0] is None
+    assert engine.summaries(["Data Analyst"], "Mars", "0-2") == [None]
+    assert engine.summaries(["Data Analyst"], "India", "3-4") == [None]
+
+
+def test_precomputed_summaries_are_copies():
+    engine = SalaryEngine(pa.table(observations(300)), precompute=100)
+    first = engine.summaries(["Data Analyst"], "India", "0-2")[0]
+    first["median_salary"] = -1
+
+    assert engine.summaries(["Data Analyst"], "India", "0-2")[0]["median_salary"] != -1
+    assert engine.stats()["precomputed_hits"] == 2
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(ValueError):
+        SalaryEngine(pa.table({"job_title": ["Analyst"], "salary": [100]}))
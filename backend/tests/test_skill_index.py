@@ -0,0 +1,55 @@
+from services.skill_index import SkillIndex, fold
+
+ROWS = [
+    {"skill_name": "JavaScript", "job_titles": ["Frontend Developer"], "industries": ["Technology"]},
+    {"skill_name": "Python", "job_titles": ["Data Scientist", "Backend Developer"], "industries": ["Technology", "Finance"]},
+    {"skill_name": "Machine  Learning", "job_titles": ["Data Scientist"], "industries": ["Healthcare"]},
+    {"skill_name": "TS", "job_titles": ["Frontend Developer"], "industries": ["Technology"]},
+    {"skill_name": "", "job_titles": [""], "industries": [" "]},
+    {"skill_name": None, "job_titles": None, "industries": None}
+]
+
+
+def names(rows):
+    return [row["skill_name"] for row in rows]
+
+
+def test_fold_ignores_case_and_extra_whitespace():
+    assert fold("  Machine   LEARNING ") == "machine learning"
+    assert fold("Straße") == fold("STRASSE")
+
+
+def test_lookup_is_case_insensitive_and_keeps_row_order():
+    index = SkillIndex(ROWS)
+    assert names(index.lookup(["machine learning", " PYTHON "])) == ["Python", "Machine  Learning"]
+
+
+def test_aliases_resolve_to_the_indexed_name():
+    index = SkillIndex(ROWS)
+    assert names(index.lookup(["js"])) == ["JavaScript"]
+    assert names(index.lookup(["ML", "Python3"])) == ["Python", "Machine  Learning"]
+    # An indexed name wins over an alias of the same spelling
+    assert names(index.lookup(["ts"])) == ["TS"]
+    assert index.lookup(["K8s"]) == []
+
+
+def test_job_title_and_industry_filters_intersect():
+    index = SkillIndex(ROWS)
+    assert names(index.lookup(job_title="data scientist")) == ["Python", "Machine  Learning"]
+    assert names(index.lookup(job_title="Data Scientist", industry="finance")) == ["Python"]
+    assert names(index.lookup(["JS", "Python"], industry="Technology")) == ["JavaScript", "Python"]
+    assert index.lookup(["JavaScript"], job_title="Data Scientist") == []
+
+
+def test_blank_names_never_match():
+    index = SkillIndex(ROWS)
+    assert index.lookup(["", "  "], job_title=" ", industry="") == ROWS
+    assert names(index.lookup(["", "python"])) == ["Python"]
+    assert index.resolve("") == []
+    assert index.lookup(job_title="unknown") == []
+
+
+def test_custom_aliases():
+    index = SkillIndex(ROWS, aliases={"ECMAScript 6": "javascript"})
+    assert names(index.lookup(["ecmascript  6"])) == ["JavaScript"]
+    assert index.lookup(["JS"]) == []
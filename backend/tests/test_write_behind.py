@@ -0,0 +1,86 @@
+import asyncio
+
+from benchmarks.fake_firestore import FakeFirestore
+from services.write_behind import WriteBehindBuffer
+
+
+class FailingFirestore(FakeFirestore):
+    """Fails the first `failures` batch commits, running `during_commit` first"""
+
+    def __init__(self, failures, during_commit=None):
+        super().__init__()
+        self.failures = failures
+        self.during_commit = during_commit
+
+    def batch(self):
+        batch = super().batch()
+        if self.failures:
+            self.failures -= 1
+
+            async def commit():
+                if self.during_commit:
+                    self.during_commit()
+                raise RuntimeError("unavailable")
+
+            batch.commit = commit
+        return batch
+
+
+def test_updates_to_one_document_are_coalesced():
+    buffer = WriteBehindBuffer(interval=5)
+    buffer.record("users", "u1", {"last_login_at": 1})
+    buffer.record("users", "u1", {"last_login_at": 2, "logins": 7})
+    buffer.record("users", "u2", {"last_login_at": 3})
+
+    db = FakeFirestore()
+    db.data["users"] = {"u1": {"name": "Asha", "last_login_at": 0}, "u2": {"name": "Ravi"}}
+    assert asyncio.run(buffer.flush(db)) == 2
+
+    assert db.data["users"] == {
+        "u1": {"name": "Asha", "last_login_at": 2, "logins": 7},
+        "u2": {"name": "Ravi", "last_login_at": 3}
+    }
+    stats = buffer.stats()
+    assert (stats["pending"], stats["buffered"], stats["coalesced"], stats["flushed"]) == (0, 3, 1, 2)
+
+
+def test_flush_commits_in_batches_of_500():
+    buffer = WriteBehindBuffer(interval=5)
+    for i in range(1201):
+        buffer.record("users", f"u{i}", {"seen": i})
+
+    db = FakeFirestore()
+    db.data["users"] = {f"u{i}": {} for i in range(1201)}
+    assert asyncio.run(buffer.flush(db)) == 1201
+    assert db.round_trips == 3
+    assert buffer.stats()["batches"] == 3
+
+
+def test_failed_batch_is_retried_with_newer_updates_winning():
+    buffer = WriteBehindBuffer(interval=5)
+    buffer.record("users", "u1", {"last_login_at": 1, "logins": 1})
+    # A login recorded while the failing batch is in flight
+    db = FailingFirestore(failures=1, during_commit=lambda: buffer.record("users", "u1", {"last_login_at": 2}))
+    db.data["users"] = {"u1": {}}
+
+    assert asyncio.run(buffer.flush(db)) == 0
+    assert buffer.stats()["failures"] == 1
+    assert buffer.stats()["pending"] == 1
+
+    assert asyncio.run(buffer.flush(db)) == 1
+    assert db.data["users"]["u1"] == {"last_login_at": 2, "logins": 1}
+
+
+def test_update_of_a_deleted_document_is_dropped_without_failing_the_rest():
+    buffer = WriteBehindBuffer(interval=5)
+    for user_id in ("u1", "deleted", "u2"):
+        buffer.record("users", user_id, {"last_login_at": 1})
+
+    db = FakeFirestore()
+    db.data["users"] = {"u1": {"name": "Asha"}, "u2": {"name": "Ravi"}}
+    assert asyncio.run(buffer.flush(db)) == 2
+
+    # Telemetry never creates user documents
+    assert db.data["users"] == {"u1": {"name": "Asha", "last_login_at": 1}, "u2": {"name": "Ravi", "last_login_at": 1}}
+    stats = buffer.stats()
+    assert (stats["pending"], stats["dropped"], stats["failures"], stats["flushed"]) == (0, 1, 0, 2)
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { assessmentAPI } from '../services/api';
@@ -14,31 +14,57 @@ import {
   AlertCircle
 } from 'lucide-react';
 
+// Polling for a pending job starts quickly and backs off to POLL_MAX_DELAY
+const POLL_INITIAL_DELAY = 2000;
+const POLL_MAX_DELAY = 15000;
+
 const Recommendations = () => {
   const { user } = useAuth();
   const navigate = useNavigate();
   const [recommendations, setRecommendations] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const pollTimer = useRef(null);
+  const pollDelay = useRef(POLL_INITIAL_DELAY);
 
   useEffect(() => {
     loadRecommendations();
+    return () => clearTimeout(pollTimer.current);
   }, []);
 
+  const isJobPending = (job) => job && (job.status === 'queued' || job.status === 'running');
+
+  const schedulePoll = (delay) => {
+    pollTimer.current = setTimeout(loadRecommendations, delay);
+    pollDelay.current = Math.min(pollDelay.current * 1.5, POLL_MAX_DELAY);
+  };
+
   const loadRecommendations = async () => {
+    clearTimeout(pollTimer.current);
     setLoading(true);
     setError(null);
     try {
       const response = await assessmentAPI.getUserRecommendations();
       if (response.success) {
         setRecommendations(response.data.recommendation);
+      } else if (isJobPending(response.data?.job)) {
+        // Recommendations are still being generated; check again shortly
+        schedulePoll(pollDelay.current);
+        return;
       } else {
         setError(response.message || 'No recommendations found');
       }
     } catch (err) {
+      if (err.response?.status === 429) {
+        // Over the polling limit; wait as long as the server asks
+        const retryAfter = Number(err.response.headers?.['retry-after']) || 0;
+        schedulePoll(Math.max(retryAfter * 1000, pollDelay.current));
+        return;
+      }
       setError('Failed to load recommendations');
       console.error('Error loading recommendations:', err);
     }
+    pollDelay.current = POLL_INITIAL_DELAY;
     setLoading(false);
   };
 
@@ -115,6 +115,10 @@ export const AuthProvider = ({ children }) => {
       const response = await authAPI.updateProfile(userData);
       if (response.success) {
         const updatedUser = response.data.user;
+        // Tokens with profile claims are reissued after a profile update
+        if (response.data.token) {
+          localStorage.setItem('authToken', response.data.token);
+        }
         localStorage.setItem('userData', JSON.stringify(updatedUser));
         setUser(updatedUser);
         return { success: true, data: response.data };